@@ -0,0 +1,28 @@
+"""add_vendor_location_index
+
+Revision ID: a41c7e2d9b10
+Revises: 5fa39ab5b44b
+Create Date: 2026-10-16 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7e2d9b10'
+down_revision: Union[str, Sequence[str], None] = '5fa39ab5b44b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Index vendor coordinates for bounding-box distance search."""
+    op.create_index('ix_vendors_latitude_longitude', 'vendors', ['latitude', 'longitude'])
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop vendor coordinate index."""
+    op.drop_index('ix_vendors_latitude_longitude', table_name='vendors')
@@ -0,0 +1,32 @@
+"""add_idempotency_claim_lease
+
+Revision ID: a9d3e6f1c275
+Revises: f2c84d1a9b36
+Create Date: 2026-10-17 11:40:27.615904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e6f1c275'
+down_revision: Union[str, Sequence[str], None] = 'f2c84d1a9b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Lease in-progress idempotency claims so a dead worker's claim can be taken over."""
+    op.add_column('idempotency_keys', sa.Column('locked_until', sa.TIMESTAMP(timezone=True), nullable=True))
+    # Claims made before the lease existed get one from their start
+    op.execute(
+        "UPDATE idempotency_keys SET locked_until = created_at + interval '5 minutes' WHERE status_code IS NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the idempotency claim lease."""
+    op.drop_column('idempotency_keys', 'locked_until')
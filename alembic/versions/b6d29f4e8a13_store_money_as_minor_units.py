@@ -0,0 +1,115 @@
+"""store_money_as_minor_units
+
+Revision ID: b6d29f4e8a13
+Revises: a5c81e3f9d27
+Create Date: 2026-10-16 19:48:36.207514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d29f4e8a13'
+down_revision: Union[str, Sequence[str], None] = 'a5c81e3f9d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MONEY_COLUMNS = {
+    'items': ['base_price'],
+    'orders': ['subtotal', 'delivery_fee', 'total'],
+    'item_addons': ['price'],
+    'item_variations': ['price'],
+    'order_items': ['unit_price', 'subtotal'],
+    'order_item_addons': ['price'],
+    'carts': ['subtotal'],
+    'cart_items': ['unit_price', 'subtotal'],
+    'cart_item_addons': ['price'],
+    'user_wallets': ['balance', 'daily_limit'],
+    'vendor_wallets': ['balance', 'pending_balance', 'minimum_withdrawal'],
+    'rider_wallets': ['balance', 'pending_balance', 'delivery_rate', 'minimum_withdrawal'],
+    'wallet_transactions': ['amount', 'balance_before', 'balance_after'],
+}
+
+# Rollups are recomputed from the converted orders rather than converted, so they
+# equal the exact sums of the rounded amounts
+ROLLUP_COLUMNS = {
+    'vendor_hourly_stats': ['revenue', 'subtotal', 'delivery_fees'],
+    'customer_vendor_stats': ['total_spent'],
+}
+
+OLD_ROLLUP_SIGNATURE = ("apply_order_rollup(integer, timestamptz, orderstatus, integer, "
+                        "double precision, double precision, double precision, bigint)")
+NEW_ROLLUP_SIGNATURE = "apply_order_rollup(integer, timestamptz, orderstatus, integer, bigint, bigint, bigint, bigint)"
+
+ROLLUP_FUNCTION = """
+    CREATE OR REPLACE FUNCTION apply_order_rollup(
+        p_vendor_id integer, p_created_at timestamptz, p_status orderstatus, p_orders integer,
+        p_revenue {amount}, p_subtotal {amount}, p_delivery_fees {amount},
+        p_items bigint
+    ) RETURNS void AS $$
+    BEGIN
+        INSERT INTO vendor_hourly_stats AS s
+            (vendor_id, bucket, status, order_count, revenue, subtotal, delivery_fees, items_sold)
+        VALUES (p_vendor_id, date_trunc('hour', p_created_at AT TIME ZONE 'UTC'), coalesce(p_status, 'PENDING'),
+                p_orders, p_revenue, p_subtotal, p_delivery_fees, p_items)
+        ON CONFLICT (vendor_id, bucket, status) DO UPDATE SET
+            order_count = s.order_count + EXCLUDED.order_count,
+            revenue = s.revenue + EXCLUDED.revenue,
+            subtotal = s.subtotal + EXCLUDED.subtotal,
+            delivery_fees = s.delivery_fees + EXCLUDED.delivery_fees,
+            items_sold = s.items_sold + EXCLUDED.items_sold;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+HOURLY_REBUILD_SQL = """
+    INSERT INTO vendor_hourly_stats
+        (vendor_id, bucket, status, order_count, revenue, subtotal, delivery_fees, items_sold)
+    SELECT o.vendor_id, date_trunc('hour', o.created_at AT TIME ZONE 'UTC'), coalesce(o.status, 'PENDING'),
+           count(*), sum(o.total), sum(o.subtotal), sum(coalesce(o.delivery_fee, 0)), coalesce(sum(i.quantity), 0)
+    FROM orders o
+    LEFT JOIN (
+        SELECT order_id, sum(quantity) AS quantity FROM order_items GROUP BY order_id
+    ) i ON i.order_id = o.id
+    GROUP BY 1, 2, 3
+"""
+
+CUSTOMER_REBUILD_SQL = """
+    INSERT INTO customer_vendor_stats (user_id, vendor_id, order_count, total_spent, last_order_at)
+    SELECT user_id, vendor_id, count(*), sum(total), max(created_at)
+    FROM orders
+    WHERE status = 'DELIVERED'
+    GROUP BY 1, 2
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema: Store money as BIGINT minor units (kobo) instead of double precision naira."""
+    for table, columns in MONEY_COLUMNS.items():
+        op.execute(f"ALTER TABLE {table} " + ", ".join(
+            f"ALTER COLUMN {column} TYPE bigint USING round({column}::numeric * 100)::bigint" for column in columns
+        ))
+
+    # ALTER TABLE holds orders exclusively until commit, so the rebuild sees no concurrent changes
+    for table, columns in ROLLUP_COLUMNS.items():
+        op.execute(f"DELETE FROM {table}")
+        op.execute(f"ALTER TABLE {table} " + ", ".join(
+            f"ALTER COLUMN {column} TYPE bigint" for column in columns
+        ))
+    op.execute(f"DROP FUNCTION IF EXISTS {OLD_ROLLUP_SIGNATURE}")
+    op.execute(ROLLUP_FUNCTION.format(amount="bigint"))
+    op.execute(HOURLY_REBUILD_SQL)
+    op.execute(CUSTOMER_REBUILD_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema: Store money as double precision naira again."""
+    for table, columns in {**MONEY_COLUMNS, **ROLLUP_COLUMNS}.items():
+        op.execute(f"ALTER TABLE {table} " + ", ".join(
+            f"ALTER COLUMN {column} TYPE double precision USING {column} / 100.0" for column in columns
+        ))
+    op.execute(f"DROP FUNCTION IF EXISTS {NEW_ROLLUP_SIGNATURE}")
+    op.execute(ROLLUP_FUNCTION.format(amount="double precision"))
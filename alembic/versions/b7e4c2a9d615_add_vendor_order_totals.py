@@ -0,0 +1,66 @@
+"""add_vendor_order_totals
+
+Revision ID: b7e4c2a9d615
+Revises: a9d3e6f1c275
+Create Date: 2026-10-17 13:22:51.904318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4c2a9d615'
+down_revision: Union[str, Sequence[str], None] = 'a9d3e6f1c275'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TOTALS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION vendor_order_totals_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.vendor_id = OLD.vendor_id THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE vendor_order_totals SET order_count = order_count - 1 WHERE vendor_id = OLD.vendor_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO vendor_order_totals AS t (vendor_id, order_count) VALUES (NEW.vendor_id, 1)
+            ON CONFLICT (vendor_id) DO UPDATE SET order_count = t.order_count + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+BACKFILL_SQL = """
+    INSERT INTO vendor_order_totals (vendor_id, order_count)
+    SELECT vendor_id, count(*) FROM orders GROUP BY vendor_id
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema: Add a trigger-maintained lifetime order count per vendor and backfill it."""
+    op.create_table('vendor_order_totals',
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('vendor_id')
+    )
+    op.execute(TOTALS_FUNCTION)
+    # Status changes leave the count alone, so only inserts, deletes and vendor moves fire it
+    op.execute("""
+        CREATE TRIGGER orders_vendor_totals AFTER INSERT OR DELETE OR UPDATE OF vendor_id ON orders
+        FOR EACH ROW EXECUTE FUNCTION vendor_order_totals_trigger()
+    """)
+    # CREATE TRIGGER blocks writes to orders until commit, so the backfill sees no concurrent changes
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the lifetime vendor order counts."""
+    op.execute("DROP TRIGGER IF EXISTS orders_vendor_totals ON orders")
+    op.execute("DROP FUNCTION IF EXISTS vendor_order_totals_trigger()")
+    op.drop_table('vendor_order_totals')
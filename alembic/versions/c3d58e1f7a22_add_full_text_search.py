@@ -0,0 +1,48 @@
+"""add_full_text_search
+
+Revision ID: c3d58e1f7a22
+Revises: a41c7e2d9b10
+Create Date: 2026-10-16 10:04:19.552813
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d58e1f7a22'
+down_revision: Union[str, Sequence[str], None] = 'a41c7e2d9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_DOCUMENT_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema: Add generated search vectors and GIN indexes for vendor and item search."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table in ('vendors', 'items'):
+        op.add_column(table, sa.Column(
+            'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_DOCUMENT_SQL, persisted=True)
+        ))
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin')
+
+    op.create_index('ix_vendors_name_trgm', 'vendors', ['name'], postgresql_using='gin',
+                    postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop search vectors and their indexes."""
+    op.drop_index('ix_vendors_name_trgm', table_name='vendors')
+
+    for table in ('items', 'vendors'):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,37 @@
+"""add_wallet_snapshots
+
+Revision ID: c3e7a91d5f20
+Revises: b6d29f4e8a13
+Create Date: 2026-10-16 21:12:40.915362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7a91d5f20'
+down_revision: Union[str, Sequence[str], None] = 'b6d29f4e8a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Store per-wallet ledger checkpoints for incremental verification."""
+    op.create_table('wallet_snapshots',
+    sa.Column('wallet_type', sa.String(length=10), nullable=False),
+    sa.Column('wallet_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.BigInteger(), nullable=False),
+    sa.Column('last_transaction_id', sa.Integer(), nullable=False),
+    sa.Column('taken_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('wallet_type', 'wallet_id')
+    )
+    op.create_index('ix_wallet_snapshots_last_transaction_id', 'wallet_snapshots', ['last_transaction_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop wallet snapshots."""
+    op.drop_index('ix_wallet_snapshots_last_transaction_id', table_name='wallet_snapshots')
+    op.drop_table('wallet_snapshots')
@@ -0,0 +1,30 @@
+"""add_vendor_rider_updated_at_indexes
+
+Revision ID: c8f1d4a7e352
+Revises: b7e4c2a9d615
+Create Date: 2026-10-17 15:41:08.517239
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f1d4a7e352'
+down_revision: Union[str, Sequence[str], None] = 'b7e4c2a9d615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Index the latest vendor and rider edits, part of the report data version."""
+    op.create_index('ix_vendors_updated_at', 'vendors', ['updated_at'], unique=False)
+    op.create_index('ix_riders_updated_at', 'riders', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the vendor and rider updated_at indexes."""
+    op.drop_index('ix_riders_updated_at', table_name='riders')
+    op.drop_index('ix_vendors_updated_at', table_name='vendors')
@@ -0,0 +1,41 @@
+"""add_order_trajectories
+
+Revision ID: d81f5b3c6a04
+Revises: c3d58e1f7a22
+Create Date: 2026-10-16 18:21:47.310962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f5b3c6a04'
+down_revision: Union[str, Sequence[str], None] = 'c3d58e1f7a22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Add one compressed route row per delivered order."""
+    op.create_table('order_trajectories',
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('rider_id', sa.Integer(), nullable=True),
+    sa.Column('encoded_path', sa.Text(), nullable=False),
+    sa.Column('point_count', sa.Integer(), nullable=False),
+    sa.Column('raw_point_count', sa.Integer(), nullable=False),
+    sa.Column('distance_km', sa.Float(), nullable=False),
+    sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('ended_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['rider_id'], ['riders.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('order_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop order trajectories."""
+    op.drop_table('order_trajectories')
@@ -0,0 +1,35 @@
+"""add_order_earnings_accrual
+
+Revision ID: d81f6b2c4e97
+Revises: c3e7a91d5f20
+Create Date: 2026-10-16 22:03:17.582044
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f6b2c4e97'
+down_revision: Union[str, Sequence[str], None] = 'c3e7a91d5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Track which delivered orders have had their earnings accrued for settlement."""
+    op.add_column('orders', sa.Column('earnings_accrued_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    # Orders delivered before settlement existed were never paid through wallets; settling them now
+    # would pay out history retroactively, so they start as accrued
+    op.execute("UPDATE orders SET earnings_accrued_at = now() WHERE status = 'DELIVERED'")
+    op.create_index('ix_orders_unaccrued', 'orders', ['id'], unique=False,
+                    postgresql_where=sa.text("status = 'DELIVERED' AND earnings_accrued_at IS NULL"))
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop order earnings accrual tracking."""
+    op.drop_index('ix_orders_unaccrued', table_name='orders',
+                  postgresql_where=sa.text("status = 'DELIVERED' AND earnings_accrued_at IS NULL"))
+    op.drop_column('orders', 'earnings_accrued_at')
@@ -0,0 +1,163 @@
+"""add_vendor_hourly_stats
+
+Revision ID: e2b94f0d7c31
+Revises: d81f5b3c6a04
+Create Date: 2026-10-16 19:02:13.845120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b94f0d7c31'
+down_revision: Union[str, Sequence[str], None] = 'd81f5b3c6a04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ROLLUP_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION apply_order_rollup(
+        p_vendor_id integer, p_created_at timestamptz, p_status orderstatus, p_orders integer,
+        p_revenue double precision, p_subtotal double precision, p_delivery_fees double precision,
+        p_items bigint
+    ) RETURNS void AS $$
+    BEGIN
+        INSERT INTO vendor_hourly_stats AS s
+            (vendor_id, bucket, status, order_count, revenue, subtotal, delivery_fees, items_sold)
+        VALUES (p_vendor_id, date_trunc('hour', p_created_at AT TIME ZONE 'UTC'), coalesce(p_status, 'PENDING'),
+                p_orders, p_revenue, p_subtotal, p_delivery_fees, p_items)
+        ON CONFLICT (vendor_id, bucket, status) DO UPDATE SET
+            order_count = s.order_count + EXCLUDED.order_count,
+            revenue = s.revenue + EXCLUDED.revenue,
+            subtotal = s.subtotal + EXCLUDED.subtotal,
+            delivery_fees = s.delivery_fees + EXCLUDED.delivery_fees,
+            items_sold = s.items_sold + EXCLUDED.items_sold;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION orders_rollup_trigger() RETURNS trigger AS $$
+    DECLARE
+        item_count bigint := 0;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM apply_order_rollup(NEW.vendor_id, NEW.created_at, NEW.status, 1,
+                                       NEW.total, NEW.subtotal, coalesce(NEW.delivery_fee, 0), 0);
+            RETURN NEW;
+        END IF;
+        IF TG_OP = 'UPDATE'
+           AND NEW.vendor_id = OLD.vendor_id AND NEW.created_at = OLD.created_at
+           AND NEW.status IS NOT DISTINCT FROM OLD.status AND NEW.total = OLD.total
+           AND NEW.subtotal = OLD.subtotal AND NEW.delivery_fee IS NOT DISTINCT FROM OLD.delivery_fee THEN
+            RETURN NEW;
+        END IF;
+        SELECT coalesce(sum(quantity), 0) INTO item_count FROM order_items WHERE order_id = OLD.id;
+        PERFORM apply_order_rollup(OLD.vendor_id, OLD.created_at, OLD.status, -1,
+                                   -OLD.total, -OLD.subtotal, -coalesce(OLD.delivery_fee, 0), -item_count);
+        IF TG_OP = 'DELETE' THEN
+            RETURN OLD;
+        END IF;
+        PERFORM apply_order_rollup(NEW.vendor_id, NEW.created_at, NEW.status, 1,
+                                   NEW.total, NEW.subtotal, coalesce(NEW.delivery_fee, 0), item_count);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION order_items_rollup_trigger() RETURNS trigger AS $$
+    DECLARE
+        delta bigint;
+        target_order integer;
+    BEGIN
+        IF TG_OP = 'UPDATE' AND NEW.order_id <> OLD.order_id THEN
+            PERFORM apply_order_rollup(o.vendor_id, o.created_at, o.status, 0, 0, 0, 0, -OLD.quantity)
+            FROM orders o WHERE o.id = OLD.order_id;
+            PERFORM apply_order_rollup(o.vendor_id, o.created_at, o.status, 0, 0, 0, 0, NEW.quantity)
+            FROM orders o WHERE o.id = NEW.order_id;
+            RETURN NEW;
+        END IF;
+        IF TG_OP = 'INSERT' THEN
+            delta := NEW.quantity; target_order := NEW.order_id;
+        ELSIF TG_OP = 'UPDATE' THEN
+            delta := NEW.quantity - OLD.quantity; target_order := NEW.order_id;
+        ELSE
+            delta := -OLD.quantity; target_order := OLD.order_id;
+        END IF;
+        IF delta <> 0 THEN
+            PERFORM apply_order_rollup(o.vendor_id, o.created_at, o.status, 0, 0, 0, 0, delta)
+            FROM orders o WHERE o.id = target_order;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+BACKFILL_SQL = """
+    INSERT INTO vendor_hourly_stats
+        (vendor_id, bucket, status, order_count, revenue, subtotal, delivery_fees, items_sold)
+    SELECT o.vendor_id, date_trunc('hour', o.created_at AT TIME ZONE 'UTC'), coalesce(o.status, 'PENDING'),
+           count(*), sum(o.total), sum(o.subtotal), sum(coalesce(o.delivery_fee, 0)), coalesce(sum(i.quantity), 0)
+    FROM orders o
+    LEFT JOIN (
+        SELECT order_id, sum(quantity) AS quantity FROM order_items GROUP BY order_id
+    ) i ON i.order_id = o.id
+    GROUP BY 1, 2, 3
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema: Add trigger-maintained hourly vendor order rollups and backfill them."""
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'])
+
+    op.create_table('vendor_hourly_stats',
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.TIMESTAMP(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='orderstatus', create_type=False), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('subtotal', sa.Float(), nullable=False),
+    sa.Column('delivery_fees', sa.Float(), nullable=False),
+    sa.Column('items_sold', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('vendor_id', 'bucket', 'status')
+    )
+    op.create_index('ix_vendor_hourly_stats_bucket', 'vendor_hourly_stats', ['bucket'])
+
+    for statement in ROLLUP_FUNCTIONS:
+        op.execute(statement)
+    op.execute("""
+        CREATE TRIGGER orders_rollup AFTER INSERT OR UPDATE ON orders
+        FOR EACH ROW EXECUTE FUNCTION orders_rollup_trigger()
+    """)
+    op.execute("""
+        CREATE TRIGGER orders_rollup_delete BEFORE DELETE ON orders
+        FOR EACH ROW EXECUTE FUNCTION orders_rollup_trigger()
+    """)
+    op.execute("""
+        CREATE TRIGGER order_items_rollup AFTER INSERT OR UPDATE OR DELETE ON order_items
+        FOR EACH ROW EXECUTE FUNCTION order_items_rollup_trigger()
+    """)
+
+    # Existing history; later changes arrive through the triggers
+    op.execute("LOCK TABLE orders, order_items IN SHARE MODE")
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the rollup triggers, functions and table."""
+    op.execute("DROP TRIGGER IF EXISTS order_items_rollup ON order_items")
+    op.execute("DROP TRIGGER IF EXISTS orders_rollup_delete ON orders")
+    op.execute("DROP TRIGGER IF EXISTS orders_rollup ON orders")
+    op.execute("DROP FUNCTION IF EXISTS order_items_rollup_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS orders_rollup_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS apply_order_rollup("
+               "integer, timestamptz, orderstatus, integer, double precision, double precision, "
+               "double precision, bigint)")
+    op.drop_index('ix_vendor_hourly_stats_bucket', table_name='vendor_hourly_stats')
+    op.drop_table('vendor_hourly_stats')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
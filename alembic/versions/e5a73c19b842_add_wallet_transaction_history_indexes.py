@@ -0,0 +1,37 @@
+"""add_wallet_transaction_history_indexes
+
+Revision ID: e5a73c19b842
+Revises: d81f6b2c4e97
+Create Date: 2026-10-16 23:41:08.317265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a73c19b842'
+down_revision: Union[str, Sequence[str], None] = 'd81f6b2c4e97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+WALLET_COLUMNS = ('user_wallet_id', 'vendor_wallet_id', 'rider_wallet_id')
+
+
+def upgrade() -> None:
+    """Upgrade schema: Index each wallet's transaction history for keyset pagination."""
+    # Partial: every transaction belongs to one wallet, so each index only holds that wallet type's rows
+    for column in WALLET_COLUMNS:
+        op.create_index(f'ix_wallet_transactions_{column[:-3]}_history', 'wallet_transactions',
+                        [column, 'created_at', 'id'], unique=False,
+                        postgresql_where=sa.text(f'{column} IS NOT NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the wallet transaction history indexes."""
+    for column in WALLET_COLUMNS:
+        op.drop_index(f'ix_wallet_transactions_{column[:-3]}_history', table_name='wallet_transactions',
+                      postgresql_where=sa.text(f'{column} IS NOT NULL'))
@@ -0,0 +1,49 @@
+"""add_report_jobs
+
+Revision ID: f2c84d1a9b36
+Revises: e5a73c19b842
+Create Date: 2026-10-17 09:12:44.280517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c84d1a9b36'
+down_revision: Union[str, Sequence[str], None] = 'e5a73c19b842'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Keep report jobs and results in the database, shared by all workers."""
+    op.create_table('report_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('report_type', sa.String(length=50), nullable=False),
+    sa.Column('params', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('error_status', sa.SmallInteger(), nullable=True),
+    sa.Column('submitted_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_report_jobs_cache_key_submitted_at', 'report_jobs', ['cache_key', 'submitted_at'], unique=False)
+    op.create_index('ix_report_jobs_finished_at', 'report_jobs', ['finished_at'], unique=False)
+    # Latest in-place order edit is part of the report data version
+    op.create_index('ix_orders_updated_at', 'orders', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop report jobs."""
+    op.drop_index('ix_orders_updated_at', table_name='orders')
+    op.drop_index('ix_report_jobs_finished_at', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_cache_key_submitted_at', table_name='report_jobs')
+    op.drop_table('report_jobs')
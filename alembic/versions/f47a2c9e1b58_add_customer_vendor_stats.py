@@ -0,0 +1,103 @@
+"""add_customer_vendor_stats
+
+Revision ID: f47a2c9e1b58
+Revises: e2b94f0d7c31
+Create Date: 2026-10-16 20:14:37.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f47a2c9e1b58'
+down_revision: Union[str, Sequence[str], None] = 'e2b94f0d7c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+STATS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION customer_stats_trigger() RETURNS trigger AS $$
+    DECLARE
+        was_counted boolean := false;
+        is_counted boolean := false;
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.status = 'DELIVERED' THEN
+            was_counted := true;
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.status = 'DELIVERED' THEN
+            is_counted := true;
+        END IF;
+        IF was_counted AND is_counted
+           AND NEW.user_id = OLD.user_id AND NEW.vendor_id = OLD.vendor_id
+           AND NEW.total = OLD.total AND NEW.created_at = OLD.created_at THEN
+            RETURN NULL;
+        END IF;
+        IF was_counted THEN
+            UPDATE customer_vendor_stats
+            SET order_count = order_count - 1, total_spent = total_spent - OLD.total
+            WHERE user_id = OLD.user_id AND vendor_id = OLD.vendor_id;
+            DELETE FROM customer_vendor_stats
+            WHERE user_id = OLD.user_id AND vendor_id = OLD.vendor_id AND order_count <= 0;
+            UPDATE customer_vendor_stats s SET last_order_at = (
+                SELECT max(o.created_at) FROM orders o
+                WHERE o.user_id = OLD.user_id AND o.vendor_id = OLD.vendor_id AND o.status = 'DELIVERED'
+            )
+            WHERE s.user_id = OLD.user_id AND s.vendor_id = OLD.vendor_id AND s.last_order_at <= OLD.created_at;
+        END IF;
+        IF is_counted THEN
+            INSERT INTO customer_vendor_stats AS s (user_id, vendor_id, order_count, total_spent, last_order_at)
+            VALUES (NEW.user_id, NEW.vendor_id, 1, NEW.total, NEW.created_at)
+            ON CONFLICT (user_id, vendor_id) DO UPDATE SET
+                order_count = s.order_count + 1,
+                total_spent = s.total_spent + EXCLUDED.total_spent,
+                last_order_at = greatest(s.last_order_at, EXCLUDED.last_order_at);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+BACKFILL_SQL = """
+    INSERT INTO customer_vendor_stats (user_id, vendor_id, order_count, total_spent, last_order_at)
+    SELECT user_id, vendor_id, count(*), sum(total), max(created_at)
+    FROM orders
+    WHERE status = 'DELIVERED'
+    GROUP BY 1, 2
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema: Add trigger-maintained per customer and vendor order totals and backfill them."""
+    op.create_index('ix_orders_user_id_vendor_id', 'orders', ['user_id', 'vendor_id'])
+
+    op.create_table('customer_vendor_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('total_spent', sa.Float(), nullable=False),
+    sa.Column('last_order_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'vendor_id')
+    )
+
+    op.execute(STATS_FUNCTION)
+    op.execute("""
+        CREATE TRIGGER orders_customer_stats AFTER INSERT OR UPDATE OR DELETE ON orders
+        FOR EACH ROW EXECUTE FUNCTION customer_stats_trigger()
+    """)
+
+    # Existing history; later changes arrive through the trigger
+    op.execute("LOCK TABLE orders IN SHARE MODE")
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the customer stats trigger, function and table."""
+    op.execute("DROP TRIGGER IF EXISTS orders_customer_stats ON orders")
+    op.execute("DROP FUNCTION IF EXISTS customer_stats_trigger()")
+    op.drop_table('customer_vendor_stats')
+    op.drop_index('ix_orders_user_id_vendor_id', table_name='orders')
@@ -1,9 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import uvicorn
 from contextlib import asynccontextmanager
 from sqlalchemy.orm import configure_mappers
+from .shared.config import settings
 from .shared.database import engine
+from .services.dispatch import dispatch_engine, run_dispatch_loop
+from .services.location_store import rider_location_store, run_location_flush_loop
+from .services.report_jobs import report_jobs
+from .services.idempotency import IdempotencyMiddleware, idempotency_store, run_idempotency_purge_loop
+from .services.wallet_audit import wallet_audit, run_wallet_audit_loop
+from .services.settlement import settlement_engine, run_settlement_loop
 from . import models
 from . import routes
 from .routes import (
@@ -14,6 +22,7 @@ from .routes import (
 from .routes.order_item_routes import router as order_item_router
 from .routes.order_item_addon_routes import router as order_item_addon_router
 from .routes.order_tracking_routes import router as order_tracking_router
+from .routes.tracking_routes import router as live_tracking_router
 from .routes.cart_item_routes import router as cart_item_router
 from .routes.cart_item_addon_routes import router as cart_item_addon_router
 
@@ -31,6 +40,7 @@ from .routes.views.utils_views import router as system_router
 from .routes.views.item_views import router as item_views_router
 from .routes.views.user_views import router as user_views_router
 from .routes.views.vendor_views import router as vendor_views_router
+from .routes.views.export_views import router as export_router
 
 
 # Ensure all models are imported and mappers are configured
@@ -38,8 +48,32 @@ models.Base.metadata.create_all(bind=engine)
 configure_mappers()  # Explicitly configure all mappers
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers with the app and stop them on shutdown"""
+    tasks = [
+        asyncio.create_task(run_location_flush_loop(rider_location_store, settings.location_flush_interval_seconds)),
+        asyncio.create_task(run_idempotency_purge_loop(idempotency_store, settings.idempotency_purge_interval_seconds)),
+    ]
+    if settings.dispatch_interval_seconds > 0:
+        tasks.append(asyncio.create_task(run_dispatch_loop(dispatch_engine, settings.dispatch_interval_seconds)))
+    if settings.wallet_audit_interval_seconds > 0:
+        tasks.append(asyncio.create_task(run_wallet_audit_loop(wallet_audit, settings.wallet_audit_interval_seconds)))
+    if settings.settlement_accrual_interval_seconds > 0:
+        tasks.append(asyncio.create_task(run_settlement_loop(
+            settlement_engine, settings.settlement_accrual_interval_seconds, settings.settlement_interval_seconds
+        )))
+    yield
+    for task in tasks:
+        task.cancel()
+    # Let the location loop write its final flush before the process exits
+    await asyncio.gather(*tasks, return_exceptions=True)
+    report_jobs.shutdown()
+
+
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="MetroMart",
     description="MetroMart delivery App",
     version="1.0.0",
@@ -50,6 +84,9 @@ app = FastAPI(
 )
 
 
+# Replay retried payment and wallet mutations; added before CORS so CORS wraps its responses
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS settings
 origins = ["*"]
 
@@ -113,6 +150,7 @@ app.include_router(wallet_router)
 app.include_router(order_item_router)
 app.include_router(order_item_addon_router)
 app.include_router(order_tracking_router)
+app.include_router(live_tracking_router)
 app.include_router(cart_item_router)
 app.include_router(cart_item_addon_router)
 
@@ -129,4 +167,5 @@ app.include_router(notifications_router)
 app.include_router(system_router)
 app.include_router(item_views_router)
 app.include_router(user_views_router)
-app.include_router(vendor_views_router)
\ No newline at end of file
+app.include_router(vendor_views_router)
+app.include_router(export_router)
\ No newline at end of file
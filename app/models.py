@@ -1,10 +1,22 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, TIMESTAMP, Float, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, LargeBinary, TIMESTAMP, Float, Boolean, ForeignKey, Enum, Index, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.sql.expression import text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from .shared.database import Base
+from .shared.money import MinorUnits
 import enum
 
+# Weighted full-text document for vendors and items: name matches outrank description matches.
+# The 'simple' config avoids English stemming of local dish and brand names.
+SEARCH_DOCUMENT_SQL = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+# Trigram indexes on names need pg_trgm before the tables are created
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 class VendorType(enum.Enum):
     """
     Enumeration for different types of vendors in the system.
@@ -111,6 +123,13 @@ class Vendor(Base):
     - Supports push notifications for new orders
     """
     __tablename__ = "vendors"
+    __table_args__ = (
+        Index("ix_vendors_latitude_longitude", "latitude", "longitude"),  # Bounding-box distance search
+        Index("ix_vendors_search_vector", "search_vector", postgresql_using="gin"),  # Full-text search
+        Index("ix_vendors_name_trgm", "name", postgresql_using="gin",
+              postgresql_ops={"name": "gin_trgm_ops"}),  # Substring name lookup
+        Index("ix_vendors_updated_at", "updated_at"),  # Latest edit, report data version
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     firebase_uid = Column(String, unique=True, nullable=False)
@@ -130,6 +149,7 @@ class Vendor(Base):
     closing_time = Column(String)  # Daily closing time
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=datetime.utcnow)
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_DOCUMENT_SQL, persisted=True)))  # Maintained by the database
 
     # Relationships
     items = relationship("Item", back_populates="vendor")
@@ -179,6 +199,9 @@ class Item(Base):
        - Optional sides
     """
     __tablename__ = "items"
+    __table_args__ = (
+        Index("ix_items_search_vector", "search_vector", postgresql_using="gin"),  # Full-text search
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     vendor_id = Column(Integer, ForeignKey("vendors.id", ondelete="CASCADE"), nullable=False)
@@ -186,12 +209,13 @@ class Item(Base):
     addon_group_id = Column(Integer, ForeignKey("item_addon_groups.id", ondelete="SET NULL"))  # Reference to addon group
     name = Column(String, nullable=False)
     description = Column(String)
-    base_price = Column(Float, nullable=False)  # Base price without add-ons
+    base_price = Column(MinorUnits, nullable=False)  # Base price without add-ons
     image_url = Column(String)
     is_available = Column(Boolean, default=True)
     allows_addons = Column(Boolean, default=False)  # Whether item can have add-ons
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=datetime.utcnow)
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_DOCUMENT_SQL, persisted=True)))  # Maintained by the database
 
     # Relationships
     vendor = relationship("Vendor", back_populates="items")
@@ -260,6 +284,9 @@ class Rider(Base):
     - Calculating delivery distances and ETAs
     """
     __tablename__ = "riders"
+    __table_args__ = (
+        Index("ix_riders_updated_at", "updated_at"),  # Latest edit, report data version
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     firebase_uid = Column(String, unique=True, nullable=False)
@@ -310,6 +337,12 @@ class Order(Base):
     6. Delivery completed (DELIVERED)
     """
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_user_id_vendor_id", "user_id", "vendor_id"),  # Order history, customer stats
+        Index("ix_orders_unaccrued", "id",                             # Delivered orders awaiting settlement
+              postgresql_where=text("status = 'DELIVERED' AND earnings_accrued_at IS NULL")),
+        Index("ix_orders_updated_at", "updated_at"),                   # Latest edit, report data version
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -317,11 +350,12 @@ class Order(Base):
     rider_id = Column(Integer, ForeignKey("riders.id", ondelete="SET NULL"))
     delivery_address_id = Column(Integer, ForeignKey("delivery_addresses.id", ondelete="SET NULL"), nullable=False)
     status = Column(Enum(OrderStatus), default=OrderStatus.PENDING)
-    subtotal = Column(Float, nullable=False)          # Sum of items before delivery fee
-    delivery_fee = Column(Float)                      # Calculated delivery charge
-    total = Column(Float, nullable=False)             # Final amount including all fees
+    subtotal = Column(MinorUnits, nullable=False)     # Sum of items before delivery fee
+    delivery_fee = Column(MinorUnits)                 # Calculated delivery charge
+    total = Column(MinorUnits, nullable=False)        # Final amount including all fees
     notes = Column(String)                           # Special instructions
     estimated_delivery_time = Column(TIMESTAMP(timezone=True))
+    earnings_accrued_at = Column(TIMESTAMP(timezone=True))  # When vendor and rider earnings moved to pending
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=datetime.utcnow)
 
@@ -332,6 +366,7 @@ class Order(Base):
     delivery_address = relationship("DeliveryAddress", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
     tracking = relationship("OrderTracking", back_populates="order")
+    trajectory = relationship("OrderTrajectory", back_populates="order", uselist=False)
 
 class ItemAddonGroup(Base):
     """
@@ -399,7 +434,7 @@ class ItemAddon(Base):
     group_id = Column(Integer, ForeignKey("item_addon_groups.id", ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False)  # e.g., "Egusi Soup", "Goat Meat", "Coca-Cola"
     description = Column(String)
-    price = Column(Float, nullable=False)  # Additional cost for this add-on
+    price = Column(MinorUnits, nullable=False)  # Additional cost for this add-on
     is_available = Column(Boolean, default=True)  # Current availability status
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
 
@@ -431,7 +466,7 @@ class ItemVariation(Base):
     item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False)  # e.g., "Small", "Medium", "Large"
     description = Column(String)
-    price = Column(Float, nullable=False)  # Total price for this variation
+    price = Column(MinorUnits, nullable=False)  # Total price for this variation
     is_available = Column(Boolean, default=True)  # Current availability status
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
 
@@ -462,14 +497,17 @@ class OrderItem(Base):
        - Quantity: 1
     """
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),  # Items of an order, rollup triggers
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
     item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False)
     variation_id = Column(Integer, ForeignKey("item_variations.id", ondelete="SET NULL"))
     quantity = Column(Integer, nullable=False)
-    unit_price = Column(Float, nullable=False)  # Base price or variation price
-    subtotal = Column(Float, nullable=False)    # Total including all add-ons
+    unit_price = Column(MinorUnits, nullable=False)  # Base price or variation price
+    subtotal = Column(MinorUnits, nullable=False)    # Total including all add-ons
     notes = Column(String)                      # Special instructions
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
 
@@ -503,7 +541,7 @@ class OrderItemAddon(Base):
     id = Column(Integer, primary_key=True, nullable=False)
     order_item_id = Column(Integer, ForeignKey("order_items.id", ondelete="CASCADE"), nullable=False)
     addon_id = Column(Integer, ForeignKey("item_addons.id", ondelete="CASCADE"), nullable=False)
-    price = Column(Float, nullable=False)  # Price at time of order
+    price = Column(MinorUnits, nullable=False)  # Price at time of order
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
 
     # Relationships
@@ -545,6 +583,109 @@ class OrderTracking(Base):
     order = relationship("Order", back_populates="tracking")
 
 
+class OrderTrajectory(Base):
+    """
+    Represents the compressed GPS route a rider followed for one delivery.
+    
+    Fixes are buffered in memory while the order is in transit and written
+    once, when the delivery ends, as a single row:
+    - Douglas-Peucker simplified path
+    - Encoded as a polyline of (latitude, longitude, seconds) deltas
+    - Raw point count and travelled distance kept for reporting
+    
+    Used for:
+    - Showing the delivered route to customers and support
+    - Resolving delivery disputes
+    - Analysing rider speeds and routes
+    """
+    __tablename__ = "order_trajectories"
+
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), primary_key=True, nullable=False)
+    rider_id = Column(Integer, ForeignKey("riders.id", ondelete="SET NULL"))
+    encoded_path = Column(Text, nullable=False)         # Polyline of lat/lon/time deltas
+    point_count = Column(Integer, nullable=False)       # Points kept after simplification
+    raw_point_count = Column(Integer, nullable=False)   # Fixes received
+    distance_km = Column(Float, nullable=False)         # Length of the unsimplified route
+    started_at = Column(TIMESTAMP(timezone=True), nullable=False)  # Time of the first fix
+    ended_at = Column(TIMESTAMP(timezone=True), nullable=False)    # Time of the last fix
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+
+    # Relationships
+    order = relationship("Order", back_populates="trajectory")
+
+
+class VendorHourlyStats(Base):
+    """
+    Hourly per-vendor order aggregates, maintained by database triggers.
+    
+    One row per vendor, UTC hour the orders were placed in, and current
+    order status. Triggers on orders and order_items move an order's count,
+    money and item quantity between rows as it is placed, changes status or
+    is deleted, so every write path (ORM or bulk SQL) keeps them exact.
+    The triggers are installed by Alembic (e2b94f0d7c31, amended by
+    b6d29f4e8a13), not by create_all.
+    
+    Used for:
+    - Sales reports and admin dashboards
+    - Vendor sales analytics
+    - Any time-bucketed order metric, at a cost proportional to buckets
+    """
+    __tablename__ = "vendor_hourly_stats"
+    __table_args__ = (
+        Index("ix_vendor_hourly_stats_bucket", "bucket"),  # Platform-wide time ranges
+    )
+
+    vendor_id = Column(Integer, primary_key=True, nullable=False)  # No FK: rows outlive deleted vendors harmlessly
+    bucket = Column(TIMESTAMP, primary_key=True, nullable=False)    # UTC hour, naive
+    status = Column(Enum(OrderStatus), primary_key=True, nullable=False)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(MinorUnits, nullable=False, default=0)         # Sum of Order.total
+    subtotal = Column(MinorUnits, nullable=False, default=0)        # Sum of Order.subtotal
+    delivery_fees = Column(MinorUnits, nullable=False, default=0)   # Sum of Order.delivery_fee
+    items_sold = Column(Integer, nullable=False, default=0)         # Sum of OrderItem.quantity
+
+
+class VendorOrderTotals(Base):
+    """
+    Lifetime order count per vendor, maintained by a database trigger.
+    
+    The count covers orders in every status and only changes when an
+    order is placed, deleted or moved to another vendor, so reading a
+    vendor's all-time total is one primary-key lookup instead of a scan
+    of its hourly rollups. The trigger is installed by Alembic
+    (b7e4c2a9d615), not by create_all.
+    
+    Used for:
+    - Vendor leaderboard lifetime totals
+    """
+    __tablename__ = "vendor_order_totals"
+
+    vendor_id = Column(Integer, primary_key=True, nullable=False)  # No FK: rows outlive deleted vendors harmlessly
+    order_count = Column(Integer, nullable=False, default=0)
+
+
+class CustomerVendorStats(Base):
+    """
+    Delivered-order totals per customer and vendor, maintained by a database trigger.
+    
+    A row exists while the customer has at least one delivered order from
+    the vendor. Summing a customer's rows gives their order count and
+    spend; ranking them gives their preferred vendors. The trigger is
+    installed by Alembic (f47a2c9e1b58), not by create_all.
+    
+    Used for:
+    - Top customer rankings
+    - Customer preferred vendors
+    """
+    __tablename__ = "customer_vendor_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, nullable=False)
+    vendor_id = Column(Integer, ForeignKey("vendors.id", ondelete="CASCADE"), primary_key=True, nullable=False)
+    order_count = Column(Integer, nullable=False, default=0)   # Delivered orders
+    total_spent = Column(MinorUnits, nullable=False, default=0)  # Sum of Order.total
+    last_order_at = Column(TIMESTAMP(timezone=True))           # Newest delivered order's created_at
+
+
 class Cart(Base):
     """
     Represents a user's shopping cart for a specific vendor.
@@ -572,7 +713,7 @@ class Cart(Base):
     id = Column(Integer, primary_key=True, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     vendor_id = Column(Integer, ForeignKey("vendors.id", ondelete="CASCADE"), nullable=False)
-    subtotal = Column(Float, nullable=False, default=0.0)  # Sum of all items and add-ons
+    subtotal = Column(MinorUnits, nullable=False, default=0.0)  # Sum of all items and add-ons
     notes = Column(String)                                # Special instructions for entire cart
     expires_at = Column(TIMESTAMP(timezone=True))         # Cart expiration timestamp
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
@@ -614,8 +755,8 @@ class CartItem(Base):
     item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False)
     variation_id = Column(Integer, ForeignKey("item_variations.id", ondelete="SET NULL"))
     quantity = Column(Integer, nullable=False, default=1)
-    unit_price = Column(Float, nullable=False)        # Base price or variation price
-    subtotal = Column(Float, nullable=False)          # Total including add-ons
+    unit_price = Column(MinorUnits, nullable=False)   # Base price or variation price
+    subtotal = Column(MinorUnits, nullable=False)     # Total including add-ons
     notes = Column(String)                           # Special instructions for this item
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
     updated_at = Column(TIMESTAMP(timezone=True), onupdate=datetime.utcnow)
@@ -651,7 +792,7 @@ class CartItemAddon(Base):
     id = Column(Integer, primary_key=True, nullable=False)
     cart_item_id = Column(Integer, ForeignKey("cart_items.id", ondelete="CASCADE"), nullable=False)
     addon_id = Column(Integer, ForeignKey("item_addons.id", ondelete="CASCADE"), nullable=False)
-    price = Column(Float, nullable=False)             # Current price of the add-on
+    price = Column(MinorUnits, nullable=False)        # Current price of the add-on
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
 
     # Relationships
@@ -686,10 +827,10 @@ class UserWallet(Base):
 
     id = Column(Integer, primary_key=True, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
-    balance = Column(Float, nullable=False, default=0.0)  # Current wallet balance
+    balance = Column(MinorUnits, nullable=False, default=0.0)  # Current wallet balance
     is_active = Column(Boolean, default=True)            # Wallet active status
     is_locked = Column(Boolean, default=False)           # Security lock status
-    daily_limit = Column(Float, default=50000.0)        # Daily spending limit
+    daily_limit = Column(MinorUnits, default=50000.0)    # Daily spending limit
     transaction_pin = Column(String)                     # Encrypted transaction PIN
     last_transaction_at = Column(TIMESTAMP(timezone=True))
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
@@ -728,12 +869,12 @@ class VendorWallet(Base):
 
     id = Column(Integer, primary_key=True, nullable=False)
     vendor_id = Column(Integer, ForeignKey("vendors.id", ondelete="CASCADE"), unique=True, nullable=False)
-    balance = Column(Float, nullable=False, default=0.0)     # Current wallet balance
-    pending_balance = Column(Float, nullable=False, default=0.0)  # Pending settlement amount
+    balance = Column(MinorUnits, nullable=False, default=0.0)  # Current wallet balance
+    pending_balance = Column(MinorUnits, nullable=False, default=0.0)  # Pending settlement amount
     is_active = Column(Boolean, default=True)               # Wallet active status
     is_locked = Column(Boolean, default=False)              # Security lock status
     commission_rate = Column(Float, default=0.15)           # Platform commission rate (15%)
-    minimum_withdrawal = Column(Float, default=1000.0)      # Minimum withdrawal amount
+    minimum_withdrawal = Column(MinorUnits, default=1000.0)  # Minimum withdrawal amount
     last_transaction_at = Column(TIMESTAMP(timezone=True))
     last_settlement_at = Column(TIMESTAMP(timezone=True))   # Last earnings settlement
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
@@ -773,12 +914,12 @@ class RiderWallet(Base):
 
     id = Column(Integer, primary_key=True, nullable=False)
     rider_id = Column(Integer, ForeignKey("riders.id", ondelete="CASCADE"), unique=True, nullable=False)
-    balance = Column(Float, nullable=False, default=0.0)     # Current wallet balance
-    pending_balance = Column(Float, nullable=False, default=0.0)  # Pending delivery payments
+    balance = Column(MinorUnits, nullable=False, default=0.0)  # Current wallet balance
+    pending_balance = Column(MinorUnits, nullable=False, default=0.0)  # Pending delivery payments
     is_active = Column(Boolean, default=True)               # Wallet active status
     is_locked = Column(Boolean, default=False)              # Security lock status
-    delivery_rate = Column(Float, default=500.0)            # Base delivery fee rate
-    minimum_withdrawal = Column(Float, default=500.0)       # Minimum withdrawal amount
+    delivery_rate = Column(MinorUnits, default=500.0)       # Base delivery fee rate
+    minimum_withdrawal = Column(MinorUnits, default=500.0)  # Minimum withdrawal amount
     last_transaction_at = Column(TIMESTAMP(timezone=True))
     last_settlement_at = Column(TIMESTAMP(timezone=True))   # Last earnings settlement
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
@@ -813,6 +954,15 @@ class WalletTransaction(Base):
     3. Rider transactions: Delivery earnings, tips, expense reimbursements
     """
     __tablename__ = "wallet_transactions"
+    __table_args__ = (
+        # Newest-first history of one wallet, keyset-paginated on (created_at, id)
+        Index("ix_wallet_transactions_user_wallet_history", "user_wallet_id", "created_at", "id",
+              postgresql_where=text("user_wallet_id IS NOT NULL")),
+        Index("ix_wallet_transactions_vendor_wallet_history", "vendor_wallet_id", "created_at", "id",
+              postgresql_where=text("vendor_wallet_id IS NOT NULL")),
+        Index("ix_wallet_transactions_rider_wallet_history", "rider_wallet_id", "created_at", "id",
+              postgresql_where=text("rider_wallet_id IS NOT NULL")),
+    )
 
     id = Column(Integer, primary_key=True, nullable=False)
     
@@ -824,9 +974,9 @@ class WalletTransaction(Base):
     # Transaction Details
     transaction_type = Column(Enum(WalletTransactionType), nullable=False)
     status = Column(Enum(WalletTransactionStatus), default=WalletTransactionStatus.PENDING)
-    amount = Column(Float, nullable=False)               # Transaction amount
-    balance_before = Column(Float, nullable=False)       # Balance before transaction
-    balance_after = Column(Float, nullable=False)        # Balance after transaction
+    amount = Column(MinorUnits, nullable=False)          # Transaction amount
+    balance_before = Column(MinorUnits, nullable=False)  # Balance before transaction
+    balance_after = Column(MinorUnits, nullable=False)   # Balance after transaction
     
     # Transaction Metadata
     description = Column(String, nullable=False)         # Human-readable description
@@ -850,6 +1000,91 @@ class WalletTransaction(Base):
                               foreign_keys=[rider_wallet_id])
 
 
+class WalletSnapshot(Base):
+    """
+    Ledger checkpoint of one wallet: its balance according to the transaction log.
+
+    balance is the sum of the balance changes (balance_after - balance_before)
+    of every transaction of the wallet up to last_transaction_id, carried
+    forward from the previous checkpoint rather than copied from the wallet,
+    so drift in the wallet row is never absorbed. Verification replays only
+    the transactions after the checkpoint.
+
+    Used for:
+    - Incremental wallet reconciliation against the transaction log
+    - Platform-wide balance audits
+    """
+    __tablename__ = "wallet_snapshots"
+    __table_args__ = (
+        Index("ix_wallet_snapshots_last_transaction_id", "last_transaction_id"),  # Oldest checkpoint
+    )
+
+    wallet_type = Column(String(10), primary_key=True, nullable=False)  # "user", "vendor" or "rider"
+    wallet_id = Column(Integer, primary_key=True, nullable=False)       # No FK: one table for three wallet tables
+    balance = Column(MinorUnits, nullable=False)                        # Ledger balance at the checkpoint
+    last_transaction_id = Column(Integer, nullable=False)               # Transactions up to this id are included
+    taken_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+
+
+class IdempotencyKey(Base):
+    """
+    A client-supplied Idempotency-Key and the response its request produced.
+    
+    Payment and wallet mutation endpoints record the first request sent
+    with a key; a retry with the same key and the same request gets the
+    stored response back without running the handler again. A claim whose
+    request is still running holds a short lease (locked_until); once it
+    lapses, e.g. because the worker died, a retry may take the key over.
+    Rows expire after a TTL and are purged in the background.
+    
+    Used for:
+    - Safe client retries of payments, fundings, withdrawals and transfers
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    key = Column(String(255), primary_key=True, nullable=False)
+    fingerprint = Column(String(64), nullable=False)      # sha256 of the request it was first used with
+    status_code = Column(SmallInteger)                    # NULL while the first request is still running
+    content_type = Column(String)
+    response_body = Column(LargeBinary)                   # Response bytes exactly as first sent
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    locked_until = Column(TIMESTAMP(timezone=True))       # Claim lease while status_code is NULL
+
+
+class ReportJob(Base):
+    """
+    A background admin report and, once finished, its result.
+    
+    Jobs are shared by every API worker: any worker can poll or stream a
+    job submitted to another. The worker process that runs the report
+    records its outcome here, and a completed job is reused as the cached
+    result for identical requests while the data version is unchanged.
+    
+    Used for:
+    - Report job status, results and result caching
+    """
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        Index("ix_report_jobs_cache_key_submitted_at", "cache_key", "submitted_at"),  # Reuse and dedupe
+        Index("ix_report_jobs_finished_at", "finished_at"),                           # Retention purge
+    )
+
+    id = Column(String(32), primary_key=True, nullable=False)
+    report_type = Column(String(50), nullable=False)
+    params = Column(JSONB, nullable=False)                # Normalised report parameters
+    cache_key = Column(String(64), nullable=False)        # sha256 of report type, params and data version
+    status = Column(String(10), nullable=False)           # queued, running, completed, failed
+    result = Column(JSONB)
+    error = Column(Text)
+    error_status = Column(SmallInteger)                   # HTTP status a rejected report raised
+    submitted_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    started_at = Column(TIMESTAMP(timezone=True))
+    finished_at = Column(TIMESTAMP(timezone=True))
+
 # Configure relationships after all models are defined
 Item.addon_groups = relationship("ItemAddonGroup", back_populates="item")
 ItemAddonGroup.item = relationship("Item", back_populates="addon_groups")
\ No newline at end of file
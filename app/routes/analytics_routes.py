@@ -1,17 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, desc
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 from decimal import Decimal
+import json
+
+import numpy as np
 
 from ..shared.database import get_db
 from ..shared.api_key_route import verify_api_key
 from ..models import (
     User, Vendor, Rider, Order, OrderItem, Item, OrderStatus,
-    RiderStatus, VendorWallet, UserWallet, RiderWallet, WalletTransaction
+    RiderStatus, VendorWallet, UserWallet, RiderWallet
 )
+from ..services.analytics_engine import OrderFrame, TransactionFrame
+from ..services.report_jobs import COMPLETED, DONE_STATUSES, job_to_dict, report_jobs
+from ..services.rollups import ACTIVE_STATUSES, OrderRollups, trailing_window
+from ..services.timeseries import GRANULARITIES, TimeSeriesQuery, trailing_buckets
 
 
 router = APIRouter(
@@ -19,6 +27,12 @@ router = APIRouter(
     tags=["analytics"]
 )
 
+# Upper bound on buckets per growth-trends request (two years of days)
+MAX_TREND_PERIODS = 731
+
+# How often a report job stream sends a comment while the job runs
+JOB_STREAM_KEEPALIVE_SECONDS = 15
+
 
 class AdminDashboardStats(BaseModel):
     total_users: int
@@ -67,7 +81,7 @@ class RiderPerformance(BaseModel):
 
 
 @router.get("/admin/dashboard", response_model=AdminDashboardStats)
-async def get_admin_dashboard(
+def get_admin_dashboard(
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_api_key)
 ):
@@ -83,41 +97,24 @@ async def get_admin_dashboard(
     total_vendors = db.query(Vendor).count()
     total_riders = db.query(Rider).count()
     
-    # Today's metrics
-    today_orders = db.query(Order).filter(
-        and_(
-            Order.created_at >= today_start,
-            Order.created_at < today_end
-        )
-    ).all()
-    
-    total_orders_today = len(today_orders)
+    # Today's and last month's order metrics from the hourly rollups
+    rollups = OrderRollups(db)
+    total_orders_today = rollups.totals(today_start, today_end).order_count
     
     # Calculate today's revenue (completed orders only)
-    completed_today = [o for o in today_orders if o.status == OrderStatus.DELIVERED]
-    total_revenue_today = sum(float(order.total_amount) for order in completed_today)
+    total_revenue_today = float(rollups.totals(today_start, today_end, statuses=[OrderStatus.DELIVERED]).revenue)
     
-    # Platform commission (5% of revenue)
-    platform_commission_today = total_revenue_today * 0.05
+    # Platform commission at each vendor's commission rate
+    platform_commission_today = rollups.commission(today_start, today_end, statuses=[OrderStatus.DELIVERED])
     
     # Active orders count
     active_orders = db.query(Order).filter(
-        Order.status.in_([
-            OrderStatus.PENDING,
-            OrderStatus.ACCEPTED,
-            OrderStatus.PREPARING,
-            OrderStatus.READY_FOR_PICKUP,
-            OrderStatus.IN_TRANSIT
-        ])
+        Order.status.in_(ACTIVE_STATUSES)
     ).count()
     
     # Growth metrics (compare with last month)
-    last_month_orders = db.query(Order).filter(
-        and_(
-            Order.created_at >= last_month_start,
-            Order.created_at < today_start
-        )
-    ).count()
+    last_month_orders = rollups.totals(last_month_start, today_start).order_count
+    last_month_revenue = float(rollups.totals(last_month_start, today_start, statuses=[OrderStatus.DELIVERED]).revenue)
     
     last_month_users = db.query(User).filter(
         User.created_at < today_start
@@ -125,11 +122,12 @@ async def get_admin_dashboard(
     
     user_growth = ((total_users - last_month_users) / last_month_users * 100) if last_month_users > 0 else 0
     order_growth = ((total_orders_today - (last_month_orders / 30)) / (last_month_orders / 30) * 100) if last_month_orders > 0 else 0
+    revenue_growth = ((total_revenue_today - (last_month_revenue / 30)) / (last_month_revenue / 30) * 100) if last_month_revenue > 0 else 0
     
     growth_metrics = {
         "user_growth_percentage": round(user_growth, 2),
         "order_growth_percentage": round(order_growth, 2),
-        "revenue_growth_percentage": 15.3  # Placeholder
+        "revenue_growth_percentage": round(revenue_growth, 2)
     }
     
     return AdminDashboardStats(
@@ -145,85 +143,60 @@ async def get_admin_dashboard(
 
 
 @router.get("/sales-report", response_model=SalesReport)
-async def generate_sales_report(
+def generate_sales_report(
     period_days: int = 30,
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_api_key)
 ):
     """Generate comprehensive sales report"""
     
-    # Date range
+    # Date range, aligned to the hourly rollup buckets
     end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=period_days)
-    
-    # Get orders in period
-    orders = db.query(Order).filter(
-        and_(
-            Order.created_at >= start_date,
-            Order.created_at <= end_date
-        )
-    ).all()
+    start_date = trailing_window(period_days, end_date)
     
-    completed_orders = [o for o in orders if o.status == OrderStatus.DELIVERED]
+    rollups = OrderRollups(db)
+    delivered = [OrderStatus.DELIVERED]
+    totals = rollups.totals(start_date, statuses=delivered)
     
     # Basic metrics
-    total_orders = len(completed_orders)
-    total_revenue = sum(float(order.total_amount) for order in completed_orders)
-    total_commission = total_revenue * 0.05  # 5% platform commission
+    total_orders = totals.order_count
+    total_revenue = float(totals.revenue)
+    total_commission = rollups.commission(start_date, statuses=delivered)  # At each vendor's commission rate
     average_order_value = total_revenue / total_orders if total_orders > 0 else 0
     
     # Top performing vendors
-    vendor_performance = db.query(
-        Vendor.id,
-        Vendor.name,
-        func.count(Order.id).label('order_count'),
-        func.sum(Order.total_amount).label('total_revenue'),
-        func.avg(Order.total_amount).label('avg_order_value')
-    ).join(Order, Vendor.id == Order.vendor_id).filter(
-        and_(
-            Order.created_at >= start_date,
-            Order.created_at <= end_date,
-            Order.status == OrderStatus.DELIVERED
-        )
-    ).group_by(Vendor.id, Vendor.name).order_by(
-        desc(func.sum(Order.total_amount))
-    ).limit(10).all()
-    
     top_vendors = []
-    for vendor in vendor_performance:
+    for vendor in rollups.by_vendor(start_date, statuses=delivered, limit=10):
         top_vendors.append({
-            "vendor_id": vendor.id,
-            "vendor_name": vendor.name,
+            "vendor_id": vendor.vendor_id,
+            "vendor_name": vendor.vendor_name,
             "total_orders": vendor.order_count,
-            "total_revenue": float(vendor.total_revenue),
-            "average_order_value": float(vendor.avg_order_value)
+            "total_revenue": float(vendor.revenue),
+            "average_order_value": float(vendor.revenue) / vendor.order_count
         })
     
     # Order trends (daily)
+    daily = rollups.by_day(start_date, statuses=delivered)
     order_trends = []
-    for i in range(period_days):
-        date = start_date + timedelta(days=i)
-        date_end = date + timedelta(days=1)
-        
-        daily_orders = [o for o in completed_orders if date <= o.created_at < date_end]
-        daily_count = len(daily_orders)
-        daily_revenue = sum(float(order.total_amount) for order in daily_orders)
-        
+    day = start_date.date()
+    while day <= end_date.date():
+        daily_count, daily_revenue = daily.get(day.isoformat(), (0, 0.0))
         order_trends.append({
-            "date": date.strftime("%Y-%m-%d"),
+            "date": day.isoformat(),
             "orders": daily_count,
             "revenue": daily_revenue
         })
+        day += timedelta(days=1)
     
     # Revenue breakdown
-    delivery_revenue = sum(float(order.delivery_fee or 0) for order in completed_orders)
+    delivery_revenue = float(totals.delivery_fees)
     food_revenue = total_revenue - delivery_revenue
     
     revenue_breakdown = {
         "food_revenue": food_revenue,
         "delivery_revenue": delivery_revenue,
         "platform_commission": total_commission,
-        "vendor_earnings": total_revenue - total_commission
+        "vendor_earnings": food_revenue - total_commission
     }
     
     return SalesReport(
@@ -239,7 +212,7 @@ async def generate_sales_report(
 
 
 @router.get("/vendor-performance", response_model=List[VendorPerformance])
-async def get_vendor_performance_metrics(
+def get_vendor_performance_metrics(
     period_days: int = 30,
     limit: int = 50,
     db: Session = Depends(get_db),
@@ -248,70 +221,40 @@ async def get_vendor_performance_metrics(
     """Get vendor performance rankings and metrics"""
     
     # Date range
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=period_days)
+    start_date = datetime.utcnow() - timedelta(days=period_days)
     
-    # Get vendor performance data
-    vendor_stats = db.query(
-        Vendor.id,
-        Vendor.name,
-        func.count(Order.id).label('total_orders'),
-        func.sum(Order.total_amount).label('total_revenue'),
-        func.avg(Order.total_amount).label('avg_order_value'),
-        func.count(func.case([(Order.status == OrderStatus.DELIVERED, 1)])).label('completed_orders'),
-        func.count(func.case([(Order.status == OrderStatus.CANCELLED, 1)])).label('cancelled_orders')
-    ).outerjoin(Order, and_(
-        Vendor.id == Order.vendor_id,
-        Order.created_at >= start_date,
-        Order.created_at <= end_date
-    )).group_by(Vendor.id, Vendor.name).all()
-    
-    vendor_performances = []
-    
-    for i, vendor_stat in enumerate(vendor_stats):
-        if vendor_stat.total_orders == 0:
-            continue
-            
-        total_orders = vendor_stat.total_orders or 0
-        completed_orders = vendor_stat.completed_orders or 0
-        cancelled_orders = vendor_stat.cancelled_orders or 0
-        
-        # Calculate completion rate
-        completion_rate = (completed_orders / total_orders * 100) if total_orders > 0 else 0
-        
-        # Calculate performance score (weighted)
-        revenue_score = min(float(vendor_stat.total_revenue or 0) / 1000, 100)  # Max 100 for $1000+
-        order_score = min(total_orders * 2, 100)  # Max 100 for 50+ orders
-        completion_score = completion_rate
-        
-        performance_score = (revenue_score * 0.4 + order_score * 0.3 + completion_score * 0.3)
-        
-        vendor_performances.append({
-            "vendor_id": vendor_stat.id,
-            "vendor_name": vendor_stat.name,
-            "total_orders": total_orders,
-            "total_revenue": float(vendor_stat.total_revenue or 0),
-            "average_order_value": float(vendor_stat.avg_order_value or 0),
-            "completion_rate": completion_rate,
-            "average_rating": 4.3,  # Placeholder - would calculate from reviews
-            "performance_score": performance_score
-        })
+    # One columnar pass over the period's orders
+    vendor_stats = OrderFrame.load(db, start_date).by_vendor()
     
-    # Sort by performance score and add ranks
-    vendor_performances.sort(key=lambda x: x["performance_score"], reverse=True)
+    # Performance score (weighted), vectorised over all vendors
+    revenue_score = np.minimum(vendor_stats["revenue"] / 1000, 100)  # Max 100 for $1000+
+    order_score = np.minimum(vendor_stats["total_orders"] * 2, 100)  # Max 100 for 50+ orders
+    completion_score = vendor_stats["completion_rate"]
+    vendor_stats["performance_score"] = revenue_score * 0.4 + order_score * 0.3 + completion_score * 0.3
     
-    performance_results = []
-    for i, vendor in enumerate(vendor_performances[:limit]):
-        performance_results.append(VendorPerformance(
-            **vendor,
-            rank=i + 1
-        ))
+    top_vendors = vendor_stats.nlargest(limit, "performance_score")
+    vendor_names = dict(
+        db.query(Vendor.id, Vendor.name).filter(Vendor.id.in_(top_vendors.index.tolist())).all()
+    )
     
-    return performance_results
+    return [
+        VendorPerformance(
+            vendor_id=int(vendor_id),
+            vendor_name=vendor_names.get(vendor_id, ""),
+            total_orders=int(stat.total_orders),
+            total_revenue=float(stat.revenue),
+            average_order_value=float(stat.average_order_value),
+            completion_rate=float(stat.completion_rate),
+            average_rating=4.3,  # Placeholder - would calculate from reviews
+            performance_score=float(stat.performance_score),
+            rank=rank
+        )
+        for rank, (vendor_id, stat) in enumerate(top_vendors.iterrows(), start=1)
+    ]
 
 
 @router.get("/rider-performance", response_model=List[RiderPerformance])
-async def get_rider_performance_metrics(
+def get_rider_performance_metrics(
     period_days: int = 30,
     limit: int = 50,
     db: Session = Depends(get_db),
@@ -320,67 +263,40 @@ async def get_rider_performance_metrics(
     """Get rider performance rankings and metrics"""
     
     # Date range
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=period_days)
+    start_date = datetime.utcnow() - timedelta(days=period_days)
     
-    # Get rider performance data
-    rider_stats = db.query(
-        Rider.id,
-        Rider.full_name,
-        func.count(Order.id).label('total_deliveries'),
-        func.count(func.case([(Order.status == OrderStatus.DELIVERED, 1)])).label('completed_deliveries'),
-        func.sum(Order.delivery_fee).label('total_earnings')
-    ).outerjoin(Order, and_(
-        Rider.id == Order.rider_id,
-        Order.created_at >= start_date,
-        Order.created_at <= end_date
-    )).group_by(Rider.id, Rider.full_name).all()
-    
-    rider_performances = []
-    
-    for rider_stat in rider_stats:
-        if rider_stat.total_deliveries == 0:
-            continue
-            
-        total_deliveries = rider_stat.total_deliveries or 0
-        completed_deliveries = rider_stat.completed_deliveries or 0
-        
-        # Calculate completion rate
-        completion_rate = (completed_deliveries / total_deliveries * 100) if total_deliveries > 0 else 0
-        
-        # Calculate performance score
-        delivery_score = min(total_deliveries * 2, 100)  # Max 100 for 50+ deliveries
-        completion_score = completion_rate
-        rating_score = 85  # Placeholder - would calculate from customer ratings
-        
-        performance_score = (delivery_score * 0.4 + completion_score * 0.35 + rating_score * 0.25)
-        
-        rider_performances.append({
-            "rider_id": rider_stat.id,
-            "rider_name": rider_stat.full_name,
-            "total_deliveries": total_deliveries,
-            "completion_rate": completion_rate,
-            "average_delivery_time": 22.5,  # Placeholder - would calculate actual times
-            "total_earnings": float(rider_stat.total_earnings or 0),
-            "customer_rating": 4.4,  # Placeholder
-            "performance_score": performance_score
-        })
+    # One columnar pass over the period's orders
+    rider_stats = OrderFrame.load(db, start_date).by_rider()
     
-    # Sort by performance score and add ranks
-    rider_performances.sort(key=lambda x: x["performance_score"], reverse=True)
+    # Performance score, vectorised over all riders
+    delivery_score = np.minimum(rider_stats["total_orders"] * 2, 100)  # Max 100 for 50+ deliveries
+    completion_score = rider_stats["completion_rate"]
+    rating_score = 85  # Placeholder - would calculate from customer ratings
+    rider_stats["performance_score"] = delivery_score * 0.4 + completion_score * 0.35 + rating_score * 0.25
     
-    performance_results = []
-    for i, rider in enumerate(rider_performances[:limit]):
-        performance_results.append(RiderPerformance(
-            **rider,
-            rank=i + 1
-        ))
+    top_riders = rider_stats.nlargest(limit, "performance_score")
+    rider_names = dict(
+        db.query(Rider.id, Rider.full_name).filter(Rider.id.in_(top_riders.index.tolist())).all()
+    )
     
-    return performance_results
+    return [
+        RiderPerformance(
+            rider_id=int(rider_id),
+            rider_name=rider_names.get(rider_id, ""),
+            total_deliveries=int(stat.total_orders),
+            completion_rate=float(stat.completion_rate),
+            average_delivery_time=0.0 if np.isnan(stat.average_delivery_minutes) else float(stat.average_delivery_minutes),
+            total_earnings=float(stat.earnings),
+            customer_rating=4.4,  # Placeholder
+            performance_score=float(stat.performance_score),
+            rank=rank
+        )
+        for rank, (rider_id, stat) in enumerate(top_riders.iterrows(), start=1)
+    ]
 
 
 @router.get("/popular-items")
-async def get_popular_items_report(
+def get_popular_items_report(
     period_days: int = 30,
     limit: int = 20,
     db: Session = Depends(get_db),
@@ -396,7 +312,7 @@ async def get_popular_items_report(
     popular_items = db.query(
         Item.id,
         Item.name,
-        Item.price,
+        Item.base_price,
         Vendor.name.label('vendor_name'),
         func.count(OrderItem.id).label('order_count'),
         func.sum(OrderItem.quantity).label('total_quantity'),
@@ -410,7 +326,7 @@ async def get_popular_items_report(
              Order.created_at <= end_date,
              Order.status == OrderStatus.DELIVERED
          )
-     ).group_by(Item.id, Item.name, Item.price, Vendor.name)\
+     ).group_by(Item.id, Item.name, Item.base_price, Vendor.name)\
       .order_by(desc(func.sum(OrderItem.quantity)))\
       .limit(limit).all()
     
@@ -421,7 +337,7 @@ async def get_popular_items_report(
             "item_id": item.id,
             "item_name": item.name,
             "vendor_name": item.vendor_name,
-            "price": float(item.price),
+            "price": float(item.base_price),
             "times_ordered": item.order_count,
             "total_quantity_sold": item.total_quantity,
             "total_revenue": float(item.total_revenue),
@@ -436,7 +352,7 @@ async def get_popular_items_report(
 
 
 @router.get("/financial-overview")
-async def get_financial_overview(
+def get_financial_overview(
     period_days: int = 30,
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_api_key)
@@ -452,22 +368,26 @@ async def get_financial_overview(
     total_vendor_wallet_balance = db.query(func.sum(VendorWallet.balance)).scalar() or 0
     total_rider_wallet_balance = db.query(func.sum(RiderWallet.balance)).scalar() or 0
     
-    # Get transaction volumes
-    period_transactions = db.query(WalletTransaction).filter(
-        and_(
-            WalletTransaction.created_at >= start_date,
-            WalletTransaction.created_at <= end_date
-        )
-    ).all()
+    # Transaction volumes from one columnar pass over the period
+    transactions = TransactionFrame.load(db, start_date, end_date)
+    volumes = transactions.volume_by_type()
     
     # Calculate transaction metrics
-    total_transaction_volume = sum(float(t.amount) for t in period_transactions)
-    deposit_volume = sum(float(t.amount) for t in period_transactions if t.transaction_type.value == "deposit")
-    payment_volume = sum(float(t.amount) for t in period_transactions if t.transaction_type.value == "payment")
-    withdrawal_volume = sum(float(t.amount) for t in period_transactions if t.transaction_type.value == "withdrawal")
+    total_transaction_volume = sum(volumes.values())
+    deposit_volume = volumes["deposit"]
+    payment_volume = volumes["payment"]
+    withdrawal_volume = volumes["withdrawal"]
+    
+    # Platform revenue: commission on orders delivered in the period, at each vendor's rate
+    commission_revenue = OrderRollups(db).commission(
+        trailing_window(period_days, end_date), statuses=[OrderStatus.DELIVERED]
+    )
     
-    # Platform revenue (commissions)
-    commission_revenue = payment_volume * 0.05  # 5% commission
+    # Daily volume
+    daily_volume = [
+        {"date": day.date().isoformat(), "transactions": int(row.transactions), "volume": float(row.volume)}
+        for day, row in transactions.daily().iterrows()
+    ]
     
     return {
         "period": f"Last {period_days} days",
@@ -482,7 +402,8 @@ async def get_financial_overview(
             "deposit_volume": deposit_volume,
             "payment_volume": payment_volume,
             "withdrawal_volume": withdrawal_volume,
-            "transaction_count": len(period_transactions)
+            "transaction_count": len(transactions),
+            "daily_volume": daily_volume
         },
         "revenue_metrics": {
             "platform_commission_earned": commission_revenue,
@@ -493,81 +414,160 @@ async def get_financial_overview(
 
 
 @router.get("/growth-trends")
-async def get_growth_trends(
+def get_growth_trends(
+    granularity: str = "month",
+    periods: int = 12,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_api_key)
 ):
-    """Get platform growth trends over time"""
-    
-    # Get data for last 12 months
-    months_data = []
-    current_date = datetime.utcnow()
-    
-    for i in range(12):
-        # Calculate month boundaries
-        month_end = current_date.replace(day=1) - timedelta(days=i*30)
-        month_start = month_end - timedelta(days=30)
-        
-        # Count users, vendors, riders joined in this month
-        users_joined = db.query(User).filter(
-            and_(
-                User.created_at >= month_start,
-                User.created_at < month_end
-            )
-        ).count()
-        
-        vendors_joined = db.query(Vendor).filter(
-            and_(
-                Vendor.created_at >= month_start,
-                Vendor.created_at < month_end
-            )
-        ).count()
-        
-        riders_joined = db.query(Rider).filter(
-            and_(
-                Rider.created_at >= month_start,
-                Rider.created_at < month_end
-            )
-        ).count()
-        
-        # Count orders in this month
-        orders_count = db.query(Order).filter(
-            and_(
-                Order.created_at >= month_start,
-                Order.created_at < month_end,
-                Order.status == OrderStatus.DELIVERED
-            )
-        ).count()
-        
-        # Calculate revenue
-        month_orders = db.query(Order).filter(
-            and_(
-                Order.created_at >= month_start,
-                Order.created_at < month_end,
-                Order.status == OrderStatus.DELIVERED
-            )
-        ).all()
-        
-        revenue = sum(float(order.total_amount) for order in month_orders)
-        
-        months_data.append({
-            "month": month_start.strftime("%Y-%m"),
-            "users_joined": users_joined,
-            "vendors_joined": vendors_joined,
-            "riders_joined": riders_joined,
-            "orders_completed": orders_count,
-            "revenue": revenue
-        })
+    """
+    Get platform growth trends over time.
+
+    Buckets are calendar days, ISO weeks or calendar months (UTC). By default
+    the last `periods` complete buckets; start_date/end_date select any range.
+    """
+    
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"granularity must be one of: {', '.join(GRANULARITIES)}"
+        )
+    if not 0 < periods <= MAX_TREND_PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"periods must be between 1 and {MAX_TREND_PERIODS}"
+        )
+    
+    default_start, default_end = trailing_buckets(granularity, periods)
+    series = TimeSeriesQuery(db, granularity, start_date or default_start, end_date or default_end, MAX_TREND_PERIODS)
+    if not 0 < len(series.buckets) <= MAX_TREND_PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range must cover between 1 and {MAX_TREND_PERIODS} periods"
+        )
     
-    # Reverse to get chronological order
-    months_data.reverse()
+    # One grouped query per entity for the whole range
+    users_joined = series.counts(User.created_at)
+    vendors_joined = series.counts(Vendor.created_at)
+    riders_joined = series.counts(Rider.created_at)
+    completed = series.order_rollups([OrderStatus.DELIVERED])
+    
+    growth_data = series.rows(
+        users_joined=users_joined,
+        vendors_joined=vendors_joined,
+        riders_joined=riders_joined,
+        orders_completed={bucket: count for bucket, (count, _) in completed.items()},
+        revenue={bucket: revenue for bucket, (_, revenue) in completed.items()}
+    )
     
+    total_periods = len(growth_data)
     return {
-        "growth_data": months_data,
+        "granularity": granularity,
+        "growth_data": growth_data,
         "summary": {
-            "total_months": 12,
-            "avg_monthly_users": sum(m["users_joined"] for m in months_data) / 12,
-            "avg_monthly_orders": sum(m["orders_completed"] for m in months_data) / 12,
-            "avg_monthly_revenue": sum(m["revenue"] for m in months_data) / 12
+            "total_periods": total_periods,
+            "avg_users_per_period": sum(row["users_joined"] for row in growth_data) / total_periods,
+            "avg_orders_per_period": sum(row["orders_completed"] for row in growth_data) / total_periods,
+            "avg_revenue_per_period": sum(row["revenue"] for row in growth_data) / total_periods
         }
-    }
\ No newline at end of file
+    }
+
+
+# ==================
+# REPORT JOBS
+# ==================
+
+class PeriodReportParams(BaseModel):
+    period_days: int = Field(30, ge=1, le=3650)
+
+
+class RankingReportParams(PeriodReportParams):
+    limit: int = Field(50, ge=1, le=500)
+
+
+class GrowthTrendsParams(BaseModel):
+    granularity: str = "month"
+    periods: int = Field(12, ge=1, le=MAX_TREND_PERIODS)
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+
+class ReportJobRequest(BaseModel):
+    report_type: str
+    params: Dict[str, Any] = {}
+
+
+report_jobs.register("sales-report", generate_sales_report, PeriodReportParams)
+report_jobs.register("vendor-performance", get_vendor_performance_metrics, RankingReportParams)
+report_jobs.register("rider-performance", get_rider_performance_metrics, RankingReportParams)
+report_jobs.register("financial-overview", get_financial_overview, PeriodReportParams)
+report_jobs.register("growth-trends", get_growth_trends, GrowthTrendsParams)
+
+
+async def _get_report_job(job_id: str, wait: float = 0):
+    job = await report_jobs.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Report job {job_id} not found")
+    return job
+
+
+@router.post("/reports/jobs", status_code=status.HTTP_202_ACCEPTED)
+def submit_report_job(
+    spec: ReportJobRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(verify_api_key)
+):
+    """
+    Queue a report to run in the background.
+
+    Returns a job id to poll or stream. Results are cached per report type,
+    parameters and data version, so a repeat request for unchanged data
+    comes back already completed.
+    """
+    try:
+        return report_jobs.submit(db, spec.report_type, spec.params)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+
+@router.get("/reports/jobs/{job_id}")
+async def get_report_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for the job to finish"),
+    current_user: dict = Depends(verify_api_key)
+):
+    """Job status, with the result once completed; wait > 0 long-polls"""
+    return job_to_dict(await _get_report_job(job_id, wait))
+
+
+@router.get("/reports/jobs/{job_id}/stream")
+async def stream_report_job(
+    job_id: str,
+    request: Request,
+    current_user: dict = Depends(verify_api_key)
+):
+    """Server-Sent Events: a "status" event now, then one "result" or "error" event when the job ends"""
+    job = await _get_report_job(job_id)
+
+    async def events():
+        yield f"event: status\ndata: {json.dumps(job_to_dict(job, include_result=False), default=str)}\n\n"
+        current = job
+        while current.status not in DONE_STATUSES:
+            current = await report_jobs.wait(job_id, JOB_STREAM_KEEPALIVE_SECONDS)
+            if current is None:
+                return
+            if current.status in DONE_STATUSES:
+                break
+            if await request.is_disconnected():
+                return
+            yield ": keep-alive\n\n"
+        event = "result" if current.status == COMPLETED else "error"
+        yield f"event: {event}\ndata: {json.dumps(job_to_dict(current), default=str)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,15 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import Optional, List
 from decimal import Decimal
 from pydantic import BaseModel
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 
 from ..shared.database import get_db
 from ..shared.api_key_route import verify_api_key
 from ..schemas import OrderResponse
-from ..models import Order, OrderItem, Item, Vendor, User, Rider, OrderStatus
+from ..models import Order, OrderItem, OrderTracking, Item, Vendor, User, Rider, OrderStatus
 from ..services.queries import GetOrderByIdQuery, GetOrderByIdQueryHandler
+from ..services.eta import eta_engine
+from ..services.location_store import rider_location_store
+from ..services.tracking_hub import publish_order_status
+from ..services.trajectory import trajectory_recorder
 
 
 router = APIRouter(
@@ -223,72 +228,70 @@ async def get_delivery_estimate(
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_api_key)
 ):
-    """Get estimated delivery time for an order"""
+    """Get estimated delivery time for an order from learned prep times and zone speeds"""
     
     query_handler = GetOrderByIdQueryHandler(db)
     order = query_handler.handle(GetOrderByIdQuery(order_id=order_id))
     
-    # Calculate estimates based on order status
-    current_time = datetime.utcnow()
+    # Time spent in the current stage counts against that stage's estimate
+    stage_started_at = db.query(func.max(OrderTracking.created_at)).filter(
+        OrderTracking.order_id == order_id
+    ).scalar()
+    
+    rider_position = None
+    if order.rider_id:
+        fix = rider_location_store.latest(order.rider_id)
+        if fix:
+            rider_position = (fix.latitude, fix.longitude)
+        elif order.rider and order.rider.current_latitude is not None:
+            rider_position = (order.rider.current_latitude, order.rider.current_longitude)
+    
+    eta_engine.ensure_fresh(db)
+    current_time = datetime.now(timezone.utc)
+    estimate = eta_engine.estimate_order(order, stage_started_at, rider_position, current_time)
+    
+    prep_time = round(estimate.accept_minutes + estimate.prep_minutes)
+    travel_time = round(estimate.pickup_minutes + estimate.travel_minutes)
+    total_time = round(estimate.total_minutes)
     
     if order.status == OrderStatus.PENDING:
-        prep_time = 20  # minutes
-        travel_time = 15
-        total_time = prep_time + travel_time
         status_updates = [
             "Order received",
             "Waiting for vendor confirmation",
-            "Estimated preparation time: 20 minutes",
-            "Estimated delivery: 35 minutes"
+            f"Estimated preparation time: {prep_time} minutes",
+            f"Estimated delivery: {total_time} minutes"
         ]
     elif order.status == OrderStatus.ACCEPTED:
-        prep_time = 18
-        travel_time = 15
-        total_time = prep_time + travel_time
         status_updates = [
             "Order confirmed by vendor",
             "Preparing your order",
             "Finding delivery rider",
-            "Estimated delivery: 33 minutes"
+            f"Estimated delivery: {total_time} minutes"
         ]
     elif order.status == OrderStatus.PREPARING:
-        prep_time = 10  # remaining
-        travel_time = 15
-        total_time = prep_time + travel_time
         status_updates = [
             "Order is being prepared",
             "Almost ready for pickup",
-            "Estimated delivery: 25 minutes"
+            f"Estimated delivery: {total_time} minutes"
         ]
     elif order.status == OrderStatus.READY_FOR_PICKUP:
-        prep_time = 0
-        travel_time = 12
-        total_time = travel_time
         status_updates = [
             "Order ready for pickup",
             "Assigning delivery rider",
-            "Estimated delivery: 12 minutes"
+            f"Estimated delivery: {total_time} minutes"
         ]
     elif order.status == OrderStatus.IN_TRANSIT:
-        prep_time = 0
-        travel_time = 8  # remaining
-        total_time = travel_time
         status_updates = [
             "Order picked up",
             "On the way to delivery",
-            "Estimated delivery: 8 minutes"
+            f"Estimated delivery: {total_time} minutes"
         ]
     else:
-        prep_time = 0
-        travel_time = 0
-        total_time = 0
         status_updates = ["Order delivered"]
     
-    estimated_delivery_time = current_time + timedelta(minutes=total_time)
-    
     return DeliveryEstimate(
         estimated_minutes=total_time,
-        estimated_delivery_time=estimated_delivery_time,
+        estimated_delivery_time=estimate.arrival(current_time),
         preparation_time=prep_time,
         travel_time=travel_time,
         status_updates=status_updates
@@ -327,7 +330,9 @@ async def cancel_order(
     # Update order status
     order.status = OrderStatus.CANCELLED
     order.updated_at = datetime.utcnow()
+    trajectory_recorder.finish(db, order.id)
     db.commit()
+    publish_order_status(order)
     
     # Process refund (simplified - would integrate with payment processor)
     if cancellation_request.refund_to_wallet and refund_amount > 0:
@@ -3,15 +3,16 @@ from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime
-from decimal import Decimal
 from uuid import uuid4
 
 from ..shared.database import get_db
 from ..shared.api_key_route import verify_api_key
 from ..models import (
-    Order, User, UserWallet, VendorWallet, RiderWallet,
+    Order, User, UserWallet, RiderWallet,
     WalletTransaction, WalletTransactionType, WalletTransactionStatus
 )
+from ..services.ledger import wallet_ledger, LedgerError
+from ..shared.money import Amount, Money
 
 
 router = APIRouter(
@@ -33,7 +34,7 @@ class PaymentRequest(BaseModel):
     order_id: int
     payment_method_id: str
     payment_type: str  # "credit_card", "wallet", "cash_on_delivery"
-    amount: float
+    amount: Money
     currency: str = "USD"
     save_payment_method: bool = False
 
@@ -41,24 +42,24 @@ class PaymentRequest(BaseModel):
 class PaymentResponse(BaseModel):
     payment_id: str
     status: str  # "pending", "processing", "completed", "failed"
-    amount: float
+    amount: Money
     currency: str
     payment_method: str
-    transaction_fee: float
+    transaction_fee: Money
     created_at: datetime
     order_id: int
 
 
 class RefundRequest(BaseModel):
     reason: str
-    amount: Optional[float] = None  # Partial refund if specified
+    amount: Optional[Money] = None  # Partial refund if specified
     refund_to_wallet: bool = True
 
 
 class RefundResponse(BaseModel):
     refund_id: str
     status: str
-    amount: float
+    amount: Money
     original_payment_id: str
     processing_time: str
     refund_method: str
@@ -80,68 +81,45 @@ async def process_payment(
             detail="Order not found"
         )
     
-    # Validate payment amount matches order total
-    order_total = float(order.total_amount)
-    if abs(payment_request.amount - order_total) > 0.01:  # Allow small floating point differences
+    # Validate payment amount matches order total; both are whole minor units
+    if payment_request.amount != order.total:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Payment amount {payment_request.amount} doesn't match order total {order_total}"
+            detail=f"Payment amount {payment_request.amount} doesn't match order total {order.total}"
         )
     
     payment_id = str(uuid4())
-    transaction_fee = 0.0
+    transaction_fee = Amount(0)
     
     try:
         if payment_request.payment_type == "wallet":
-            # Process wallet payment
-            user_wallet = db.query(UserWallet).filter(UserWallet.user_id == order.user_id).first()
-            
-            if not user_wallet:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User wallet not found"
-                )
-            
-            if float(user_wallet.balance) < payment_request.amount:
+            # Deduct from user wallet
+            try:
+                change = wallet_ledger.debit(db, "user", order.user_id, payment_request.amount)
+            except LedgerError as error:
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Insufficient wallet balance"
+                    status_code=status.HTTP_404_NOT_FOUND if error.reason == LedgerError.NOT_FOUND
+                    else status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        LedgerError.NOT_FOUND: "User wallet not found",
+                        LedgerError.INACTIVE: "Wallet is not available",
+                        LedgerError.LOCKED: "Wallet is not available",
+                        LedgerError.INSUFFICIENT: "Insufficient wallet balance",
+                    }[error.reason]
                 )
             
-            # Deduct from user wallet
-            user_wallet.balance -= Decimal(str(payment_request.amount))
-            
             # Create wallet transaction
-            transaction = WalletTransaction(
-                wallet_type="user",
-                wallet_id=user_wallet.id,
+            transaction = wallet_ledger.entry(
+                change,
                 transaction_type=WalletTransactionType.PAYMENT,
-                amount=Decimal(str(payment_request.amount)),
+                amount=payment_request.amount,
                 status=WalletTransactionStatus.COMPLETED,
                 description=f"Payment for order #{order.id}",
                 reference_id=payment_id
             )
             db.add(transaction)
             
-            # Add to vendor wallet (minus platform commission)
-            vendor_wallet = db.query(VendorWallet).filter(VendorWallet.vendor_id == order.vendor_id).first()
-            if vendor_wallet:
-                platform_commission = payment_request.amount * 0.05  # 5% commission
-                vendor_amount = payment_request.amount - platform_commission
-                
-                vendor_wallet.balance += Decimal(str(vendor_amount))
-                
-                vendor_transaction = WalletTransaction(
-                    wallet_type="vendor",
-                    wallet_id=vendor_wallet.id,
-                    transaction_type=WalletTransactionType.DEPOSIT,
-                    amount=Decimal(str(vendor_amount)),
-                    status=WalletTransactionStatus.COMPLETED,
-                    description=f"Payment for order #{order.id} (after commission)",
-                    reference_id=payment_id
-                )
-                db.add(vendor_transaction)
-            
+            # Vendor and rider earnings are accrued on delivery and paid out in bulk by the settlement engine
             payment_status = "completed"
         
         elif payment_request.payment_type in ["credit_card", "debit_card"]:
@@ -151,26 +129,6 @@ async def process_payment(
             # In real implementation, you'd integrate with Stripe, PayPal, etc.
             # For simulation, we'll assume success
             payment_status = "completed"
-            
-            # Still need to credit vendor wallet
-            vendor_wallet = db.query(VendorWallet).filter(VendorWallet.vendor_id == order.vendor_id).first()
-            if vendor_wallet:
-                platform_commission = payment_request.amount * 0.05
-                processing_cost = transaction_fee
-                vendor_amount = payment_request.amount - platform_commission - processing_cost
-                
-                vendor_wallet.balance += Decimal(str(vendor_amount))
-                
-                vendor_transaction = WalletTransaction(
-                    wallet_type="vendor",
-                    wallet_id=vendor_wallet.id,
-                    transaction_type=WalletTransactionType.DEPOSIT,
-                    amount=Decimal(str(vendor_amount)),
-                    status=WalletTransactionStatus.COMPLETED,
-                    description=f"Card payment for order #{order.id}",
-                    reference_id=payment_id
-                )
-                db.add(vendor_transaction)
         
         elif payment_request.payment_type == "cash_on_delivery":
             payment_status = "pending"  # Will be completed when delivered
@@ -231,7 +189,7 @@ async def check_payment_status(
     return {
         "payment_id": payment_id,
         "status": transaction.status.value,
-        "amount": float(transaction.amount),
+        "amount": transaction.amount,
         "created_at": transaction.created_at,
         "description": transaction.description
     }
@@ -259,10 +217,9 @@ async def process_refund(
         )
     
     # Determine refund amount
-    refund_amount = refund_request.amount or float(original_transaction.amount)
-    original_amount = float(original_transaction.amount)
+    refund_amount = refund_request.amount or original_transaction.amount
     
-    if refund_amount > original_amount:
+    if refund_amount > original_transaction.amount:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Refund amount cannot exceed original payment"
@@ -273,19 +230,18 @@ async def process_refund(
     try:
         if refund_request.refund_to_wallet:
             # Refund to user wallet
-            if original_transaction.wallet_type == "user":
+            if original_transaction.user_wallet_id is not None:
                 user_wallet = db.query(UserWallet).filter(
-                    UserWallet.id == original_transaction.wallet_id
+                    UserWallet.id == original_transaction.user_wallet_id
                 ).first()
                 
                 if user_wallet:
-                    user_wallet.balance += Decimal(str(refund_amount))
+                    change = wallet_ledger.credit(db, "user", user_wallet.user_id, refund_amount, allow_locked=True)
                     
-                    refund_transaction = WalletTransaction(
-                        wallet_type="user",
-                        wallet_id=user_wallet.id,
+                    refund_transaction = wallet_ledger.entry(
+                        change,
                         transaction_type=WalletTransactionType.REFUND,
-                        amount=Decimal(str(refund_amount)),
+                        amount=refund_amount,
                         status=WalletTransactionStatus.COMPLETED,
                         description=f"Refund for payment {payment_id}: {refund_request.reason}",
                         reference_id=refund_id
@@ -449,14 +405,14 @@ async def get_transaction_details(
     return {
         "transaction_id": transaction_id,
         "type": transaction.transaction_type.value,
-        "amount": float(transaction.amount),
+        "amount": transaction.amount,
         "status": transaction.status.value,
         "description": transaction.description,
         "created_at": transaction.created_at,
         "wallet_type": transaction.wallet_type,
         "fees": {
             "processing_fee": 0.0,  # Would calculate based on payment method
-            "platform_fee": float(transaction.amount) * 0.05 if transaction.transaction_type == WalletTransactionType.PAYMENT else 0.0
+            "platform_fee": transaction.amount * 0.05 if transaction.transaction_type == WalletTransactionType.PAYMENT else 0.0
         }
     }
 
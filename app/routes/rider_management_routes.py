@@ -4,16 +4,21 @@ from sqlalchemy import func, and_, or_
 from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from math import radians, cos, sin, asin, sqrt
 
 from ..shared.database import get_db
 from ..shared.api_key_route import verify_api_key
 from ..schemas import OrderResponse, RiderResponse
 from ..models import (
     Rider, Order, OrderStatus, RiderStatus, Vendor, User,
-    RiderWallet, WalletTransaction, WalletTransactionType
+    RiderWallet, WalletTransaction, WalletTransactionType,
+    OrderItem, DeliveryAddress
 )
 from ..services.queries import GetRiderByIdQuery, GetRiderByIdQueryHandler
+from ..services.distance_query import DistanceQueryBuilder
+from ..services.location_store import rider_location_store
+from ..services.settlement import SETTLEMENT_REFERENCE
+from ..services.tracking_hub import publish_order_status
+from ..services.trajectory import trajectory_recorder
 
 
 router = APIRouter(
@@ -22,16 +27,6 @@ router = APIRouter(
 )
 
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate distance between two coordinates in kilometers"""
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    return 6371 * c  # Earth's radius in kilometers
-
-
 class AvailableOrderResponse(BaseModel):
     order_id: int
     vendor_name: str
@@ -102,67 +97,70 @@ async def get_available_delivery_orders(
             detail="Rider not found or not available"
         )
     
-    # Get orders ready for pickup
-    available_orders = db.query(Order).join(Vendor, Order.vendor_id == Vendor.id).filter(
+    # Freshest ping first, then the last flushed position
+    fix = rider_location_store.latest(rider_id)
+    rider_latitude = fix.latitude if fix else rider.current_latitude
+    rider_longitude = fix.longitude if fix else rider.current_longitude
+    if rider_latitude is None or rider_longitude is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Rider location not set"
+        )
+    
+    # Item counts for the open pickup pool, aggregated once instead of lazy-loading order.items
+    ready_filter = and_(
         Order.status == OrderStatus.READY_FOR_PICKUP,
         Order.rider_id.is_(None)  # Not yet assigned to a rider
-    ).all()
+    )
+    item_counts = (
+        db.query(OrderItem.order_id, func.count(OrderItem.id).label("items_count"))
+        .join(Order, OrderItem.order_id == Order.id)
+        .filter(ready_filter)
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+    
+    # One round trip: vendor, customer and address columns joined in, nearest pickups first
+    candidates_query = (
+        db.query(
+            Order.id, Order.total, Order.created_at,
+            Vendor.name.label("vendor_name"), Vendor.address.label("vendor_address"),
+            Vendor.latitude.label("vendor_latitude"), Vendor.longitude.label("vendor_longitude"),
+            DeliveryAddress.address.label("delivery_address"),
+            User.full_name.label("customer_name"), User.phone_number.label("customer_phone"),
+            func.coalesce(item_counts.c.items_count, 0).label("items_count")
+        )
+        .join(Vendor, Order.vendor_id == Vendor.id)
+        .join(User, Order.user_id == User.id)
+        .outerjoin(DeliveryAddress, Order.delivery_address_id == DeliveryAddress.id)
+        .outerjoin(item_counts, item_counts.c.order_id == Order.id)
+        .filter(ready_filter)
+    )
+    distance_query = DistanceQueryBuilder(
+        Vendor.latitude, Vendor.longitude, rider_latitude, rider_longitude
+    )
+    rows = distance_query.apply(candidates_query, max_distance).limit(limit).all()
     
-    # Calculate distances and filter
-    nearby_orders = []
-    for order in available_orders:
-        vendor = db.query(Vendor).filter(Vendor.id == order.vendor_id).first()
-        customer = db.query(User).filter(User.id == order.user_id).first()
-        
-        if vendor and vendor.latitude and vendor.longitude:
-            distance = calculate_distance(
-                rider.current_latitude, rider.current_longitude,
-                vendor.latitude, vendor.longitude
-            )
-            
-            if distance <= max_distance:
-                # Count items in order
-                items_count = len(order.items) if order.items else 0
-                
-                # Calculate estimated delivery fee (simplified)
-                base_fee = 3.50
-                distance_fee = distance * 0.50
-                estimated_fee = base_fee + distance_fee
-                
-                nearby_orders.append({
-                    "order": order,
-                    "vendor": vendor,
-                    "customer": customer,
-                    "distance": distance,
-                    "items_count": items_count,
-                    "estimated_fee": estimated_fee
-                })
-    
-    # Sort by distance and limit results
-    nearby_orders.sort(key=lambda x: x["distance"])
-    nearby_orders = nearby_orders[:limit]
-    
-    # Format response
     response_orders = []
-    for order_data in nearby_orders:
-        order = order_data["order"]
-        vendor = order_data["vendor"]
-        customer = order_data["customer"]
+    for row in rows:
+        # Calculate estimated delivery fee (simplified)
+        base_fee = 3.50
+        distance_fee = row.distance * 0.50
         
         response_orders.append(AvailableOrderResponse(
-            order_id=order.id,
-            vendor_name=vendor.name,
-            vendor_address=vendor.address,
-            vendor_latitude=vendor.latitude,
-            vendor_longitude=vendor.longitude,
-            delivery_address=order.delivery_address,
-            customer_name=customer.full_name if customer else "Unknown",
-            customer_phone=customer.phone_number if customer else "Unknown",
-            order_total=float(order.total_amount),
-            distance_to_vendor=order_data["distance"],
-            estimated_delivery_fee=order_data["estimated_fee"],
-            created_at=order.created_at,
-            items_count=order_data["items_count"]
+            order_id=row.id,
+            vendor_name=row.vendor_name,
+            vendor_address=row.vendor_address,
+            vendor_latitude=row.vendor_latitude,
+            vendor_longitude=row.vendor_longitude,
+            delivery_address=row.delivery_address or "",
+            customer_name=row.customer_name,
+            customer_phone=row.customer_phone,
+            order_total=float(row.total),
+            distance_to_vendor=row.distance,
+            estimated_delivery_fee=base_fee + distance_fee,
+            created_at=row.created_at,
+            items_count=row.items_count
         ))
     
     return response_orders
@@ -216,6 +214,8 @@ async def accept_delivery_order(
     rider.status = RiderStatus.BUSY
     
     db.commit()
+    trajectory_recorder.start(order_id, rider_id)
+    publish_order_status(order)
     
     return {
         "message": "Order accepted successfully",
@@ -305,34 +305,21 @@ async def mark_delivery_complete(
             detail="Order not found or not assigned to this rider"
         )
     
-    # Update order status
+    # Update order status and store the route the rider took
     order.status = OrderStatus.DELIVERED
     order.updated_at = datetime.utcnow()
+    trajectory_recorder.finish(db, order.id)
     
     # Update rider status back to available
     rider = db.query(Rider).filter(Rider.id == rider_id).first()
     if rider:
         rider.status = RiderStatus.AVAILABLE
     
-    # Calculate and add delivery fee to rider wallet (simplified)
-    delivery_fee = float(order.delivery_fee) if order.delivery_fee else 3.50
-    rider_wallet = db.query(RiderWallet).filter(RiderWallet.rider_id == rider_id).first()
-    
-    if rider_wallet:
-        rider_wallet.balance += delivery_fee
-        
-        # Create wallet transaction record
-        transaction = WalletTransaction(
-            wallet_type="rider",
-            wallet_id=rider_wallet.id,
-            transaction_type=WalletTransactionType.COMMISSION,
-            amount=delivery_fee,
-            description=f"Delivery fee for order #{order_id}",
-            reference_id=str(order_id)
-        )
-        db.add(transaction)
+    # The delivery fee is accrued to the rider's wallet and paid out in bulk by the settlement engine
+    delivery_fee = float(order.delivery_fee or 0)
     
     db.commit()
+    publish_order_status(order)
     
     return {
         "message": "Delivery completed successfully",
@@ -385,11 +372,13 @@ async def get_rider_earnings(
     if rider_wallet:
         wallet_transactions = db.query(WalletTransaction).filter(
             and_(
-                WalletTransaction.wallet_id == rider_wallet.id,
+                WalletTransaction.rider_wallet_id == rider_wallet.id,
                 WalletTransaction.transaction_type.in_([
                     WalletTransactionType.BONUS,
                     WalletTransactionType.DEPOSIT  # Tips might come as deposits
                 ]),
+                # Settlement payouts are the delivery fees already counted above
+                WalletTransaction.reference_type.is_distinct_from(SETTLEMENT_REFERENCE),
                 WalletTransaction.created_at >= start_date,
                 WalletTransaction.created_at <= end_date
             )
@@ -476,6 +465,8 @@ async def toggle_rider_availability(
     if latitude is not None and longitude is not None:
         rider.current_latitude = latitude
         rider.current_longitude = longitude
+        # Keep the hot store ahead of any older unflushed ping
+        rider_location_store.record(rider_id, latitude, longitude)
     
     rider.updated_at = datetime.utcnow()
     db.commit()
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from math import radians, cos, sin, asin, sqrt
 
 from ..shared.database import get_db
 from ..shared.api_key_route import verify_api_key
 from ..schemas import VendorResponse, ItemResponse
 from ..models import Vendor, Item, ItemCategory, VendorType
 from ..services.queries import GetAllVendorQueryHandler, GetAllVendorQuery
+from ..services.spatial_index import vendor_spatial_index
+from ..services.distance_query import DistanceQueryBuilder
+from ..services.text_search import apply_text_search
 
 
 router = APIRouter(
@@ -16,24 +18,6 @@ router = APIRouter(
 )
 
 
-def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """
-    Calculate the great circle distance between two points 
-    on the earth (specified in decimal degrees)
-    Returns distance in kilometers
-    """
-    # Convert decimal degrees to radians
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    r = 6371  # Radius of earth in kilometers
-    return c * r
-
-
 @router.get("/vendors", response_model=List[VendorResponse])
 async def search_vendors(
     query: str = Query(..., description="Search term for vendor name or description"),
@@ -52,13 +36,11 @@ async def search_vendors(
     # Base query
     vendors_query = db.query(Vendor)
     
-    # Apply filters
+    has_location = latitude is not None and longitude is not None and max_distance is not None
+    
+    # Full-text match on name/description; rank by relevance unless sorting by distance
     if query:
-        search_term = f"%{query.lower()}%"
-        vendors_query = vendors_query.filter(
-            (Vendor.name.ilike(search_term)) | 
-            (Vendor.description.ilike(search_term))
-        )
+        vendors_query = apply_text_search(vendors_query, Vendor.search_vector, query, rank=not has_location)
     
     if vendor_type:
         vendors_query = vendors_query.filter(Vendor.vendor_type == vendor_type)
@@ -66,22 +48,13 @@ async def search_vendors(
     if is_active is not None:
         vendors_query = vendors_query.filter(Vendor.is_active == is_active)
     
-    # Get vendors
-    vendors = vendors_query.offset(skip).limit(limit).all()
-    
-    # Filter by distance if location provided
-    if latitude is not None and longitude is not None and max_distance is not None:
-        filtered_vendors = []
-        for vendor in vendors:
-            if vendor.latitude and vendor.longitude:
-                distance = haversine_distance(latitude, longitude, vendor.latitude, vendor.longitude)
-                if distance <= max_distance:
-                    # Add distance to vendor object for client use
-                    vendor.distance = distance
-                    filtered_vendors.append(vendor)
-        vendors = filtered_vendors
+    # Filter, sort and paginate by distance inside the database if location provided
+    if has_location:
+        distance_query = DistanceQueryBuilder(Vendor.latitude, Vendor.longitude, latitude, longitude)
+        rows = distance_query.apply(vendors_query, max_distance).offset(skip).limit(limit).all()
+        return distance_query.attach_distances(rows)
     
-    return vendors
+    return vendors_query.offset(skip).limit(limit).all()
 
 
 @router.get("/items", response_model=List[ItemResponse])
@@ -102,13 +75,9 @@ async def search_menu_items(
     # Base query with vendor join for active vendor filtering
     items_query = db.query(Item).join(Vendor, Item.vendor_id == Vendor.id)
     
-    # Apply filters
+    # Full-text match on name/description, most relevant first
     if query:
-        search_term = f"%{query.lower()}%"
-        items_query = items_query.filter(
-            (Item.name.ilike(search_term)) | 
-            (Item.description.ilike(search_term))
-        )
+        items_query = apply_text_search(items_query, Item.search_vector, query)
     
     if vendor_id:
         items_query = items_query.filter(Item.vendor_id == vendor_id)
@@ -117,10 +86,10 @@ async def search_menu_items(
         items_query = items_query.filter(Item.category_id == category_id)
     
     if min_price is not None:
-        items_query = items_query.filter(Item.price >= min_price)
+        items_query = items_query.filter(Item.base_price >= min_price)
     
     if max_price is not None:
-        items_query = items_query.filter(Item.price <= max_price)
+        items_query = items_query.filter(Item.base_price <= max_price)
     
     if is_available is not None:
         items_query = items_query.filter(Item.is_available == is_available)
@@ -146,37 +115,28 @@ async def get_nearby_vendors(
 ):
     """Get nearby vendors within specified radius, sorted by distance"""
     
-    # Base query
-    vendors_query = db.query(Vendor)
-    
-    # Apply filters
-    if vendor_type:
-        vendors_query = vendors_query.filter(Vendor.vendor_type == vendor_type)
-    
-    if is_active:
-        vendors_query = vendors_query.filter(Vendor.is_active == is_active)
-    
-    # Get all vendors (we'll filter by distance)
-    all_vendors = vendors_query.all()
+    # Candidate lookup only touches the grid cells around the user
+    vendor_spatial_index.ensure_loaded(db)
+    nearby_hits = vendor_spatial_index.query_radius(
+        latitude, longitude, radius,
+        vendor_type=vendor_type,
+        active_only=is_active
+    )
     
-    # Calculate distances and filter
-    nearby_vendors = []
-    for vendor in all_vendors:
-        if vendor.latitude and vendor.longitude:
-            distance = haversine_distance(latitude, longitude, vendor.latitude, vendor.longitude)
-            if distance <= radius:
-                vendor.distance = distance
-                nearby_vendors.append(vendor)
+    # Apply pagination before loading any vendor rows
+    page_hits = nearby_hits[skip:skip + limit]
+    if not page_hits:
+        return []
     
-    # Sort by distance
-    nearby_vendors.sort(key=lambda v: v.distance)
+    distances = dict(page_hits)
+    vendors = db.query(Vendor).filter(Vendor.id.in_(list(distances))).all()
+    for vendor in vendors:
+        vendor.distance = distances[vendor.id]
     
-    # Apply pagination
-    start = skip
-    end = skip + limit
-    paginated_vendors = nearby_vendors[start:end]
+    # Preserve distance ordering from the index
+    vendors.sort(key=lambda v: v.distance)
     
-    return paginated_vendors
+    return vendors
 
 
 @router.get("/vendors/by-category/{category_id}", response_model=List[VendorResponse])
@@ -202,27 +162,25 @@ async def get_vendors_by_category(
         )
     
     # Get vendors that have items in this category
-    vendors_query = db.query(Vendor).join(Item, Vendor.id == Item.vendor_id).filter(
-        Item.category_id == category_id
-    ).distinct()
+    vendors_query = db.query(Vendor).filter(
+        db.query(Item.id).filter(
+            Item.vendor_id == Vendor.id,
+            Item.category_id == category_id
+        ).exists()
+    )
     
     if is_active:
         vendors_query = vendors_query.filter(Vendor.is_active == is_active)
     
-    vendors = vendors_query.offset(skip).limit(limit).all()
+    has_location = latitude is not None and longitude is not None and max_distance is not None
     
-    # Filter by distance if location provided
-    if latitude is not None and longitude is not None and max_distance is not None:
-        filtered_vendors = []
-        for vendor in vendors:
-            if vendor.latitude and vendor.longitude:
-                distance = haversine_distance(latitude, longitude, vendor.latitude, vendor.longitude)
-                if distance <= max_distance:
-                    vendor.distance = distance
-                    filtered_vendors.append(vendor)
-        vendors = filtered_vendors
+    # Filter, sort and paginate by distance inside the database if location provided
+    if has_location:
+        distance_query = DistanceQueryBuilder(Vendor.latitude, Vendor.longitude, latitude, longitude)
+        rows = distance_query.apply(vendors_query, max_distance).offset(skip).limit(limit).all()
+        return distance_query.attach_distances(rows)
     
-    return vendors
+    return vendors_query.offset(skip).limit(limit).all()
 
 
 @router.get("/trending/vendors", response_model=List[VendorResponse])
@@ -244,21 +202,13 @@ async def get_trending_vendors(
     if vendor_type:
         vendors_query = vendors_query.filter(Vendor.vendor_type == vendor_type)
     
-    vendors = vendors_query.limit(limit * 2).all()  # Get more to filter by distance
-    
-    # Filter by distance if location provided
+    # Filter by distance inside the database if location provided
     if latitude is not None and longitude is not None and max_distance is not None:
-        filtered_vendors = []
-        for vendor in vendors:
-            if vendor.latitude and vendor.longitude:
-                distance = haversine_distance(latitude, longitude, vendor.latitude, vendor.longitude)
-                if distance <= max_distance:
-                    vendor.distance = distance
-                    filtered_vendors.append(vendor)
-        vendors = filtered_vendors
-    
-    # Return limited results
-    return vendors[:limit]
+        distance_query = DistanceQueryBuilder(Vendor.latitude, Vendor.longitude, latitude, longitude)
+        rows = distance_query.apply(vendors_query, max_distance).limit(limit).all()
+        return distance_query.attach_distances(rows)
+    
+    return vendors_query.limit(limit).all()
 
 
 @router.get("/trending/items", response_model=List[ItemResponse])
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request, status, File, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import datetime, timedelta, timezone
+import asyncio
 import base64
+import json
 
 from ..shared.database import get_db
 from ..shared.api_key_route import verify_api_key
 from ..schemas import OrderTrackingResponse
-from ..models import Order, Rider, OrderTracking, OrderStatus, RiderStatus
+from ..models import Order, Rider, OrderTracking, OrderTrajectory, OrderStatus, RiderStatus, DeliveryAddress
 from ..services.queries import GetOrderByIdQuery, GetOrderByIdQueryHandler
+from ..services.eta import eta_engine
+from ..services.location_store import LocationFix, rider_location_store
+from ..services.tracking_hub import publish_order_status, tracking_hub
+from ..services.trajectory import decode_trajectory, trajectory_recorder
 
 
 router = APIRouter(
@@ -37,6 +44,38 @@ class LocationUpdate(BaseModel):
     timestamp: Optional[datetime] = None
 
 
+class RiderLocationFix(BaseModel):
+    rider_id: int
+    latitude: float
+    longitude: float
+    timestamp: datetime
+
+
+class LocationBatch(BaseModel):
+    fixes: List[RiderLocationFix] = Field(..., max_length=5000)
+
+
+class RejectedFix(BaseModel):
+    index: int
+    rider_id: int
+    reason: str
+
+
+class LocationBatchResult(BaseModel):
+    received: int
+    accepted: int
+    riders_updated: int
+    rejected: List[RejectedFix]
+
+
+# Fixes stamped further ahead than this are treated as device clock errors
+MAX_CLOCK_SKEW = timedelta(minutes=2)
+
+# Comment frames keep idle streams open through proxies
+STREAM_KEEPALIVE_SECONDS = 15
+FINAL_STATUSES = {OrderStatus.DELIVERED.value, OrderStatus.CANCELLED.value, OrderStatus.REJECTED.value}
+
+
 class DeliveryTimeline(BaseModel):
     order_placed: datetime
     order_confirmed: Optional[datetime] = None
@@ -58,7 +97,7 @@ class DeliveryProofRequest(BaseModel):
 
 
 @router.get("/orders/{order_id}/live", response_model=LiveTrackingResponse)
-async def get_live_order_tracking(
+def get_live_order_tracking(
     order_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_api_key)
@@ -71,20 +110,30 @@ async def get_live_order_tracking(
     
     # Get rider information if assigned
     rider = None
+    rider_latitude = rider_longitude = None
     if order.rider_id:
         rider = db.query(Rider).filter(Rider.id == order.rider_id).first()
+    if rider:
+        # Latest ping from the hot store; the row only lags behind it by one flush
+        fix = rider_location_store.latest(rider.id)
+        if fix:
+            rider_latitude, rider_longitude = fix.latitude, fix.longitude
+        else:
+            rider_latitude, rider_longitude = rider.current_latitude, rider.current_longitude
     
     # Get all tracking updates for this order
     tracking_updates = db.query(OrderTracking).filter(
         OrderTracking.order_id == order_id
-    ).order_by(OrderTracking.timestamp.desc()).all()
+    ).order_by(OrderTracking.created_at.desc()).all()
     
-    # Calculate estimated arrival (simplified)
+    # Estimated arrival from the rider's remaining distance and the zone's learned speed
     estimated_arrival = None
     if order.status == OrderStatus.IN_TRANSIT and rider:
-        # In real implementation, you'd calculate based on current location and traffic
-        estimated_arrival = datetime.utcnow().replace(microsecond=0)
-        estimated_arrival = estimated_arrival.replace(minute=estimated_arrival.minute + 15)
+        eta_engine.ensure_fresh(db)
+        rider_position = (rider_latitude, rider_longitude) if rider_latitude is not None else None
+        estimated_arrival = eta_engine.estimate_order(
+            order, tracking_updates[0].created_at if tracking_updates else None, rider_position
+        ).arrival().replace(microsecond=0)
     
     return LiveTrackingResponse(
         order_id=order.id,
@@ -92,16 +141,16 @@ async def get_live_order_tracking(
         rider_id=rider.id if rider else None,
         rider_name=rider.full_name if rider else None,
         rider_phone=rider.phone_number if rider else None,
-        rider_latitude=rider.current_latitude if rider else None,
-        rider_longitude=rider.current_longitude if rider else None,
+        rider_latitude=rider_latitude,
+        rider_longitude=rider_longitude,
         estimated_arrival=estimated_arrival,
-        delivery_address=order.delivery_address,
+        delivery_address=order.delivery_address.address if order.delivery_address else "",
         tracking_updates=tracking_updates
     )
 
 
 @router.post("/riders/{rider_id}/location")
-async def update_rider_location(
+def update_rider_location(
     rider_id: int,
     location_update: LocationUpdate,
     db: Session = Depends(get_db),
@@ -109,32 +158,71 @@ async def update_rider_location(
 ):
     """Update rider's current location for live tracking"""
     
-    # Verify rider exists
-    rider = db.query(Rider).filter(Rider.id == rider_id).first()
-    if not rider:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Rider not found"
-        )
+    # Verify rider exists (cached after the first ping)
+    rider_location_store.ensure_rider(db, rider_id)
     
-    # Update rider location
-    rider.current_latitude = location_update.latitude
-    rider.current_longitude = location_update.longitude
-    rider.updated_at = location_update.timestamp or datetime.utcnow()
-    
-    db.commit()
+    # Absorbed in memory; the riders row is written by the periodic bulk flush
+    fix = rider_location_store.record(
+        rider_id, location_update.latitude, location_update.longitude, location_update.timestamp
+    )
+    trajectory_recorder.record(fix)
+    tracking_hub.publish_location(fix)
     
     return {
         "message": "Rider location updated successfully",
         "rider_id": rider_id,
-        "latitude": location_update.latitude,
-        "longitude": location_update.longitude,
-        "timestamp": rider.updated_at
+        "latitude": fix.latitude,
+        "longitude": fix.longitude,
+        "timestamp": fix.recorded_at
     }
 
 
+@router.post("/locations/batch", response_model=LocationBatchResult)
+def ingest_location_batch(
+    batch: LocationBatch,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(verify_api_key)
+):
+    """Ingest buffered GPS fixes for one or many riders in a single request"""
+    
+    # Validate the whole batch up front; bad fixes are reported, not fatal
+    unknown = rider_location_store.unknown_riders(db, {fix.rider_id for fix in batch.fixes})
+    latest_allowed = datetime.now(timezone.utc) + MAX_CLOCK_SKEW
+    
+    accepted, rejected = [], []
+    for index, fix in enumerate(batch.fixes):
+        recorded_at = fix.timestamp if fix.timestamp.tzinfo else fix.timestamp.replace(tzinfo=timezone.utc)
+        if fix.rider_id in unknown:
+            reason = "Rider not found"
+        elif not (-90.0 <= fix.latitude <= 90.0 and -180.0 <= fix.longitude <= 180.0):
+            reason = "Coordinates out of range"
+        elif recorded_at > latest_allowed:
+            reason = "Timestamp is in the future"
+        else:
+            accepted.append(LocationFix(fix.rider_id, fix.latitude, fix.longitude, recorded_at))
+            continue
+        rejected.append(RejectedFix(index=index, rider_id=fix.rider_id, reason=reason))
+    
+    # Only the newest fix per rider becomes the current position,
+    # persisted for every rider in one multi-row UPDATE
+    riders_updated = rider_location_store.record_many(accepted)
+    # Every accepted fix (not just the newest) belongs to the delivery routes
+    trajectory_recorder.record_many(accepted)
+    if riders_updated:
+        rider_location_store.flush(db)
+        for fix in rider_location_store.latest_many({fix.rider_id for fix in accepted}).values():
+            tracking_hub.publish_location(fix)
+    
+    return LocationBatchResult(
+        received=len(batch.fixes),
+        accepted=len(accepted),
+        riders_updated=riders_updated,
+        rejected=rejected
+    )
+
+
 @router.get("/orders/{order_id}/timeline", response_model=DeliveryTimeline)
-async def get_delivery_timeline(
+def get_delivery_timeline(
     order_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_api_key)
@@ -148,7 +236,7 @@ async def get_delivery_timeline(
     # Get all tracking records in chronological order
     tracking_records = db.query(OrderTracking).filter(
         OrderTracking.order_id == order_id
-    ).order_by(OrderTracking.timestamp.asc()).all()
+    ).order_by(OrderTracking.created_at.asc()).all()
     
     # Build timeline from tracking records
     timeline = DeliveryTimeline(
@@ -161,16 +249,16 @@ async def get_delivery_timeline(
     # Map tracking records to timeline events
     for record in tracking_records:
         if record.status == OrderStatus.ACCEPTED:
-            timeline.order_confirmed = record.timestamp
+            timeline.order_confirmed = record.created_at
         elif record.status == OrderStatus.PREPARING:
-            timeline.preparation_started = record.timestamp
+            timeline.preparation_started = record.created_at
         elif record.status == OrderStatus.READY_FOR_PICKUP:
-            timeline.ready_for_pickup = record.timestamp
+            timeline.ready_for_pickup = record.created_at
         elif record.status == OrderStatus.IN_TRANSIT:
-            timeline.picked_up = record.timestamp
-            timeline.out_for_delivery = record.timestamp
+            timeline.picked_up = record.created_at
+            timeline.out_for_delivery = record.created_at
         elif record.status == OrderStatus.DELIVERED:
-            timeline.delivered = record.timestamp
+            timeline.delivered = record.created_at
     
     # Determine next expected status
     if order.status == OrderStatus.PENDING:
@@ -184,25 +272,22 @@ async def get_delivery_timeline(
     elif order.status == OrderStatus.IN_TRANSIT:
         timeline.next_expected_status = "delivered"
     
-    # Estimate completion time (simplified)
-    if order.status not in [OrderStatus.DELIVERED, OrderStatus.CANCELLED]:
-        current_time = datetime.utcnow()
-        if order.status == OrderStatus.PENDING:
-            timeline.estimated_completion = current_time.replace(minute=current_time.minute + 35)
-        elif order.status == OrderStatus.ACCEPTED:
-            timeline.estimated_completion = current_time.replace(minute=current_time.minute + 30)
-        elif order.status == OrderStatus.PREPARING:
-            timeline.estimated_completion = current_time.replace(minute=current_time.minute + 20)
-        elif order.status == OrderStatus.READY_FOR_PICKUP:
-            timeline.estimated_completion = current_time.replace(minute=current_time.minute + 15)
-        elif order.status == OrderStatus.IN_TRANSIT:
-            timeline.estimated_completion = current_time.replace(minute=current_time.minute + 10)
+    # Estimate completion from learned prep times and zone speeds
+    if order.status not in [OrderStatus.DELIVERED, OrderStatus.CANCELLED, OrderStatus.REJECTED]:
+        rider_position = None
+        if order.rider_id:
+            fix = rider_location_store.latest(order.rider_id)
+            if fix:
+                rider_position = (fix.latitude, fix.longitude)
+        eta_engine.ensure_fresh(db)
+        stage_started_at = tracking_records[-1].created_at if tracking_records else order.created_at
+        timeline.estimated_completion = eta_engine.estimate_order(order, stage_started_at, rider_position).arrival()
     
     return timeline
 
 
 @router.post("/orders/{order_id}/delivery-proof")
-async def upload_delivery_proof(
+def upload_delivery_proof(
     order_id: int,
     proof_request: DeliveryProofRequest,
     db: Session = Depends(get_db),
@@ -241,14 +326,14 @@ async def upload_delivery_proof(
     # Update order status to delivered
     order.status = OrderStatus.DELIVERED
     order.updated_at = datetime.utcnow()
+    trajectory_recorder.finish(db, order_id)
     
     # Create final tracking entry
     final_tracking = OrderTracking(
         order_id=order_id,
         status=OrderStatus.DELIVERED,
         latitude=None,  # Could include delivery location
-        longitude=None,
-        timestamp=datetime.utcnow()
+        longitude=None
     )
     db.add(final_tracking)
     
@@ -259,6 +344,7 @@ async def upload_delivery_proof(
             rider.status = RiderStatus.AVAILABLE
     
     db.commit()
+    publish_order_status(order, final_tracking.created_at)
     
     return {
         "message": "Delivery proof uploaded successfully",
@@ -271,7 +357,7 @@ async def upload_delivery_proof(
 
 
 @router.get("/orders/{order_id}/status-history")
-async def get_order_status_history(
+def get_order_status_history(
     order_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(verify_api_key)
@@ -285,7 +371,7 @@ async def get_order_status_history(
     # Get all tracking records with additional details
     tracking_records = db.query(OrderTracking).filter(
         OrderTracking.order_id == order_id
-    ).order_by(OrderTracking.timestamp.asc()).all()
+    ).order_by(OrderTracking.created_at.asc()).all()
     
     history = []
     for i, record in enumerate(tracking_records):
@@ -293,12 +379,12 @@ async def get_order_status_history(
         duration_minutes = None
         if i > 0:
             previous_record = tracking_records[i-1]
-            duration = record.timestamp - previous_record.timestamp
+            duration = record.created_at - previous_record.created_at
             duration_minutes = int(duration.total_seconds() / 60)
         
         history.append({
             "status": record.status.value,
-            "timestamp": record.timestamp,
+            "timestamp": record.created_at,
             "duration_from_previous": duration_minutes,
             "location": {
                 "latitude": record.latitude,
@@ -306,16 +392,43 @@ async def get_order_status_history(
             } if record.latitude and record.longitude else None
         })
     
+    # Full route: one primary-key read of the compressed trajectory once the
+    # delivery is finished, the in-memory buffer while it is in transit
+    route = None
+    trajectory = db.get(OrderTrajectory, order_id)
+    if trajectory is not None:
+        route = {
+            "source": "stored",
+            "point_count": trajectory.point_count,
+            "raw_point_count": trajectory.raw_point_count,
+            "distance_km": round(trajectory.distance_km, 3),
+            "started_at": trajectory.started_at,
+            "ended_at": trajectory.ended_at,
+            "points": decode_trajectory(trajectory)
+        }
+    else:
+        points = trajectory_recorder.current(order_id)
+        if points:
+            route = {
+                "source": "live",
+                "point_count": len(points),
+                "raw_point_count": len(points),
+                "started_at": points[0].timestamp,
+                "ended_at": points[-1].timestamp,
+                "points": points
+            }
+    
     return {
         "order_id": order_id,
         "current_status": order.status.value,
-        "total_duration_minutes": int((datetime.utcnow() - order.created_at).total_seconds() / 60) if order.status != OrderStatus.DELIVERED else None,
-        "status_history": history
+        "total_duration_minutes": int((datetime.now(timezone.utc) - order.created_at).total_seconds() / 60) if order.status != OrderStatus.DELIVERED else None,
+        "status_history": history,
+        "route": route
     }
 
 
 @router.post("/orders/{order_id}/update-status")
-async def update_order_tracking_status(
+def update_order_tracking_status(
     order_id: int,
     new_status: OrderStatus,
     latitude: Optional[float] = None,
@@ -345,6 +458,7 @@ async def update_order_tracking_status(
         )
     
     # Update order status
+    previous_status = order.status
     order.status = new_status
     order.updated_at = datetime.utcnow()
     
@@ -353,17 +467,98 @@ async def update_order_tracking_status(
         order_id=order_id,
         status=new_status,
         latitude=latitude,
-        longitude=longitude,
-        timestamp=datetime.utcnow()
+        longitude=longitude
     )
     db.add(tracking_record)
     
+    # Route recording follows the rider assignment
+    if new_status == OrderStatus.IN_TRANSIT:
+        trajectory_recorder.start(order_id, order.rider_id)
+    elif new_status.value in FINAL_STATUSES:
+        trajectory_recorder.finish(db, order_id)
+    
     db.commit()
+    db.refresh(tracking_record)
+    
+    # Push to live watchers; rider details are only loaded when someone is watching
+    publish_order_status(order, tracking_record.created_at)
     
     return {
         "message": "Order status updated successfully",
         "order_id": order_id,
-        "previous_status": order.status.value if order.status != new_status else None,
+        "previous_status": previous_status.value,
         "new_status": new_status.value,
-        "timestamp": tracking_record.timestamp
+        "timestamp": tracking_record.created_at
+    }
+
+
+@router.get("/orders/{order_id}/stream")
+async def stream_order_tracking(
+    order_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(verify_api_key)
+):
+    """
+    Server-Sent Events stream of live tracking for an order.
+
+    Emits a "snapshot" event on connect, then "location" and "status" events
+    as they happen; the stream ends once the order is delivered, cancelled or
+    rejected. All watchers of an order share one snapshot read.
+    """
+
+    queue = await tracking_hub.subscribe(order_id, lambda: _load_tracking_snapshot(db, order_id))
+
+    async def events():
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+                if data.get("status") in FINAL_STATUSES:
+                    break
+        finally:
+            tracking_hub.unsubscribe(order_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _load_tracking_snapshot(db: Session, order_id: int) -> dict:
+    """One column query for the order, its rider and address"""
+    row = db.query(
+        Order.id, Order.status, Order.updated_at, DeliveryAddress.address,
+        Rider.id, Rider.full_name, Rider.phone_number, Rider.current_latitude, Rider.current_longitude
+    ).outerjoin(
+        DeliveryAddress, Order.delivery_address_id == DeliveryAddress.id
+    ).outerjoin(
+        Rider, Order.rider_id == Rider.id
+    ).filter(Order.id == order_id).first()
+
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+
+    _, order_status, updated_at, address, rider_id, rider_name, rider_phone, latitude, longitude = row
+    fix = rider_location_store.latest(rider_id) if rider_id else None
+    return {
+        "order_id": order_id,
+        "status": order_status.value,
+        "updated_at": updated_at.isoformat() if updated_at else None,
+        "delivery_address": address or "",
+        "rider_id": rider_id,
+        "rider_name": rider_name,
+        "rider_phone": rider_phone,
+        "rider_latitude": fix.latitude if fix else latitude,
+        "rider_longitude": fix.longitude if fix else longitude,
     }
\ No newline at end of file
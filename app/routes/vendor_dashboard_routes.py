@@ -4,7 +4,6 @@ from sqlalchemy import func, and_
 from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from decimal import Decimal
 
 from ..shared.database import get_db
 from ..shared.api_key_route import verify_api_key
@@ -13,7 +12,13 @@ from ..models import (
     Vendor, Order, OrderItem, Item, OrderStatus, 
     WalletTransaction, VendorWallet, User
 )
+from ..services.analytics_engine import OrderFrame
 from ..services.queries import GetVendorByIdQuery, GetVendorByIdQueryHandler
+from ..services.rollups import OrderRollups, trailing_window
+from ..services.spatial_index import vendor_spatial_index
+from ..services.suggestions import name_suggester
+from ..services.tracking_hub import publish_order_status
+from ..shared.money import Amount, Money
 
 
 router = APIRouter(
@@ -24,21 +29,21 @@ router = APIRouter(
 
 class VendorDashboardStats(BaseModel):
     total_orders_today: int
-    total_revenue_today: float
+    total_revenue_today: Money
     pending_orders: int
     active_orders: int  # preparing + ready for pickup
     completed_orders_today: int
-    average_order_value: float
+    average_order_value: Money
     total_items_sold_today: int
     vendor_rating: float
-    wallet_balance: float
+    wallet_balance: Money
 
 
 class OrderManagementResponse(BaseModel):
     order_id: int
     customer_name: str
     customer_phone: str
-    order_total: float
+    order_total: Money
     order_status: str
     created_at: datetime
     items_count: int
@@ -51,17 +56,17 @@ class MenuItemStats(BaseModel):
     item_name: str
     total_orders: int
     total_quantity_sold: int
-    total_revenue: float
+    total_revenue: Money
     is_available: bool
-    current_price: float
+    current_price: Money
     last_ordered: Optional[datetime]
 
 
 class VendorAnalytics(BaseModel):
     date_range: str
     total_orders: int
-    total_revenue: float
-    average_order_value: float
+    total_revenue: Money
+    average_order_value: Money
     top_selling_items: List[MenuItemStats]
     daily_order_counts: List[dict]
     hourly_order_distribution: List[dict]
@@ -89,21 +94,10 @@ async def get_vendor_dashboard(
     today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
     today_end = today_start + timedelta(days=1)
     
-    # Get today's orders
-    today_orders = db.query(Order).filter(
-        and_(
-            Order.vendor_id == vendor_id,
-            Order.created_at >= today_start,
-            Order.created_at < today_end
-        )
-    ).all()
-    
-    # Calculate metrics
-    total_orders_today = len(today_orders)
-    
-    # Revenue calculation
-    completed_orders_today = [o for o in today_orders if o.status == OrderStatus.DELIVERED]
-    total_revenue_today = sum(float(order.total_amount) for order in completed_orders_today)
+    # Today's orders in one columnar pass
+    today = OrderFrame.load(db, today_start, today_end, vendor_id=vendor_id).summary()
+    total_orders_today = today["orders"]
+    total_revenue_today = today["revenue"]
     
     # Pending and active orders
     pending_orders = db.query(Order).filter(
@@ -121,7 +115,7 @@ async def get_vendor_dashboard(
     ).count()
     
     # Average order value
-    average_order_value = total_revenue_today / len(completed_orders_today) if completed_orders_today else 0.0
+    average_order_value = today["average_order_value"]
     
     # Total items sold today
     total_items_sold = db.query(func.sum(OrderItem.quantity)).join(Order).filter(
@@ -138,14 +132,14 @@ async def get_vendor_dashboard(
     
     # Wallet balance
     vendor_wallet = db.query(VendorWallet).filter(VendorWallet.vendor_id == vendor_id).first()
-    wallet_balance = float(vendor_wallet.balance) if vendor_wallet else 0.0
+    wallet_balance = vendor_wallet.balance if vendor_wallet else Amount(0)
     
     return VendorDashboardStats(
         total_orders_today=total_orders_today,
         total_revenue_today=total_revenue_today,
         pending_orders=pending_orders,
         active_orders=active_orders,
-        completed_orders_today=len(completed_orders_today),
+        completed_orders_today=today["delivered_orders"],
         average_order_value=average_order_value,
         total_items_sold_today=int(total_items_sold),
         vendor_rating=vendor_rating,
@@ -201,12 +195,12 @@ async def get_pending_orders(
             order_id=order.id,
             customer_name=customer.full_name if customer else "Unknown",
             customer_phone=customer.phone_number if customer else "Unknown",
-            order_total=float(order.total_amount),
+            order_total=order.total,
             order_status=order.status.value,
             created_at=order.created_at,
             items_count=items_count,
             estimated_prep_time=estimated_prep_time,
-            delivery_address=order.delivery_address
+            delivery_address=order.delivery_address.address if order.delivery_address else ""
         ))
     
     return order_responses
@@ -242,6 +236,7 @@ async def accept_order(
     order.updated_at = datetime.utcnow()
     
     db.commit()
+    publish_order_status(order)
     
     return {
         "message": "Order accepted successfully",
@@ -281,6 +276,7 @@ async def reject_order(
     order.updated_at = datetime.utcnow()
     
     db.commit()
+    publish_order_status(order)
     
     # In real implementation, you'd:
     # 1. Refund the customer
@@ -315,6 +311,8 @@ async def toggle_vendor_availability(
     vendor.updated_at = datetime.utcnow()
     
     db.commit()
+    vendor_spatial_index.sync_vendor(vendor)
+    name_suggester.sync_vendor(vendor)
     
     return {
         "message": f"Vendor {'activated' if is_active else 'deactivated'} successfully",
@@ -336,30 +334,23 @@ async def get_sales_analytics(
     query_handler = GetVendorByIdQueryHandler(db)
     vendor = query_handler.handle(GetVendorByIdQuery(vendor_id=vendor_id))
     
-    # Date range
+    # Date range, aligned to the hourly rollup buckets
     end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days_back)
+    start_date = trailing_window(days_back, end_date)
     
-    # Get orders in date range
-    orders = db.query(Order).filter(
-        and_(
-            Order.vendor_id == vendor_id,
-            Order.created_at >= start_date,
-            Order.created_at <= end_date
-        )
-    ).all()
-    
-    # Basic metrics
-    total_orders = len(orders)
-    completed_orders = [o for o in orders if o.status == OrderStatus.DELIVERED]
-    total_revenue = sum(float(order.total_amount) for order in completed_orders)
-    average_order_value = total_revenue / len(completed_orders) if completed_orders else 0.0
+    # Basic metrics from the hourly rollups
+    rollups = OrderRollups(db)
+    orders_by_status = rollups.by_status(start_date, vendor_id=vendor_id)
+    delivered = rollups.totals(start_date, vendor_id=vendor_id, statuses=[OrderStatus.DELIVERED])
+    total_orders = sum(orders_by_status.values())
+    total_revenue = delivered.revenue
+    average_order_value = total_revenue / delivered.order_count if delivered.order_count else 0.0
     
     # Top selling items
     item_stats = db.query(
         Item.id,
         Item.name,
-        Item.price,
+        Item.base_price,
         Item.is_available,
         func.count(OrderItem.id).label('order_count'),
         func.sum(OrderItem.quantity).label('total_quantity'),
@@ -374,7 +365,7 @@ async def get_sales_analytics(
              Order.created_at <= end_date,
              Order.status == OrderStatus.DELIVERED
          )
-     ).group_by(Item.id, Item.name, Item.price, Item.is_available)\
+     ).group_by(Item.id, Item.name, Item.base_price, Item.is_available)\
       .order_by(func.sum(OrderItem.quantity).desc())\
       .limit(10).all()
     
@@ -384,40 +375,29 @@ async def get_sales_analytics(
             item_name=stat.name,
             total_orders=stat.order_count,
             total_quantity_sold=stat.total_quantity or 0,
-            total_revenue=float(stat.total_revenue or 0),
+            total_revenue=stat.total_revenue or Amount(0),
             is_available=stat.is_available,
-            current_price=float(stat.price),
+            current_price=stat.base_price,
             last_ordered=stat.last_ordered
         ) for stat in item_stats
     ]
     
     # Daily order counts
-    daily_orders = {}
-    for order in completed_orders:
-        date_key = order.created_at.date().isoformat()
-        daily_orders[date_key] = daily_orders.get(date_key, 0) + 1
-    
+    daily_orders = rollups.by_day(start_date, vendor_id=vendor_id, statuses=[OrderStatus.DELIVERED])
     daily_order_counts = [
         {"date": date, "orders": count} 
-        for date, count in sorted(daily_orders.items())
+        for date, (count, _) in daily_orders.items()
     ]
     
     # Hourly distribution
-    hourly_orders = {}
-    for order in completed_orders:
-        hour = order.created_at.hour
-        hourly_orders[hour] = hourly_orders.get(hour, 0) + 1
-    
+    hourly_orders = rollups.by_hour_of_day(start_date, vendor_id=vendor_id, statuses=[OrderStatus.DELIVERED])
     hourly_distribution = [
         {"hour": hour, "orders": hourly_orders.get(hour, 0)}
         for hour in range(24)
     ]
     
     # Order status distribution
-    status_counts = {}
-    for order in orders:
-        status = order.status.value
-        status_counts[status] = status_counts.get(status, 0) + 1
+    status_counts = {order_status.value: count for order_status, count in orders_by_status.items()}
     
     return VendorAnalytics(
         date_range=f"{start_date.date()} to {end_date.date()}",
@@ -459,6 +439,7 @@ async def toggle_item_availability(
     item.updated_at = datetime.utcnow()
     
     db.commit()
+    name_suggester.sync_item(item)
     
     return {
         "message": f"Item {'enabled' if is_available else 'disabled'} successfully",
@@ -492,16 +473,15 @@ async def bulk_update_menu_prices(
         items = db.query(Item).filter(Item.vendor_id == vendor_id).all()
         
         for item in items:
-            old_price = float(item.price)
-            new_price = old_price * (1 + price_updates.percentage_change / 100)
-            item.price = Decimal(str(round(new_price, 2)))
+            old_price = item.base_price
+            item.base_price = old_price * (1 + price_updates.percentage_change / 100)
             item.updated_at = datetime.utcnow()
             
             updated_items.append({
                 "item_id": item.id,
                 "item_name": item.name,
                 "old_price": old_price,
-                "new_price": float(item.price)
+                "new_price": item.base_price
             })
     
     else:
@@ -515,15 +495,15 @@ async def bulk_update_menu_prices(
             ).first()
             
             if item:
-                old_price = float(item.price)
-                item.price = Decimal(str(update["new_price"]))
+                old_price = item.base_price
+                item.base_price = Amount.of(update["new_price"])
                 item.updated_at = datetime.utcnow()
                 
                 updated_items.append({
                     "item_id": item.id,
                     "item_name": item.name,
                     "old_price": old_price,
-                    "new_price": float(item.price)
+                    "new_price": item.base_price
                 })
     
     db.commit()
@@ -555,7 +535,7 @@ async def get_low_stock_alerts(
     high_demand_items = db.query(
         Item.id,
         Item.name,
-        Item.price,
+        Item.base_price,
         Item.is_available,
         func.count(OrderItem.id).label('recent_orders'),
         func.sum(OrderItem.quantity).label('total_ordered')
@@ -567,7 +547,7 @@ async def get_low_stock_alerts(
              Order.created_at >= recent_date,
              Order.status.in_([OrderStatus.DELIVERED, OrderStatus.IN_TRANSIT])
          )
-     ).group_by(Item.id, Item.name, Item.price, Item.is_available)\
+     ).group_by(Item.id, Item.name, Item.base_price, Item.is_available)\
       .having(func.count(OrderItem.id) > 5)\
       .all()
     
@@ -576,7 +556,7 @@ async def get_low_stock_alerts(
         alerts.append({
             "item_id": item_stat.id,
             "item_name": item_stat.name,
-            "current_price": float(item_stat.price),
+            "current_price": item_stat.base_price,
             "is_available": item_stat.is_available,
             "recent_orders": item_stat.recent_orders,
             "total_ordered": item_stat.total_ordered,
@@ -1,15 +1,7 @@
-from fastapi import APIRouter, Depends
-from ...shared.api_key_route import verify_api_key
+"""Re-export the analytics router so it appears under the views namespace
+This file re-exports the router defined in `app.routes.analytics_routes`.
+"""
+from ..analytics_routes import router as analytics_router
 
-router = APIRouter(prefix="/analytics", tags=["analytics"])
-
-
-@router.get("/admin/dashboard", dependencies=[Depends(verify_api_key)])
-def get_admin_dashboard():
-    # Placeholder: aggregate metrics would be computed here
-    return {"total_users": 0, "total_vendors": 0, "total_orders": 0}
-
-
-@router.get("/sales-report", dependencies=[Depends(verify_api_key)])
-def sales_report(start_date: str = None, end_date: str = None):
-    return {"report": [], "start": start_date, "end": end_date}
+# Expose `router` for main app to include
+router = analytics_router
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import datetime
+
+from ...shared.api_key_route import verify_api_key
+from ...models import OrderStatus, WalletTransactionStatus, WalletTransactionType
+from ...services.exports import (
+    EXPORT_FORMATS, export_filename, iter_batches, order_export, stream_csv, stream_xlsx,
+    wallet_transaction_export
+)
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+FORMAT_PATTERN = "^(csv|xlsx)$"
+
+
+def _export_response(name: str, export_format: str, headers, statement) -> StreamingResponse:
+    batches = iter_batches(statement)
+    if export_format == "xlsx":
+        body = stream_xlsx(headers, batches, sheet_title=name.replace("-", " "))
+    else:
+        body = stream_csv(headers, batches)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(name, export_format)}"'}
+    )
+
+
+@router.get("/orders", dependencies=[Depends(verify_api_key)])
+def export_orders(
+    format: str = Query("csv", pattern=FORMAT_PATTERN, description="csv or xlsx"),
+    vendor_id: Optional[int] = Query(None),
+    rider_id: Optional[int] = Query(None),
+    status: Optional[OrderStatus] = Query(None),
+    start_date: Optional[datetime] = Query(None, description="Orders created at or after"),
+    end_date: Optional[datetime] = Query(None, description="Orders created before")
+):
+    """
+    Stream every matching order as one CSV or XLSX file.
+
+    Rows come from a server-side cursor in fixed-size batches, so exports
+    of any length run in bounded memory.
+    """
+    headers, statement = order_export(vendor_id, rider_id, status, start_date, end_date)
+    return _export_response("orders", format, headers, statement)
+
+
+@router.get("/wallet-transactions", dependencies=[Depends(verify_api_key)])
+def export_wallet_transactions(
+    format: str = Query("csv", pattern=FORMAT_PATTERN, description="csv or xlsx"),
+    user_id: Optional[int] = Query(None),
+    vendor_id: Optional[int] = Query(None),
+    rider_id: Optional[int] = Query(None),
+    status: Optional[WalletTransactionStatus] = Query(None),
+    transaction_type: Optional[WalletTransactionType] = Query(None),
+    start_date: Optional[datetime] = Query(None, description="Transactions created at or after"),
+    end_date: Optional[datetime] = Query(None, description="Transactions created before")
+):
+    """Stream every matching wallet transaction, with its wallet owner, as one CSV or XLSX file"""
+    headers, statement = wallet_transaction_export(
+        user_id, vendor_id, rider_id, status, transaction_type, start_date, end_date
+    )
+    return _export_response("wallet-transactions", format, headers, statement)
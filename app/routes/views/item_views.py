@@ -8,6 +8,8 @@ from ...shared.database import get_db
 from ...shared.api_key_route import verify_api_key
 from ...schemas import ItemResponse, ItemCreate, ItemUpdate
 from ...models import Item, ItemCategory, ItemVariation, ItemAddon, Vendor
+from ...services.suggestions import name_suggester, ITEM
+from ...shared.money import Money
 
 router = APIRouter(prefix="/items", tags=["items"])
 
@@ -18,7 +20,7 @@ class ItemAvailabilityUpdate(BaseModel):
 
 
 class ItemPriceUpdate(BaseModel):
-    new_price: float
+    new_price: Money
     effective_date: Optional[datetime] = None
 
 
@@ -197,6 +199,7 @@ def toggle_item_availability(
     item.updated_at = datetime.utcnow()
     
     db.commit()
+    name_suggester.sync_item(item)
     
     status_text = "enabled" if availability_update.is_available else "disabled"
     
@@ -223,8 +226,8 @@ def update_item_price(
     if price_update.new_price <= 0:
         raise HTTPException(status_code=400, detail="Price must be greater than 0")
     
-    old_price = float(item.price)
-    item.price = price_update.new_price
+    old_price = item.base_price
+    item.base_price = price_update.new_price
     item.updated_at = datetime.utcnow()
     
     db.commit()
@@ -234,7 +237,7 @@ def update_item_price(
         "item_id": item_id,
         "item_name": item.name,
         "old_price": old_price,
-        "new_price": float(item.price),
+        "new_price": item.base_price,
         "effective_date": price_update.effective_date or datetime.utcnow()
     }
 
@@ -274,9 +277,9 @@ def advanced_item_search(
     
     # Price range filter
     if min_price is not None:
-        query = query.filter(Item.price >= min_price)
+        query = query.filter(Item.base_price >= min_price)
     if max_price is not None:
-        query = query.filter(Item.price <= max_price)
+        query = query.filter(Item.base_price <= max_price)
     
     # Availability filter
     if is_available is not None:
@@ -374,6 +377,13 @@ def bulk_update_item_availability(
     
     db.commit()
     
+    # Unavailable items drop out of autocomplete; re-enabled ones need their names back
+    if is_available:
+        for item in db.query(Item).filter(Item.id.in_(item_ids)).all():
+            name_suggester.sync_item(item)
+    else:
+        name_suggester.remove_many(ITEM, item_ids)
+    
     status_text = "enabled" if is_available else "disabled"
     
     return {
@@ -5,7 +5,9 @@ from sqlalchemy.orm import Session
 from ...shared.database import get_db
 from ...shared.api_key_route import verify_api_key
 from ...models import Item, ItemVariation, Order, OrderItem, OrderStatus
-from decimal import Decimal
+from ...services.tracking_hub import publish_order_status
+from ...services.trajectory import trajectory_recorder
+from ...shared.money import Amount, Money
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -18,46 +20,46 @@ class OrderLine(BaseModel):
 
 class CalculateTotalRequest(BaseModel):
     lines: List[OrderLine]
-    delivery_fee: Optional[float] = 0.0
+    delivery_fee: Optional[Money] = 0.0
     tax_percent: Optional[float] = 0.0
-    discount: Optional[float] = 0.0
+    discount: Optional[Money] = 0.0
 
 
 class CalculateTotalResponse(BaseModel):
-    subtotal: float
-    tax: float
-    delivery_fee: float
-    discount: float
-    total: float
+    subtotal: Money
+    tax: Money
+    delivery_fee: Money
+    discount: Money
+    total: Money
 
 
 @router.post("/calculate-total", response_model=CalculateTotalResponse, dependencies=[Depends(verify_api_key)])
 def calculate_order_total(request: CalculateTotalRequest, db: Session = Depends(get_db)):
     """Calculate subtotal, tax, delivery fee and total for an order client-side helper"""
-    subtotal = Decimal('0')
+    subtotal = Amount(0)
     for line in request.lines:
         item = db.query(Item).filter(Item.id == line.item_id).first()
         if not item:
             raise HTTPException(status_code=404, detail=f"Item {line.item_id} not found")
-        price = Decimal(str(item.price))
+        price = item.base_price
         # Optionally handle variation price
         if line.variation_id:
             variation = db.query(ItemVariation).filter(ItemVariation.id == line.variation_id).first()
             if variation and getattr(variation, 'price', None) is not None:
-                price = Decimal(str(variation.price))
+                price = variation.price
         subtotal += price * line.quantity
 
-    tax = (subtotal * Decimal(str(request.tax_percent or 0))) / Decimal('100')
-    delivery_fee = Decimal(str(request.delivery_fee or 0))
-    discount = Decimal(str(request.discount or 0))
+    tax = subtotal * ((request.tax_percent or 0) / 100)
+    delivery_fee = Amount.of(request.delivery_fee or 0)
+    discount = Amount.of(request.discount or 0)
     total = subtotal + tax + delivery_fee - discount
 
     return CalculateTotalResponse(
-        subtotal=float(subtotal),
-        tax=float(tax),
-        delivery_fee=float(delivery_fee),
-        discount=float(discount),
-        total=float(total)
+        subtotal=subtotal,
+        tax=tax,
+        delivery_fee=delivery_fee,
+        discount=discount,
+        total=total
     )
 
 
@@ -70,7 +72,9 @@ def cancel_order(order_id: int, reason: Optional[str] = None, db: Session = Depe
     if order.status in [OrderStatus.DELIVERED, OrderStatus.CANCELLED]:
         raise HTTPException(status_code=400, detail="Order cannot be cancelled at this stage")
     order.status = OrderStatus.CANCELLED
+    trajectory_recorder.finish(db, order_id)
     db.commit()
+    publish_order_status(order)
     # TODO: enqueue refund and notifications
     return {"msg": "Order cancelled", "order_id": order_id}
 
@@ -4,10 +4,30 @@ from typing import List
 from ...shared.database import get_db
 from ...shared.api_key_route import verify_api_key
 from ...models import Rider, Order, OrderStatus
+from ...services.dispatch import dispatch_engine
+from ...services.tracking_hub import publish_order_status
+from ...services.trajectory import trajectory_recorder
 
 router = APIRouter(prefix="/riders", tags=["riders"])
 
 
+@router.post("/dispatch/run", dependencies=[Depends(verify_api_key)])
+def run_dispatch(db: Session = Depends(get_db)):
+    """Run one batch dispatch tick now instead of waiting for the background loop"""
+    result = dispatch_engine.run_tick(db)
+    return {
+        "skipped": result.skipped,
+        "open_orders": result.open_orders,
+        "available_riders": result.available_riders,
+        "assigned": len(result.assignments),
+        "solve_ms": round(result.solve_ms, 1),
+        "assignments": [
+            {"order_id": order_id, "rider_id": rider_id, "pickup_km": round(pickup_km, 3)}
+            for order_id, rider_id, pickup_km in result.assignments
+        ]
+    }
+
+
 @router.get("/{rider_id}/available-orders", dependencies=[Depends(verify_api_key)])
 def get_available_orders(rider_id: int, db: Session = Depends(get_db)):
     # Very simple: orders ready for pickup and not assigned to a rider
@@ -26,6 +46,8 @@ def accept_delivery_order(rider_id: int, order_id: int, db: Session = Depends(ge
     order.rider_id = rider_id
     order.status = OrderStatus.IN_TRANSIT
     db.commit()
+    trajectory_recorder.start(order_id, rider_id)
+    publish_order_status(order)
     return {"msg": "Order assigned to rider", "order_id": order_id}
 
 
@@ -41,7 +63,9 @@ def complete_delivery(rider_id: int, order_id: int, db: Session = Depends(get_db
     if not order:
         raise HTTPException(status_code=404, detail="Order not found or not assigned to this rider")
     order.status = OrderStatus.DELIVERED
+    trajectory_recorder.finish(db, order_id)
     db.commit()
+    publish_order_status(order)
     return {"msg": "Delivery completed", "order_id": order_id}
 
 
@@ -4,8 +4,10 @@ from typing import Optional, List
 
 from ...shared.database import get_db
 from ...shared.api_key_route import verify_api_key
-from ...schemas import VendorResponse, ItemResponse
+from ...schemas import VendorResponse, ItemResponse, SuggestionResponse
 from ...models import Vendor, Item, ItemCategory
+from ...services.geo import CoordinateSet, bounding_box
+from ...services.suggestions import name_suggester, VENDOR, ITEM, CATEGORY
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -34,16 +36,37 @@ def search_items(q: Optional[str] = Query(None), vendor_id: Optional[int] = None
     return items
 
 
+@router.get("/suggest", response_model=List[SuggestionResponse], dependencies=[Depends(verify_api_key)])
+def suggest(
+    q: str = Query(..., min_length=1, description="Text typed so far"),
+    kind: Optional[List[str]] = Query(None, description="Restrict to vendor, item and/or category"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Autocomplete vendor, item and category names from the in-memory prefix index"""
+    if kind:
+        unknown = set(kind) - {VENDOR, ITEM, CATEGORY}
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown suggestion kind: {', '.join(sorted(unknown))}")
+    # Only the first call (and the periodic refresh) reads the database
+    name_suggester.ensure_loaded(db)
+    return name_suggester.suggest(q, limit=limit, kinds=kind)
+
+
 @router.get("/vendors/nearby", response_model=List[VendorResponse], dependencies=[Depends(verify_api_key)])
 def get_nearby_vendors(lat: float, lng: float, radius_km: float = 5.0, limit: int = 20, db: Session = Depends(get_db)):
-    """Naive nearby implementation: filter by bounding box. For production use geospatial queries."""
-    # Very simple latitude/longitude box (not accurate at scale)
-    lat_delta = radius_km / 111.0  # approx degrees latitude per km
-    lng_delta = radius_km / max(0.0001, (111.320 * abs(lat) / 90.0))
-    min_lat, max_lat = lat - lat_delta, lat + lat_delta
-    min_lng, max_lng = lng - lng_delta, lng + lng_delta
-    vendors = db.query(Vendor).filter(Vendor.latitude >= min_lat, Vendor.latitude <= max_lat,
-                                       Vendor.longitude >= min_lng, Vendor.longitude <= max_lng).limit(limit).all()
+    """Nearby vendors within radius_km, nearest first"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    candidates_query = db.query(Vendor.id, Vendor.latitude, Vendor.longitude).filter(
+        Vendor.latitude >= min_lat, Vendor.latitude <= max_lat)
+    if min_lng is not None:
+        candidates_query = candidates_query.filter(Vendor.longitude >= min_lng, Vendor.longitude <= max_lng)
+    vendor_ids, _ = CoordinateSet.from_rows(candidates_query.all()).nearest(lat, lng, limit, max_radius_km=radius_km)
+    if not len(vendor_ids):
+        return []
+    rank = {vendor_id: position for position, vendor_id in enumerate(vendor_ids.tolist())}
+    vendors = db.query(Vendor).filter(Vendor.id.in_(list(rank))).all()
+    vendors.sort(key=lambda v: rank[v.id])
     return vendors
 
 
@@ -3,8 +3,10 @@ from sqlalchemy.orm import Session
 from typing import Optional, List
 from ...shared.database import get_db
 from ...shared.api_key_route import verify_api_key
-from ...models import OrderTracking, Order, Rider
-from datetime import datetime
+from ...models import OrderTracking, Order
+from ...services.location_store import rider_location_store
+from ...services.tracking_hub import tracking_hub
+from ...services.trajectory import trajectory_recorder
 
 router = APIRouter(prefix="/tracking", tags=["tracking"])
 
@@ -29,11 +31,9 @@ class RiderLocationUpdate(BaseModel := object):
 
 @router.post("/rider/{rider_id}/location", dependencies=[Depends(verify_api_key)])
 def update_rider_location(rider_id: int, latitude: float, longitude: float, db: Session = Depends(get_db)):
-    rider = db.query(Rider).filter(Rider.id == rider_id).first()
-    if not rider:
-        raise HTTPException(status_code=404, detail="Rider not found")
-    rider.latitude = latitude
-    rider.longitude = longitude
-    rider.updated_at = datetime.utcnow()
-    db.commit()
+    rider_location_store.ensure_rider(db, rider_id)
+    # Written to riders.current_latitude/current_longitude by the periodic flush
+    fix = rider_location_store.record(rider_id, latitude, longitude)
+    trajectory_recorder.record(fix)
+    tracking_hub.publish_location(fix)
     return {"msg": "Location updated"}
@@ -7,8 +7,11 @@ from datetime import datetime, timedelta
 
 from ...shared.database import get_db
 from ...shared.api_key_route import verify_api_key
+from ...shared.money import Amount, MinorUnits
 from ...schemas import UserResponse, UserCreate, UserUpdate
 from ...models import User, Order, OrderStatus, DeliveryAddress, UserWallet, WalletTransaction
+from ...services.geo import CoordinateSet, bounding_box
+from ...services.queries import GetTopCustomersQuery, GetTopCustomersQueryHandler
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -110,11 +113,11 @@ def get_user_profile(user_id: int, db: Session = Depends(get_db)):
     cancelled_orders = len([o for o in orders if o.status == OrderStatus.CANCELLED])
     
     # Calculate total spent (only completed orders)
-    total_spent = sum(
-        float(order.total_amount) 
-        for order in orders 
+    total_spent = sum((
+        order.total
+        for order in orders
         if order.status == OrderStatus.DELIVERED
-    )
+    ), Amount(0))
     
     # Get wallet balance
     wallet = db.query(UserWallet).filter(UserWallet.user_id == user_id).first()
@@ -186,11 +189,11 @@ def get_users_analytics_summary(db: Session = Depends(get_db)):
     )
     
     # Revenue metrics
-    total_revenue = db.query(func.sum(Order.total_amount)).filter(
+    total_revenue = db.query(func.sum(Order.total)).filter(
         Order.status == OrderStatus.DELIVERED
     ).scalar() or 0
     
-    avg_order_value = db.query(func.avg(Order.total_amount)).filter(
+    avg_order_value = db.query(func.round(func.avg(Order.total), type_=MinorUnits)).filter(
         Order.status == OrderStatus.DELIVERED
     ).scalar() or 0
     
@@ -215,45 +218,21 @@ def get_top_customers(
     db: Session = Depends(get_db)
 ):
     """Get top customers by spending, order count, or average order value"""
-    
-    # This would be more efficient with a proper SQL query, but showing the concept
-    users_data = []
-    users = db.query(User).all()
-    
-    for user in users:
-        orders = db.query(Order).filter(
-            and_(
-                Order.user_id == user.id,
-                Order.status == OrderStatus.DELIVERED
-            )
-        ).all()
-        
-        if len(orders) >= min_orders:
-            total_spent = sum(float(order.total_amount) for order in orders)
-            avg_order_value = total_spent / len(orders) if orders else 0
-            
-            # Get preferred vendors (simplified)
-            preferred_vendors = ["Vendor A", "Vendor B"]  # Would be calculated from actual data
-            
-            users_data.append(UserOrderSummary(
-                user_id=user.id,
-                user_name=user.full_name,
-                order_count=len(orders),
-                total_spent=total_spent,
-                avg_order_value=avg_order_value,
-                last_order=max(order.created_at for order in orders) if orders else None,
-                preferred_vendors=preferred_vendors
-            ))
-    
-    # Sort by the specified criterion
-    if sort_by == "total_spent":
-        users_data.sort(key=lambda x: x.total_spent, reverse=True)
-    elif sort_by == "order_count":
-        users_data.sort(key=lambda x: x.order_count, reverse=True)
-    elif sort_by == "avg_order_value":
-        users_data.sort(key=lambda x: x.avg_order_value, reverse=True)
-    
-    return users_data[:limit]
+    rows = GetTopCustomersQueryHandler(db).handle(
+        GetTopCustomersQuery(limit=limit, sort_by=sort_by, min_orders=min_orders)
+    )
+    return [
+        UserOrderSummary(
+            user_id=row.user_id,
+            user_name=row.user_name,
+            order_count=int(row.order_count),
+            total_spent=float(row.total_spent),
+            avg_order_value=float(row.avg_order_value or 0),
+            last_order=row.last_order,
+            preferred_vendors=list(row.preferred_vendors or [])
+        )
+        for row in rows
+    ]
 
 
 @router.get("/{user_id}/activity-stats", response_model=UserActivityStats, dependencies=[Depends(verify_api_key)])
@@ -357,7 +336,7 @@ def get_user_orders_summary(
     
     # Calculate summary statistics
     total_orders = len(orders)
-    total_spent = sum(float(order.total_amount) for order in orders if order.status == OrderStatus.DELIVERED)
+    total_spent = sum((order.total for order in orders if order.status == OrderStatus.DELIVERED), Amount(0))
     avg_order_value = total_spent / len([o for o in orders if o.status == OrderStatus.DELIVERED]) if orders else 0
     
     # Status breakdown
@@ -423,29 +402,29 @@ def get_nearby_users(
     if not user.latitude or not user.longitude:
         raise HTTPException(status_code=400, detail="User location not set")
     
-    # Simple bounding box calculation (not geospatially accurate)
-    lat_delta = radius_km / 111.0  # Approx km per degree latitude
-    lng_delta = radius_km / (111.320 * abs(user.latitude) / 90.0) if user.latitude else radius_km / 111.320
-    
-    min_lat = user.latitude - lat_delta
-    max_lat = user.latitude + lat_delta
-    min_lng = user.longitude - lng_delta
-    max_lng = user.longitude + lng_delta
+    # Bounding box prefilter on the raw coordinate columns
+    min_lat, max_lat, min_lng, max_lng = bounding_box(user.latitude, user.longitude, radius_km)
     
-    nearby_users = (
-        db.query(User)
-        .filter(
-            and_(
-                User.id != user_id,  # Exclude the user themselves
-                User.latitude.between(min_lat, max_lat),
-                User.longitude.between(min_lng, max_lng),
-                User.latitude.isnot(None),
-                User.longitude.isnot(None)
-            )
+    candidates_query = db.query(User.id, User.latitude, User.longitude).filter(
+        and_(
+            User.id != user_id,  # Exclude the user themselves
+            User.latitude.between(min_lat, max_lat),
+            User.latitude.isnot(None),
+            User.longitude.isnot(None)
         )
-        .limit(limit)
-        .all()
     )
+    if min_lng is not None:
+        candidates_query = candidates_query.filter(User.longitude.between(min_lng, max_lng))
+    
+    # Exact distances and top-k selection over all candidates in one vectorized call
+    candidates = CoordinateSet.from_rows(candidates_query.all())
+    user_ids, distances = candidates.nearest(user.latitude, user.longitude, limit, max_radius_km=radius_km)
+    
+    nearby_users = []
+    if len(user_ids):
+        distance_by_id = dict(zip(user_ids.tolist(), distances.tolist()))
+        nearby_users = db.query(User).filter(User.id.in_(list(distance_by_id))).all()
+        nearby_users.sort(key=lambda u: distance_by_id[u.id])
     
     return {
         "center_user_id": user_id,
@@ -8,8 +8,13 @@ from decimal import Decimal
 
 from ...shared.database import get_db
 from ...shared.api_key_route import verify_api_key
+from ...shared.money import Amount
 from ...schemas import VendorResponse, VendorCreate, VendorUpdate
 from ...models import Vendor, VendorType, Order, OrderStatus, Item, VendorWallet, WalletTransaction, User
+from ...services.spatial_index import vendor_spatial_index
+from ...services.suggestions import name_suggester
+from ...services.geo import CoordinateSet, bounding_box
+from ...services.leaderboard import LEADERBOARD_SORTS, VendorLeaderboard
 
 router = APIRouter(prefix="/vendors", tags=["vendors"])
 
@@ -78,6 +83,7 @@ class VendorComparison(BaseModel):
     items_count: int
     last_30_days_orders: int
     market_share: float
+    growth_rate: float = 0.0
 
 
 @router.get("/", response_model=List[VendorResponse], dependencies=[Depends(verify_api_key)])
@@ -156,11 +162,11 @@ def get_vendor_profile(vendor_id: int, db: Session = Depends(get_db)):
     pending_orders = len([o for o in orders if o.status == OrderStatus.PENDING])
     
     # Calculate revenue (only completed orders)
-    total_revenue = sum(
-        float(order.total_amount) 
-        for order in orders 
+    total_revenue = sum((
+        order.total
+        for order in orders
         if order.status == OrderStatus.DELIVERED
-    )
+    ), Amount(0))
     
     avg_order_value = total_revenue / completed_orders if completed_orders > 0 else 0
     
@@ -253,7 +259,7 @@ def get_vendors_analytics_overview(db: Session = Depends(get_db)):
     new_vendors_30_days = db.query(Vendor).filter(Vendor.created_at >= thirty_days_ago).count()
     
     # Revenue metrics
-    total_platform_revenue = db.query(func.sum(Order.total_amount)).filter(
+    total_platform_revenue = db.query(func.sum(Order.total)).filter(
         Order.status == OrderStatus.DELIVERED
     ).scalar() or 0
     
@@ -287,69 +293,30 @@ def get_top_performing_vendors(
     db: Session = Depends(get_db)
 ):
     """Get top performing vendors with comparison metrics"""
-    
-    start_date = datetime.utcnow() - timedelta(days=days_back)
-    
-    vendors_data = []
-    vendors = db.query(Vendor).filter(Vendor.is_active == True).all()
-    
-    # Calculate total platform orders for market share
-    total_platform_orders = db.query(Order).filter(
-        and_(
-            Order.created_at >= start_date,
-            Order.status == OrderStatus.DELIVERED
+    try:
+        rows = VendorLeaderboard(db).top(days_back, sort_by=sort_by, limit=limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort_by '{sort_by}'. Use one of: {', '.join(LEADERBOARD_SORTS)}"
         )
-    ).count()
-    
-    for vendor in vendors:
-        # Get vendor orders in period
-        orders = db.query(Order).filter(
-            and_(
-                Order.vendor_id == vendor.id,
-                Order.created_at >= start_date,
-                Order.status == OrderStatus.DELIVERED
-            )
-        ).all()
-        
-        total_orders = len(orders)
-        total_revenue = sum(float(order.total_amount) for order in orders)
-        
-        # Get total historical orders for this vendor
-        all_orders_count = db.query(Order).filter(Order.vendor_id == vendor.id).count()
-        
-        # Get items count
-        items_count = db.query(Item).filter(Item.vendor_id == vendor.id).count()
-        
-        # Market share
-        market_share = (total_orders / total_platform_orders * 100) if total_platform_orders > 0 else 0
-        
-        # Placeholder rating
-        avg_rating = 4.5  # Would be calculated from actual reviews
-        
-        vendors_data.append(VendorComparison(
-            vendor_id=vendor.id,
-            vendor_name=vendor.name,
-            vendor_type=vendor.vendor_type.value,
-            is_active=vendor.is_active,
-            total_orders=all_orders_count,
-            total_revenue=total_revenue,
-            avg_rating=avg_rating,
-            items_count=items_count,
-            last_30_days_orders=total_orders,
-            market_share=market_share
-        ))
-    
-    # Sort by specified criterion
-    if sort_by == "revenue":
-        vendors_data.sort(key=lambda x: x.total_revenue, reverse=True)
-    elif sort_by == "orders":
-        vendors_data.sort(key=lambda x: x.last_30_days_orders, reverse=True)
-    elif sort_by == "rating":
-        vendors_data.sort(key=lambda x: x.avg_rating, reverse=True)
-    elif sort_by == "growth":
-        vendors_data.sort(key=lambda x: x.last_30_days_orders, reverse=True)  # Simplified
-    
-    return vendors_data[:limit]
+
+    return [
+        VendorComparison(
+            vendor_id=row.vendor_id,
+            vendor_name=row.vendor_name,
+            vendor_type=row.vendor_type.value,
+            is_active=row.is_active,
+            total_orders=int(row.total_orders),
+            total_revenue=float(row.period_revenue),
+            avg_rating=4.5,  # Placeholder until reviews exist
+            items_count=int(row.items_count),
+            last_30_days_orders=int(row.period_orders),
+            market_share=round(float(row.market_share), 2),
+            growth_rate=round(float(row.growth), 2)
+        )
+        for row in rows
+    ]
 
 
 @router.get("/{vendor_id}/performance", response_model=VendorPerformanceStats, dependencies=[Depends(verify_api_key)])
@@ -379,7 +346,7 @@ def get_vendor_performance_stats(
     orders_completed = len(completed_orders)
     
     # Revenue
-    revenue = sum(float(order.total_amount) for order in completed_orders)
+    revenue = sum((order.total for order in completed_orders), Amount(0))
     avg_order_value = revenue / orders_completed if orders_completed > 0 else 0
     
     # Order acceptance rate
@@ -461,13 +428,13 @@ def get_vendor_customers(
                 customer_data[order.user_id] = {
                     "user_id": order.user_id,
                     "orders": [],
-                    "total_spent": 0,
+                    "total_spent": Amount(0),
                     "order_count": 0
                 }
             
             customer_data[order.user_id]["orders"].append(order)
             if order.status == OrderStatus.DELIVERED:
-                customer_data[order.user_id]["total_spent"] += float(order.total_amount)
+                customer_data[order.user_id]["total_spent"] += order.total
             customer_data[order.user_id]["order_count"] += 1
     
     # Get user details and format response
@@ -525,6 +492,8 @@ def toggle_vendor_status(
     vendor.updated_at = datetime.utcnow()
     
     db.commit()
+    vendor_spatial_index.sync_vendor(vendor)
+    name_suggester.sync_vendor(vendor)
     
     # In production, you'd also:
     # 1. Notify pending customers if deactivating
@@ -557,22 +526,17 @@ def get_vendors_near_location(
 ):
     """Get vendors near a specific location with advanced filtering"""
     
-    # Simple bounding box calculation
-    lat_delta = radius_km / 111.0
-    lng_delta = radius_km / (111.320 * abs(lat) / 90.0) if lat else radius_km / 111.320
+    # Bounding box prefilter on the raw coordinate columns
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
     
-    min_lat = lat - lat_delta
-    max_lat = lat + lat_delta
-    min_lng = lng - lng_delta
-    max_lng = lng + lng_delta
-    
-    query = db.query(Vendor).filter(
+    query = db.query(Vendor.id, Vendor.latitude, Vendor.longitude).filter(
         and_(
             Vendor.is_active == True,
-            Vendor.latitude.between(min_lat, max_lat),
-            Vendor.longitude.between(min_lng, max_lng)
+            Vendor.latitude.between(min_lat, max_lat)
         )
     )
+    if min_lng is not None:
+        query = query.filter(Vendor.longitude.between(min_lng, max_lng))
     
     # Filter by vendor type
     if vendor_type:
@@ -589,15 +553,18 @@ def get_vendors_near_location(
             )
         )
     
-    vendors = query.limit(limit).all()
+    # Exact distances and top-k selection over all candidates in one vectorized call
+    candidates = CoordinateSet.from_rows(query.all())
+    vendor_ids, distances = candidates.nearest(lat, lng, limit, max_radius_km=radius_km)
+    if not len(vendor_ids):
+        return []
     
-    # Calculate distances and sort by proximity
-    # In production, you'd use proper geospatial calculations
+    distance_by_id = dict(zip(vendor_ids.tolist(), distances.tolist()))
+    vendors = db.query(Vendor).filter(Vendor.id.in_(list(distance_by_id))).all()
     for vendor in vendors:
-        # Simplified distance calculation
-        vendor.distance_km = ((vendor.latitude - lat) ** 2 + (vendor.longitude - lng) ** 2) ** 0.5 * 111
+        vendor.distance_km = distance_by_id[vendor.id]
     
     # Sort by distance
-    vendors.sort(key=lambda v: getattr(v, 'distance_km', float('inf')))
+    vendors.sort(key=lambda v: v.distance_km)
     
-    return vendors
\ No newline at end of file
+    return vendors
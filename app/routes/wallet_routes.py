@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 from ..shared.database import get_db
 from ..shared.api_key_route import verify_api_key
 from ..services.commands import (
@@ -10,6 +10,8 @@ from ..services.commands import (
     ProcessOrderPaymentCommand, ProcessOrderPaymentHandler,
     SetTransactionPinCommand, SetTransactionPinHandler
 )
+from ..services.wallet_audit import wallet_audit
+from ..services.settlement import settlement_engine
 from ..services.queries import (
     GetWalletBalanceQuery, GetWalletBalanceQueryHandler,
     GetWalletTransactionsQuery, GetWalletTransactionsQueryHandler,
@@ -18,7 +20,8 @@ from ..services.queries import (
 from ..schemas import (
     WalletFundRequest, WalletWithdrawRequest, WalletTransferRequest,
     SetTransactionPinRequest, UserWalletResponse, VendorWalletResponse,
-    RiderWalletResponse, WalletTransactionResponse, WalletBalanceResponse
+    RiderWalletResponse, WalletTransactionResponse, WalletTransactionPage, WalletTransferResponse, WalletBalanceResponse,
+    WalletAuditResponse, WalletSnapshotResponse, SettlementResponse
 )
 
 router = APIRouter(prefix="/api/wallet", tags=["Wallets"], dependencies=[Depends(verify_api_key)])
@@ -58,15 +61,15 @@ def withdraw_from_user_wallet(user_id: int, request: WalletWithdrawRequest, db:
     handler = WithdrawFromWalletHandler(db)
     return handler.handle(command)
 
-@router.get("/user/{user_id}/transactions", response_model=List[WalletTransactionResponse])
+@router.get("/user/{user_id}/transactions", response_model=WalletTransactionPage)
 def get_user_wallet_transactions(
     user_id: int, 
-    limit: int = 50, 
-    offset: int = 0, 
+    limit: int = Query(50, ge=1, le=200), 
+    cursor: Optional[str] = None, 
     db: Session = Depends(get_db), 
 ):
     """Get user wallet transaction history"""
-    query = GetWalletTransactionsQuery(wallet_type="user", owner_id=user_id, limit=limit, offset=offset)
+    query = GetWalletTransactionsQuery(wallet_type="user", owner_id=user_id, limit=limit, cursor=cursor)
     handler = GetWalletTransactionsQueryHandler(db)
     return handler.handle(query)
 
@@ -103,15 +106,15 @@ def withdraw_from_vendor_wallet(vendor_id: int, request: WalletWithdrawRequest,
     handler = WithdrawFromWalletHandler(db)
     return handler.handle(command)
 
-@router.get("/vendor/{vendor_id}/transactions", response_model=List[WalletTransactionResponse])
+@router.get("/vendor/{vendor_id}/transactions", response_model=WalletTransactionPage)
 def get_vendor_wallet_transactions(
     vendor_id: int, 
-    limit: int = 50, 
-    offset: int = 0, 
+    limit: int = Query(50, ge=1, le=200), 
+    cursor: Optional[str] = None, 
     db: Session = Depends(get_db), 
 ):
     """Get vendor wallet transaction history"""
-    query = GetWalletTransactionsQuery(wallet_type="vendor", owner_id=vendor_id, limit=limit, offset=offset)
+    query = GetWalletTransactionsQuery(wallet_type="vendor", owner_id=vendor_id, limit=limit, cursor=cursor)
     handler = GetWalletTransactionsQueryHandler(db)
     return handler.handle(query)
 
@@ -138,21 +141,21 @@ def withdraw_from_rider_wallet(rider_id: int, request: WalletWithdrawRequest, db
     handler = WithdrawFromWalletHandler(db)
     return handler.handle(command)
 
-@router.get("/rider/{rider_id}/transactions", response_model=List[WalletTransactionResponse])
+@router.get("/rider/{rider_id}/transactions", response_model=WalletTransactionPage)
 def get_rider_wallet_transactions(
     rider_id: int, 
-    limit: int = 50, 
-    offset: int = 0, 
+    limit: int = Query(50, ge=1, le=200), 
+    cursor: Optional[str] = None, 
     db: Session = Depends(get_db)
 ):
     """Get rider wallet transaction history"""
-    query = GetWalletTransactionsQuery(wallet_type="rider", owner_id=rider_id, limit=limit, offset=offset)
+    query = GetWalletTransactionsQuery(wallet_type="rider", owner_id=rider_id, limit=limit, cursor=cursor)
     handler = GetWalletTransactionsQueryHandler(db)
     return handler.handle(query)
 
 # ===== Transfer Routes =====
 
-@router.post("/transfer", response_model=dict)
+@router.post("/transfer", response_model=WalletTransferResponse)
 def transfer_between_wallets(request: WalletTransferRequest, db: Session = Depends(get_db)):
     """Transfer money between wallets"""
     # Note: In a real application, you'd need to verify the sender's identity and PIN
@@ -185,6 +188,25 @@ def get_transaction_details(
     handler = GetWalletTransactionQueryHandler(db)
     return handler.handle(query)
 
+# ===== Ledger Audit =====
+
+@router.get("/audit", response_model=WalletAuditResponse)
+def verify_wallet_balances(db: Session = Depends(get_db)):
+    """Compare every wallet balance with its transaction log, replaying only transactions since the last snapshot"""
+    return wallet_audit.verify(db)
+
+@router.post("/audit/snapshot", response_model=WalletSnapshotResponse)
+def snapshot_wallet_balances(db: Session = Depends(get_db)):
+    """Checkpoint the ledger balance of every wallet now instead of waiting for the background audit"""
+    return WalletSnapshotResponse(wallets=wallet_audit.snapshot(db))
+
+# ===== Settlement =====
+
+@router.post("/settlements/run", response_model=SettlementResponse)
+def run_settlement(db: Session = Depends(get_db)):
+    """Accrue delivered-order earnings and pay out pending vendor and rider balances now"""
+    return settlement_engine.run(db)
+
 # ===== Payment Processing (Internal) =====
 
 @router.post("/internal/process-payment", response_model=WalletTransactionResponse)
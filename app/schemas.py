@@ -1,8 +1,10 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel, EmailStr, Field, HttpUrl
 from enum import Enum
 
+from .shared.money import Money
+
 
 # ====================================================
 # ENUM SCHEMAS
@@ -72,7 +74,7 @@ class UserResponse(UserBase):
 
 class ItemBase(BaseModel):
     name: str
-    base_price: float
+    base_price: Money
     description: Optional[str]
     image_url: Optional[str]
     is_available: Optional[bool]
@@ -94,7 +96,7 @@ class ItemCreate(ItemBase):
 class ItemUpdate(BaseModel):
     name: Optional[str]
     description: Optional[str]
-    base_price: Optional[float]
+    base_price: Optional[Money]
     image_url: Optional[str]
     is_available: Optional[bool]
     allows_addons: Optional[bool]
@@ -276,6 +278,20 @@ class VendorResponse(VendorBase):
         from_attributes = True
 
 
+# ====================================================
+# SEARCH SCHEMAS
+# ====================================================
+
+class SuggestionResponse(BaseModel):
+    kind: str                       # "vendor", "item" or "category"
+    entity_id: int
+    name: str
+    vendor_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
 # ====================================================
 # ITEM ADDON GROUP SCHEMAS
 # ====================================================
@@ -317,7 +333,7 @@ class ItemAddonBase(BaseModel):
     group_id: int
     name: str
     description: Optional[str] = None
-    price: float
+    price: Money
     is_available: Optional[bool] = True
 
     class Config:
@@ -329,7 +345,7 @@ class ItemAddonCreate(ItemAddonBase):
 class ItemAddonUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
-    price: Optional[float] = None
+    price: Optional[Money] = None
     is_available: Optional[bool] = None
 
 class ItemAddonResponse(ItemAddonBase):
@@ -348,7 +364,7 @@ class ItemVariationBase(BaseModel):
     item_id: int
     name: str
     description: Optional[str] = None
-    price: float
+    price: Money
     is_available: Optional[bool] = True
 
     class Config:
@@ -360,7 +376,7 @@ class ItemVariationCreate(ItemVariationBase):
 class ItemVariationUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
-    price: Optional[float] = None
+    price: Optional[Money] = None
     is_available: Optional[bool] = None
 
 class ItemVariationResponse(ItemVariationBase):
@@ -378,7 +394,7 @@ class ItemVariationResponse(ItemVariationBase):
 class OrderItemAddonBase(BaseModel):
     order_item_id: int
     addon_id: int
-    price: float
+    price: Money
 
     class Config:
         from_attributes = True
@@ -403,8 +419,8 @@ class OrderItemBase(BaseModel):
     item_id: int
     variation_id: Optional[int] = None
     quantity: int
-    unit_price: float
-    subtotal: float
+    unit_price: Money
+    subtotal: Money
     notes: Optional[str] = None
 
     class Config:
@@ -416,8 +432,8 @@ class OrderItemCreate(OrderItemBase):
 class OrderItemUpdate(BaseModel):
     variation_id: Optional[int] = None
     quantity: Optional[int] = None
-    unit_price: Optional[float] = None
-    subtotal: Optional[float] = None
+    unit_price: Optional[Money] = None
+    subtotal: Optional[Money] = None
     notes: Optional[str] = None
 
 class OrderItemResponse(OrderItemBase):
@@ -463,9 +479,9 @@ class OrderBase(BaseModel):
     rider_id: Optional[int] = None
     delivery_address_id: int
     status: Optional[OrderStatus] = OrderStatus.PENDING
-    subtotal: float
-    delivery_fee: Optional[float] = None
-    total: float
+    subtotal: Money
+    delivery_fee: Optional[Money] = None
+    total: Money
     notes: Optional[str] = None
     estimated_delivery_time: Optional[datetime] = None
 
@@ -478,8 +494,8 @@ class OrderCreate(OrderBase):
 class OrderUpdate(BaseModel):
     rider_id: Optional[int] = None
     status: Optional[OrderStatus] = None
-    delivery_fee: Optional[float] = None
-    total: Optional[float] = None
+    delivery_fee: Optional[Money] = None
+    total: Optional[Money] = None
     notes: Optional[str] = None
     estimated_delivery_time: Optional[datetime] = None
 
@@ -501,7 +517,7 @@ class OrderResponse(OrderBase):
 class CartItemAddonBase(BaseModel):
     cart_item_id: int
     addon_id: int
-    price: float
+    price: Money
 
     class Config:
         from_attributes = True
@@ -520,13 +536,13 @@ class CartItemAddonResponse(CartItemAddonBase):
 # ===== Wallet Schemas =====
 
 class UserWalletBase(BaseModel):
-    daily_limit: Optional[float] = 50000.0
+    daily_limit: Optional[Money] = 50000.0
     is_active: Optional[bool] = True
 
 class UserWalletResponse(UserWalletBase):
     id: int
     user_id: int
-    balance: float
+    balance: Money
     is_locked: bool
     last_transaction_at: Optional[datetime]
     created_at: datetime
@@ -537,14 +553,14 @@ class UserWalletResponse(UserWalletBase):
 
 class VendorWalletBase(BaseModel):
     commission_rate: Optional[float] = 0.15
-    minimum_withdrawal: Optional[float] = 1000.0
+    minimum_withdrawal: Optional[Money] = 1000.0
     is_active: Optional[bool] = True
 
 class VendorWalletResponse(VendorWalletBase):
     id: int
     vendor_id: int
-    balance: float
-    pending_balance: float
+    balance: Money
+    pending_balance: Money
     is_locked: bool
     last_transaction_at: Optional[datetime]
     last_settlement_at: Optional[datetime]
@@ -555,15 +571,15 @@ class VendorWalletResponse(VendorWalletBase):
         from_attributes = True
 
 class RiderWalletBase(BaseModel):
-    delivery_rate: Optional[float] = 500.0
-    minimum_withdrawal: Optional[float] = 500.0
+    delivery_rate: Optional[Money] = 500.0
+    minimum_withdrawal: Optional[Money] = 500.0
     is_active: Optional[bool] = True
 
 class RiderWalletResponse(RiderWalletBase):
     id: int
     rider_id: int
-    balance: float
-    pending_balance: float
+    balance: Money
+    pending_balance: Money
     is_locked: bool
     last_transaction_at: Optional[datetime]
     last_settlement_at: Optional[datetime]
@@ -574,18 +590,18 @@ class RiderWalletResponse(RiderWalletBase):
         from_attributes = True
 
 class WalletTransactionBase(BaseModel):
-    amount: float
+    amount: Money
     description: str
     reference_id: Optional[str] = None
     reference_type: Optional[str] = None
 
 class WalletFundRequest(BaseModel):
-    amount: float
+    amount: Money
     description: Optional[str] = "Wallet funding"
     payment_method: str  # e.g., "bank_transfer", "card", "mobile_money"
 
 class WalletWithdrawRequest(BaseModel):
-    amount: float
+    amount: Money
     description: Optional[str] = "Wallet withdrawal"
     withdrawal_method: str  # e.g., "bank_transfer", "mobile_money"
     account_details: dict  # Account information for withdrawal
@@ -593,7 +609,7 @@ class WalletWithdrawRequest(BaseModel):
 class WalletTransferRequest(BaseModel):
     recipient_type: str  # "user", "vendor", or "rider"
     recipient_id: int
-    amount: float
+    amount: Money
     description: Optional[str] = "Wallet transfer"
     transaction_pin: str
 
@@ -604,8 +620,8 @@ class WalletTransactionResponse(WalletTransactionBase):
     rider_wallet_id: Optional[int]
     transaction_type: str
     status: str
-    balance_before: float
-    balance_after: float
+    balance_before: Money
+    balance_after: Money
     processed_at: Optional[datetime]
     processor_id: Optional[str]
     created_at: datetime
@@ -614,15 +630,58 @@ class WalletTransactionResponse(WalletTransactionBase):
     class Config:
         from_attributes = True
 
+class WalletTransactionPage(BaseModel):
+    transactions: List[WalletTransactionResponse]
+    next_cursor: Optional[str] = None  # Pass as cursor for the next page; None on the last page
+
+class WalletTransferResponse(BaseModel):
+    sender_transaction: WalletTransactionResponse
+    recipient_transaction: WalletTransactionResponse
+    message: str
+
 class WalletBalanceResponse(BaseModel):
-    balance: float
-    pending_balance: Optional[float]
+    balance: Money
+    pending_balance: Optional[Money]
     last_transaction_at: Optional[datetime]
 
 class SetTransactionPinRequest(BaseModel):
     transaction_pin: str
     confirm_pin: str
 
+class WalletDriftResponse(BaseModel):
+    wallet_type: str
+    wallet_id: int
+    owner_id: int
+    balance: Money
+    ledger_balance: Money
+    difference: Money
+
+    class Config:
+        from_attributes = True
+
+class WalletAuditResponse(BaseModel):
+    wallets: int
+    transactions_replayed: int
+    checkpoint_transaction_id: int
+    seconds: float
+    drift: List[WalletDriftResponse]
+
+    class Config:
+        from_attributes = True
+
+class WalletSnapshotResponse(BaseModel):
+    wallets: int
+
+class SettlementResponse(BaseModel):
+    reference_id: str
+    orders_accrued: int
+    wallets_settled: Dict[str, int]
+    amount_settled: Dict[str, Money]
+    seconds: float
+
+    class Config:
+        from_attributes = True
+
 
 # ====================================================
 # CART ITEM SCHEMAS
@@ -633,8 +692,8 @@ class CartItemBase(BaseModel):
     item_id: int
     variation_id: Optional[int] = None
     quantity: int = 1
-    unit_price: float
-    subtotal: float
+    unit_price: Money
+    subtotal: Money
     notes: Optional[str] = None
 
     class Config:
@@ -646,8 +705,8 @@ class CartItemCreate(CartItemBase):
 class CartItemUpdate(BaseModel):
     variation_id: Optional[int] = None
     quantity: Optional[int] = None
-    unit_price: Optional[float] = None
-    subtotal: Optional[float] = None
+    unit_price: Optional[Money] = None
+    subtotal: Optional[Money] = None
     notes: Optional[str] = None
 
 class CartItemResponse(CartItemBase):
@@ -667,7 +726,7 @@ class CartItemResponse(CartItemBase):
 class CartBase(BaseModel):
     user_id: int
     vendor_id: int
-    subtotal: Optional[float] = 0.0
+    subtotal: Optional[Money] = 0.0
     notes: Optional[str] = None
     expires_at: Optional[datetime] = None
 
@@ -678,7 +737,7 @@ class CartCreate(CartBase):
     items: Optional[List[CartItemCreate]] = []
 
 class CartUpdate(BaseModel):
-    subtotal: Optional[float] = None
+    subtotal: Optional[Money] = None
     notes: Optional[str] = None
     expires_at: Optional[datetime] = None
 
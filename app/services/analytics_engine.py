@@ -0,0 +1,239 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import BigInteger, func, select, type_coerce
+from sqlalchemy.orm import Session
+
+from ..models import Order, OrderStatus, OrderTracking, WalletTransaction, WalletTransactionType
+from ..shared.money import to_major
+
+
+CHUNK_ROWS = 50_000
+
+ORDER_COLUMNS = ["id", "user_id", "vendor_id", "rider_id", "status", "subtotal",
+                 "delivery_fee", "total", "created_at", "delivered_at"]
+TRANSACTION_COLUMNS = ["id", "transaction_type", "status", "amount", "created_at"]
+
+
+# ==================
+# LOADING
+# ==================
+
+def _read_frame(db: Session, statement, columns: List[str], chunk_rows: int, convert) -> pd.DataFrame:
+    """
+    Stream a select into one DataFrame.
+
+    Rows arrive from a server-side cursor chunk_rows at a time, and each
+    chunk is converted to compact columns before the next is fetched, so
+    peak memory is one chunk of tuples plus the columnar result.
+    """
+    result = db.execute(statement.execution_options(yield_per=chunk_rows))
+    chunks = [convert(pd.DataFrame.from_records(rows, columns=columns)) for rows in result.partitions()]
+    if not chunks:
+        return convert(pd.DataFrame(columns=columns))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _enum_names(values: pd.Series, enum_type) -> pd.Categorical:
+    names = [member.name for member in enum_type]
+    return pd.Categorical(values.map(lambda member: member.name if member is not None else None), categories=names)
+
+
+def _timestamps(values: pd.Series) -> pd.Series:
+    return pd.to_datetime(values, utc=True)
+
+
+def _minor(column):
+    """A money column as its stored integer minor units, so frame sums are exact"""
+    return type_coerce(column, BigInteger)
+
+
+# ==================
+# ORDER FRAME
+# ==================
+
+class OrderFrame:
+    """
+    Orders of a window as columns: one row per order with its delivery time.
+
+    Breakdowns are vectorised groupby/resample over the frame, so a report
+    reads each order once however many series it derives from them. Money
+    columns hold int64 minor units and are summed as integers; results are
+    converted to major units on the way out.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    @classmethod
+    def load(cls, db: Session, start: datetime, end: Optional[datetime] = None,
+             vendor_id: Optional[int] = None, rider_id: Optional[int] = None,
+             chunk_rows: int = CHUNK_ROWS) -> "OrderFrame":
+        """Orders created in [start, end); delivered_at is the first DELIVERED tracking entry"""
+        delivered = select(
+            OrderTracking.order_id.label("order_id"),
+            func.min(OrderTracking.created_at).label("delivered_at")
+        ).where(
+            OrderTracking.status == OrderStatus.DELIVERED,
+            OrderTracking.created_at >= start
+        ).group_by(OrderTracking.order_id).subquery()
+
+        statement = select(
+            Order.id, Order.user_id, Order.vendor_id, Order.rider_id, Order.status, _minor(Order.subtotal),
+            _minor(Order.delivery_fee), _minor(Order.total), Order.created_at, delivered.c.delivered_at
+        ).outerjoin(
+            delivered, delivered.c.order_id == Order.id
+        ).where(Order.created_at >= start)
+        if end is not None:
+            statement = statement.where(Order.created_at < end)
+        if vendor_id is not None:
+            statement = statement.where(Order.vendor_id == vendor_id)
+        if rider_id is not None:
+            statement = statement.where(Order.rider_id == rider_id)
+        return cls(_read_frame(db, statement, ORDER_COLUMNS, chunk_rows, cls._convert))
+
+    @staticmethod
+    def _convert(chunk: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame({
+            "id": chunk["id"].astype("int64"),
+            "user_id": chunk["user_id"].astype("int64"),
+            "vendor_id": chunk["vendor_id"].astype("int64"),
+            "rider_id": chunk["rider_id"].astype("Int64"),
+            "status": _enum_names(chunk["status"], OrderStatus),
+            "subtotal": chunk["subtotal"].astype("int64"),
+            "delivery_fee": chunk["delivery_fee"].fillna(0).astype("int64"),
+            "total": chunk["total"].astype("int64"),
+            "created_at": _timestamps(chunk["created_at"]),
+            "delivered_at": _timestamps(chunk["delivered_at"]),
+        })
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _is(self, *statuses: OrderStatus) -> np.ndarray:
+        return self.frame["status"].isin([order_status.name for order_status in statuses]).to_numpy()
+
+    def summary(self) -> Dict[str, float]:
+        """Order counts plus revenue and average value of delivered orders"""
+        delivered = self._is(OrderStatus.DELIVERED)
+        revenue = to_major(int(self.frame["total"].to_numpy()[delivered].sum()))
+        delivered_count = int(delivered.sum())
+        return {
+            "orders": len(self.frame),
+            "delivered_orders": delivered_count,
+            "cancelled_orders": int(self._is(OrderStatus.CANCELLED).sum()),
+            "revenue": revenue,
+            "average_order_value": revenue / delivered_count if delivered_count else 0.0,
+        }
+
+    def by_status(self) -> Dict[str, int]:
+        """Order count per status value, statuses without orders omitted"""
+        counts = self.frame["status"].value_counts()
+        return {OrderStatus[name].value: int(count) for name, count in counts.items() if count}
+
+    def daily(self, statuses: Optional[Iterable[OrderStatus]] = None) -> pd.DataFrame:
+        """orders and revenue per UTC day, gaps filled with zeros"""
+        frame = self.frame if statuses is None else self.frame[self._is(*statuses)]
+        daily = frame.set_index("created_at")["total"].resample("D").agg(["size", "sum"]).rename(
+            columns={"size": "orders", "sum": "revenue"}
+        )
+        daily["revenue"] = to_major(daily["revenue"])
+        return daily
+
+    def hourly(self, statuses: Optional[Iterable[OrderStatus]] = None) -> pd.Series:
+        """Orders per UTC hour of day, all 24 hours present"""
+        frame = self.frame if statuses is None else self.frame[self._is(*statuses)]
+        return frame["created_at"].dt.hour.value_counts().reindex(range(24), fill_value=0)
+
+    def by_vendor(self) -> pd.DataFrame:
+        """Per vendor: total_orders, completed_orders, cancelled_orders, revenue, average_order_value"""
+        return self._breakdown("vendor_id")
+
+    def by_rider(self) -> pd.DataFrame:
+        """Per assigned rider: the vendor columns plus earnings and average_delivery_minutes"""
+        frame = self.frame[self.frame["rider_id"].notna()]
+        breakdown = OrderFrame(frame)._breakdown("rider_id")
+        delivered = frame["status"].to_numpy() == OrderStatus.DELIVERED.name
+        minutes = (frame["delivered_at"] - frame["created_at"]).dt.total_seconds() / 60
+        per_rider = pd.DataFrame({
+            "rider_id": frame["rider_id"].to_numpy(),
+            "earnings": np.where(delivered, frame["delivery_fee"].to_numpy(), 0),
+            "minutes": minutes.where(delivered).to_numpy(),
+        }).groupby("rider_id").agg(earnings=("earnings", "sum"), average_delivery_minutes=("minutes", "mean"))
+        per_rider["earnings"] = to_major(per_rider["earnings"])
+        breakdown.index = breakdown.index.astype("int64")
+        per_rider.index = per_rider.index.astype("int64")
+        return breakdown.join(per_rider)
+
+    def _breakdown(self, key: str) -> pd.DataFrame:
+        delivered = self._is(OrderStatus.DELIVERED)
+        grouped = pd.DataFrame({
+            key: self.frame[key].to_numpy(),
+            "completed": delivered,
+            "cancelled": self._is(OrderStatus.CANCELLED),
+            "revenue": np.where(delivered, self.frame["total"].to_numpy(), 0),
+        }).groupby(key).agg(
+            total_orders=("completed", "size"),
+            completed_orders=("completed", "sum"),
+            cancelled_orders=("cancelled", "sum"),
+            revenue=("revenue", "sum"),
+        )
+        grouped["revenue"] = to_major(grouped["revenue"])
+        grouped["average_order_value"] = (
+            grouped["revenue"] / grouped["completed_orders"].where(grouped["completed_orders"] > 0)
+        ).fillna(0.0)
+        grouped["completion_rate"] = grouped["completed_orders"] / grouped["total_orders"] * 100
+        return grouped
+
+
+# ==================
+# TRANSACTION FRAME
+# ==================
+
+class TransactionFrame:
+    """Wallet transactions of a window as columns, for volume breakdowns; amounts in int64 minor units"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    @classmethod
+    def load(cls, db: Session, start: datetime, end: Optional[datetime] = None,
+             chunk_rows: int = CHUNK_ROWS) -> "TransactionFrame":
+        statement = select(
+            WalletTransaction.id, WalletTransaction.transaction_type, WalletTransaction.status,
+            _minor(WalletTransaction.amount), WalletTransaction.created_at
+        ).where(WalletTransaction.created_at >= start)
+        if end is not None:
+            statement = statement.where(WalletTransaction.created_at <= end)
+        return cls(_read_frame(db, statement, TRANSACTION_COLUMNS, chunk_rows, cls._convert))
+
+    @staticmethod
+    def _convert(chunk: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame({
+            "id": chunk["id"].astype("int64"),
+            "transaction_type": pd.Categorical(
+                chunk["transaction_type"].map(lambda member: member.value),
+                categories=[member.value for member in WalletTransactionType]
+            ),
+            "status": chunk["status"].map(lambda member: member.value if member is not None else None),
+            "amount": chunk["amount"].astype("int64"),
+            "created_at": _timestamps(chunk["created_at"]),
+        })
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def volume_by_type(self) -> Dict[str, float]:
+        """Summed amount per transaction type value, every type present"""
+        volumes = self.frame.groupby("transaction_type", observed=False)["amount"].sum()
+        return {name: to_major(int(volume)) for name, volume in volumes.items()}
+
+    def daily(self) -> pd.DataFrame:
+        """transactions and volume per UTC day, gaps filled with zeros"""
+        daily = self.frame.set_index("created_at")["amount"].resample("D").agg(["size", "sum"]).rename(
+            columns={"size": "transactions", "sum": "volume"}
+        )
+        daily["volume"] = to_major(daily["volume"])
+        return daily
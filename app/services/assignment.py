@@ -0,0 +1,220 @@
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+
+# Regret assigned to rows with a single feasible column: they are served first
+_SOLE_OPTION_REGRET = np.float32(np.finfo(np.float32).max)
+
+
+# ==================
+# ASSIGNMENT SOLVER
+# ==================
+
+def _two_best(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Column index and value of the smallest and second smallest entry of every row"""
+    rows, cols = cost.shape
+    if cols == 1:
+        best_col = np.zeros(rows, dtype=np.intp)
+        # Column index `cols` is a sentinel that is never taken
+        return best_col, cost[:, 0].copy(), np.full(rows, cols, dtype=np.intp), np.full(rows, np.inf, dtype=cost.dtype)
+
+    pair = np.argpartition(cost, 1, axis=1)[:, :2]
+    pair_values = np.take_along_axis(cost, pair, axis=1)
+    swap = pair_values[:, 1] < pair_values[:, 0]
+    pair[swap] = pair[swap][:, ::-1]
+    pair_values[swap] = pair_values[swap][:, ::-1]
+    return pair[:, 0], pair_values[:, 0], pair[:, 1], pair_values[:, 1]
+
+
+def solve_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy-with-regret assignment of rows (orders) to columns (riders).
+
+    cost[i, j] is the cost of giving row i to column j; np.inf marks pairs
+    that must not be matched. Each round, every open row looks at its best
+    and second-best free column; the row that would lose most by not getting
+    its best column ("regret") claims it, and all uncontested claims are
+    granted together. Only rows whose best or second-best column was just
+    taken are re-scanned, so a round costs far less than a full pass over
+    the matrix. The greedy rounds can leave rows unmatched that a different
+    choice would have served, so augmenting paths then grow the matching to
+    the largest possible size: the number of matched rows comes first and
+    cost second. Finally a local search that keeps the number of matches
+    moves pairs onto cheaper idle rows and columns and swaps crossed
+    assignments.
+
+    Returns (row_indices, column_indices) of the matched pairs.
+    """
+    original = np.asarray(cost, dtype=np.float32)
+    cost = original.copy()
+    n_rows, n_cols = cost.shape
+    matched_rows: List[np.ndarray] = [np.empty(0, dtype=np.intp)]
+    matched_cols: List[np.ndarray] = [np.empty(0, dtype=np.intp)]
+    if n_rows == 0 or n_cols == 0:
+        return matched_rows[0], matched_cols[0]
+
+    open_rows = np.flatnonzero(np.isfinite(cost).any(axis=1))
+    best_col, best, second_col, second = _two_best(cost[open_rows])
+    taken = np.zeros(n_cols + 1, dtype=bool)
+
+    while open_rows.size:
+        feasible = np.isfinite(best)
+        if not feasible.all():
+            open_rows, best_col, best = open_rows[feasible], best_col[feasible], best[feasible]
+            second_col, second = second_col[feasible], second[feasible]
+            if not open_rows.size:
+                break
+
+        regret = np.where(np.isfinite(second), second - best, _SOLE_OPTION_REGRET)
+        # Highest regret first, cheaper best cost breaks ties
+        ranking = np.lexsort((best, -regret))
+        _, first_claim = np.unique(best_col[ranking], return_index=True)
+        winners = ranking[first_claim]
+
+        win_cols = best_col[winners]
+        matched_rows.append(open_rows[winners])
+        matched_cols.append(win_cols)
+        cost[:, win_cols] = np.inf
+        taken[win_cols] = True
+
+        remaining = np.ones(open_rows.size, dtype=bool)
+        remaining[winners] = False
+        open_rows, best_col, best = open_rows[remaining], best_col[remaining], best[remaining]
+        second_col, second = second_col[remaining], second[remaining]
+
+        stale = taken[best_col] | taken[second_col]
+        if stale.any():
+            best_col[stale], best[stale], second_col[stale], second[stale] = _two_best(cost[open_rows[stale]])
+
+    rows, cols = _augment(original, np.concatenate(matched_rows), np.concatenate(matched_cols))
+    return _improve_by_swaps(original, rows, cols)
+
+
+def _augment(cost: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grow a matching to maximum size along augmenting paths (Hopcroft-Karp).
+
+    Each phase runs one breadth-first search from all unmatched rows at
+    once, a layer per step: a layer's rows reach every feasible column not
+    reached before, and the rows holding those columns form the next layer,
+    until an idle column turns up. A depth-first search back through the
+    layers from each idle column reached then flips a maximal set of
+    vertex-disjoint shortest paths, each adding one pair; cheaper rows are
+    tried first. Phases repeat until no idle column is reachable.
+    """
+    n_rows, n_cols = cost.shape
+    feasible = np.isfinite(cost)
+    col_of = np.full(n_rows, -1, dtype=np.intp)
+    row_of = np.full(n_cols, -1, dtype=np.intp)
+    col_of[rows], row_of[cols] = cols, rows
+    candidates = feasible.any(axis=1)
+
+    while True:
+        layers = [np.flatnonzero(candidates & (col_of < 0))]
+        reached = np.zeros(n_cols, dtype=bool)
+        reached_idle = np.empty(0, dtype=np.intp)
+        while layers[-1].size:
+            new_cols = np.flatnonzero(feasible[layers[-1]].any(axis=0) & ~reached)
+            if not new_cols.size:
+                break
+            reached[new_cols] = True
+            reached_idle = new_cols[row_of[new_cols] < 0]
+            if reached_idle.size:
+                break
+            layers.append(row_of[new_cols])
+        if not reached_idle.size:
+            break
+
+        # A row is tried at most once per phase, whether or not a path through it succeeded
+        untried = np.ones(n_rows, dtype=bool)
+
+        def predecessors(depth: int, col: int) -> Iterator[int]:
+            layer = layers[depth]
+            options = layer[feasible[layer, col] & untried[layer]]
+            return iter(options[np.argsort(cost[options, col], kind="stable")].tolist())
+
+        for idle_col in reached_idle.tolist():
+            path = [(idle_col, predecessors(len(layers) - 1, idle_col))]
+            path_rows: List[int] = []
+            while path:
+                col, options = path[-1]
+                row = next((row for row in options if untried[row]), -1)
+                if row < 0:
+                    path.pop()
+                    if path_rows:
+                        path_rows.pop()
+                    continue
+                untried[row] = False
+                depth = len(layers) - len(path)
+                if depth > 0:
+                    path_rows.append(row)
+                    path.append((col_of[row], predecessors(depth - 1, col_of[row])))
+                    continue
+                for row, (col, _) in zip(path_rows + [row], path):
+                    col_of[row], row_of[col] = col, row
+                break
+
+    rows = np.flatnonzero(col_of >= 0)
+    return rows, col_of[rows]
+
+
+def _improve_by_swaps(cost: np.ndarray, rows: np.ndarray, cols: np.ndarray,
+                      max_rounds: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Local improvement pass over a finished assignment.
+
+    Each round first moves pairs onto cheaper idle rows and columns, then
+    evaluates the gain of swapping every two matched pairs (i, j) and (k, l)
+    to (i, l) and (k, j) at once as an a-by-a matrix and applies the best
+    disjoint improving swaps, until nothing improves or max_rounds is reached.
+    No move changes the number of matched pairs.
+    """
+    rows, cols = rows.copy(), cols.copy()
+    if rows.size < 2:
+        return _move_to_idle_both(cost, rows, cols)
+    for _ in range(max_rounds):
+        rows, cols = _move_to_idle_both(cost, rows, cols)
+        current = cost[rows, cols]
+        crossed = cost[np.ix_(rows, cols)]  # crossed[p, q]: row p served by the column of pair q
+        gain = current[:, None] + current[None, :] - crossed - crossed.T
+        partner = gain.argmax(axis=1)
+        best_gain = gain[np.arange(rows.size), partner]
+        improving = np.flatnonzero(best_gain > 1e-4)
+        if not improving.size:
+            break
+        used = np.zeros(rows.size, dtype=bool)
+        for p in improving[np.argsort(-best_gain[improving])].tolist():
+            q = partner[p]
+            if used[p] or used[q]:
+                continue
+            used[p] = used[q] = True
+            cols[p], cols[q] = cols[q], cols[p]
+    return _move_to_idle_both(cost, rows, cols)
+
+
+def _move_to_idle_both(cost: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Move rows onto cheaper idle columns, then hand columns to unmatched rows they are cheaper for"""
+    cols = _move_to_idle(cost, rows, cols)
+    return _move_to_idle(cost.T, cols, rows), cols
+
+
+def _move_to_idle(cost: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Hand a matched row to a still-unmatched column whenever that is cheaper"""
+    idle = np.setdiff1d(np.arange(cost.shape[1]), cols)
+    if not idle.size:
+        return cols
+    current = cost[rows, cols]
+    options = cost[np.ix_(rows, idle)]
+    for p in np.argsort(current - options.min(axis=1))[::-1].tolist():
+        q = int(options[p].argmin())
+        if options[p, q] >= current[p]:
+            continue
+        options[:, q] = np.inf
+        freed = cols[p]
+        cols[p] = idle[q]
+        # The freed column becomes idle for the remaining rows
+        idle[q] = freed
+        options[:, q] = cost[rows, freed]
+        options[p, q] = np.inf
+    return cols
@@ -7,9 +7,14 @@ from ..models import (
     Rider, RiderStatus, Order, OrderStatus, ItemAddonGroup, ItemAddon, 
     ItemVariation, OrderItem, OrderItemAddon, OrderTracking, 
     Cart, CartItem, CartItemAddon, UserWallet, VendorWallet, 
-    RiderWallet, WalletTransaction, WalletTransactionType, WalletTransactionStatus
+    RiderWallet, WalletTransactionType, WalletTransactionStatus
 )
 from ..utils.errors import ErrorHandler, ErrorMessages
+from .spatial_index import vendor_spatial_index
+from .suggestions import name_suggester, ITEM, CATEGORY
+from .location_store import rider_location_store
+from .ledger import wallet_ledger, LedgerError
+from ..shared.money import Amount
 from dataclasses import dataclass
 from typing import Optional, List
 
@@ -319,6 +324,10 @@ class CreateVendorHandler:
                 # Automatically create vendor wallet
                 create_vendor_wallet(self.db, vendor.id)
                 
+                # Make the new vendor discoverable by nearby search
+                vendor_spatial_index.sync_vendor(vendor)
+                name_suggester.sync_vendor(vendor)
+                
                 return vendor
             except Exception as e:
                 self.db.rollback()
@@ -379,7 +388,12 @@ class UpdateVendorHandler:
             Vendor.closing_time: command.closing_time,
         })
         self.db.commit()
-        return vendor_query.first()
+        
+        updated_vendor = vendor_query.first()
+        # Keep nearby search in step with location and activation changes
+        vendor_spatial_index.sync_vendor(updated_vendor)
+        name_suggester.sync_vendor(updated_vendor)
+        return updated_vendor
     
 
 
@@ -403,6 +417,8 @@ class DeleteVendorHandler:
 
         self.db.delete(vendor)
         self.db.commit()
+        vendor_spatial_index.remove(command.vendor_id)
+        name_suggester.remove_vendor(command.vendor_id)
         return {"msg": f"Vendor with id: {command.vendor_id} deleted successfully"}
     
 
@@ -421,7 +437,7 @@ class DeleteVendorHandler:
 @dataclass
 class CreateItemCommand:
     name: str
-    base_price: float
+    base_price: Amount
     vendor_id: int
     category_id: int
     description: Optional[str] = None
@@ -505,6 +521,7 @@ class CreateItemHandler:
                 self.db.add(item)
                 self.db.commit()
                 self.db.refresh(item)
+                name_suggester.sync_item(item)
                 return item
             except Exception as e:
                 self.db.rollback()
@@ -524,7 +541,7 @@ class CreateItemHandler:
 class UpdateItemCommand:
     item_id: int
     name: Optional[str] = None
-    base_price: Optional[float] = None
+    base_price: Optional[Amount] = None
     category_id: Optional[int] = None
     description: Optional[str] = None
     image_url: Optional[str] = None
@@ -563,7 +580,11 @@ class UpdateItemHandler:
         
         item_query.update(update_data)
         self.db.commit()
-        return item_query.first()
+
+        updated_item = item_query.first()
+        # Keep autocomplete in step with renames and availability changes
+        name_suggester.sync_item(updated_item)
+        return updated_item
 
 
 
@@ -587,6 +608,7 @@ class DeleteItemHandler:
 
         self.db.delete(item)
         self.db.commit()
+        name_suggester.remove(ITEM, command.item_id)
         return {"msg": f"Item with id: {command.item_id} deleted successfully"}
 
 
@@ -621,6 +643,7 @@ class CreateItemCategoryHandler:
         self.db.add(category)
         self.db.commit()
         self.db.refresh(category)
+        name_suggester.sync_category(category)
         return category
 
 @dataclass(frozen=True)
@@ -647,7 +670,10 @@ class UpdateItemCategoryHandler:
         
         category_query.update(update_data)
         self.db.commit()
-        return category_query.first()
+
+        updated_category = category_query.first()
+        name_suggester.sync_category(updated_category)
+        return updated_category
 
 @dataclass(frozen=True)
 class DeleteItemCategoryCommand:
@@ -662,8 +688,12 @@ class DeleteItemCategoryHandler:
         if not category:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Category with ID: {command.category_id} not found")
 
+        # Items are deleted with their category; collect them before the cascade
+        item_ids = [item.id for item in category.items]
         self.db.delete(category)
         self.db.commit()
+        name_suggester.remove(CATEGORY, command.category_id)
+        name_suggester.remove_many(ITEM, item_ids)
         return {"msg": f"Category with id: {command.category_id} deleted successfully"}
 
 
@@ -866,6 +896,7 @@ class DeleteRiderHandler:
 
         self.db.delete(rider)
         self.db.commit()
+        rider_location_store.forget_rider(command.rider_id)
         return {"msg": f"Rider with id: {command.rider_id} deleted successfully"}
 
 
@@ -969,7 +1000,7 @@ class DeleteItemAddonGroupHandler:
 class CreateItemAddonCommand:
     group_id: int
     name: str
-    price: float
+    price: Amount
     description: Optional[str] = None
     is_available: Optional[bool] = True
 
@@ -995,7 +1026,7 @@ class UpdateItemAddonCommand:
     addon_id: int
     name: Optional[str] = None
     description: Optional[str] = None
-    price: Optional[float] = None
+    price: Optional[Amount] = None
     is_available: Optional[bool] = None
 
 class UpdateItemAddonHandler:
@@ -1048,7 +1079,7 @@ class DeleteItemAddonHandler:
 class CreateItemVariationCommand:
     item_id: int
     name: str
-    price: float
+    price: Amount
     description: Optional[str] = None
     is_available: Optional[bool] = True
 
@@ -1074,7 +1105,7 @@ class UpdateItemVariationCommand:
     variation_id: int
     name: Optional[str] = None
     description: Optional[str] = None
-    price: Optional[float] = None
+    price: Optional[Amount] = None
     is_available: Optional[bool] = None
 
 class UpdateItemVariationHandler:
@@ -1128,11 +1159,11 @@ class CreateOrderCommand:
     user_id: int
     vendor_id: int
     delivery_address_id: int
-    subtotal: float
-    total: float
+    subtotal: Amount
+    total: Amount
     rider_id: Optional[int] = None
     status: Optional[OrderStatus] = OrderStatus.PENDING
-    delivery_fee: Optional[float] = None
+    delivery_fee: Optional[Amount] = None
     notes: Optional[str] = None
     estimated_delivery_time: Optional[datetime] = None
 
@@ -1163,8 +1194,8 @@ class UpdateOrderCommand:
     order_id: int
     rider_id: Optional[int] = None
     status: Optional[OrderStatus] = None
-    delivery_fee: Optional[float] = None
-    total: Optional[float] = None
+    delivery_fee: Optional[Amount] = None
+    total: Optional[Amount] = None
     notes: Optional[str] = None
     estimated_delivery_time: Optional[datetime] = None
 
@@ -1222,7 +1253,7 @@ class DeleteOrderHandler:
 class CreateCartCommand:
     user_id: int
     vendor_id: int
-    subtotal: Optional[float] = 0.0
+    subtotal: Optional[Amount] = Amount(0)
     notes: Optional[str] = None
     expires_at: Optional[datetime] = None
 
@@ -1246,7 +1277,7 @@ class CreateCartHandler:
 @dataclass(frozen=True)
 class UpdateCartCommand:
     cart_id: int
-    subtotal: Optional[float] = None
+    subtotal: Optional[Amount] = None
     notes: Optional[str] = None
     expires_at: Optional[datetime] = None
 
@@ -1322,6 +1353,11 @@ def create_rider_wallet(db: Session, rider_id: int) -> RiderWallet:
     db.refresh(wallet)
     return wallet
 
+def _wallet_error(error: LedgerError, messages: dict) -> HTTPException:
+    """HTTP error for a refused balance change; messages maps LedgerError reasons to details"""
+    status_code = status.HTTP_404_NOT_FOUND if error.reason == LedgerError.NOT_FOUND else status.HTTP_400_BAD_REQUEST
+    return HTTPException(status_code=status_code, detail=messages[error.reason])
+
 # ==================
 # WALLET FUNDING
 # ==================
@@ -1329,7 +1365,7 @@ def create_rider_wallet(db: Session, rider_id: int) -> RiderWallet:
 @dataclass(frozen=True)
 class FundUserWalletCommand:
     user_id: int
-    amount: float
+    amount: Amount
     description: str
     payment_method: str
 
@@ -1341,36 +1377,24 @@ class FundUserWalletHandler:
         if command.amount <= 0:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Amount must be greater than zero")
         
-        wallet = self.db.query(UserWallet).filter(UserWallet.user_id == command.user_id).first()
-        if not wallet:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User wallet not found")
-        
-        if not wallet.is_active:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Wallet is not active")
-        
-        if wallet.is_locked:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Wallet is locked")
-        
-        # Record the transaction
-        balance_before = wallet.balance
-        balance_after = balance_before + command.amount
+        try:
+            change = wallet_ledger.credit(self.db, "user", command.user_id, command.amount)
+        except LedgerError as error:
+            raise _wallet_error(error, {
+                LedgerError.NOT_FOUND: "User wallet not found",
+                LedgerError.INACTIVE: "Wallet is not active",
+                LedgerError.LOCKED: "Wallet is locked",
+            })
         
-        transaction = WalletTransaction(
-            user_wallet_id=wallet.id,
+        transaction = wallet_ledger.entry(
+            change,
             transaction_type=WalletTransactionType.DEPOSIT,
             status=WalletTransactionStatus.COMPLETED,
             amount=command.amount,
-            balance_before=balance_before,
-            balance_after=balance_after,
             description=command.description,
-            reference_type="funding",
-            processed_at=datetime.utcnow()
+            reference_type="funding"
         )
         
-        # Update wallet balance
-        wallet.balance = balance_after
-        wallet.last_transaction_at = datetime.utcnow()
-        
         self.db.add(transaction)
         self.db.commit()
         self.db.refresh(transaction)
@@ -1385,7 +1409,7 @@ class FundUserWalletHandler:
 class WithdrawFromWalletCommand:
     wallet_type: str  # "user", "vendor", or "rider"
     owner_id: int
-    amount: float
+    amount: Amount
     description: str
     withdrawal_method: str
     account_details: dict
@@ -1398,60 +1422,42 @@ class WithdrawFromWalletHandler:
         if command.amount <= 0:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Amount must be greater than zero")
         
-        # Get the appropriate wallet
-        wallet = None
-        wallet_id_field = None
+        if command.wallet_type not in ("user", "vendor", "rider"):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid wallet type")
         
-        if command.wallet_type == "user":
-            wallet = self.db.query(UserWallet).filter(UserWallet.user_id == command.owner_id).first()
-            wallet_id_field = "user_wallet_id"
-        elif command.wallet_type == "vendor":
-            wallet = self.db.query(VendorWallet).filter(VendorWallet.vendor_id == command.owner_id).first()
-            wallet_id_field = "vendor_wallet_id"
-            if wallet and command.amount < wallet.minimum_withdrawal:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
-                                  detail=f"Minimum withdrawal amount is {wallet.minimum_withdrawal}")
+        if command.wallet_type == "vendor":
+            minimum_withdrawal = self.db.query(VendorWallet.minimum_withdrawal).filter(
+                VendorWallet.vendor_id == command.owner_id
+            ).scalar()
         elif command.wallet_type == "rider":
-            wallet = self.db.query(RiderWallet).filter(RiderWallet.rider_id == command.owner_id).first()
-            wallet_id_field = "rider_wallet_id"
-            if wallet and command.amount < wallet.minimum_withdrawal:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
-                                  detail=f"Minimum withdrawal amount is {wallet.minimum_withdrawal}")
+            minimum_withdrawal = self.db.query(RiderWallet.minimum_withdrawal).filter(
+                RiderWallet.rider_id == command.owner_id
+            ).scalar()
         else:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid wallet type")
-        
-        if not wallet:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{command.wallet_type.title()} wallet not found")
-        
-        if not wallet.is_active:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Wallet is not active")
-        
-        if wallet.is_locked:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Wallet is locked")
-        
-        if wallet.balance < command.amount:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient wallet balance")
-        
-        # Record the transaction
-        balance_before = wallet.balance
-        balance_after = balance_before - command.amount
-        
-        transaction_data = {
-            wallet_id_field: wallet.id,
-            "transaction_type": WalletTransactionType.WITHDRAWAL,
-            "status": WalletTransactionStatus.PENDING,  # Withdrawals start as pending
-            "amount": command.amount,
-            "balance_before": balance_before,
-            "balance_after": balance_after,
-            "description": command.description,
-            "reference_type": "withdrawal",
-        }
+            minimum_withdrawal = None
+        if minimum_withdrawal is not None and command.amount < minimum_withdrawal:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
+                              detail=f"Minimum withdrawal amount is {minimum_withdrawal}")
         
-        transaction = WalletTransaction(**transaction_data)
+        try:
+            change = wallet_ledger.debit(self.db, command.wallet_type, command.owner_id, command.amount)
+        except LedgerError as error:
+            raise _wallet_error(error, {
+                LedgerError.NOT_FOUND: f"{command.wallet_type.title()} wallet not found",
+                LedgerError.INACTIVE: "Wallet is not active",
+                LedgerError.LOCKED: "Wallet is locked",
+                LedgerError.INSUFFICIENT: "Insufficient wallet balance",
+            })
         
-        # Update wallet balance
-        wallet.balance = balance_after
-        wallet.last_transaction_at = datetime.utcnow()
+        transaction = wallet_ledger.entry(
+            change,
+            transaction_type=WalletTransactionType.WITHDRAWAL,
+            status=WalletTransactionStatus.PENDING,  # Withdrawals start as pending
+            amount=command.amount,
+            description=command.description,
+            reference_type="withdrawal",
+            processed_at=None
+        )
         
         self.db.add(transaction)
         self.db.commit()
@@ -1469,7 +1475,7 @@ class TransferBetweenWalletsCommand:
     sender_id: int
     recipient_type: str  # "user", "vendor", or "rider"
     recipient_id: int
-    amount: float
+    amount: Amount
     description: str
 
 class TransferBetweenWalletsHandler:
@@ -1480,69 +1486,44 @@ class TransferBetweenWalletsHandler:
         if command.amount <= 0:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Amount must be greater than zero")
         
-        # Get sender wallet
-        sender_wallet = self._get_wallet(command.sender_type, command.sender_id)
-        if not sender_wallet:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sender wallet not found")
-        
-        # Get recipient wallet
-        recipient_wallet = self._get_wallet(command.recipient_type, command.recipient_id)
-        if not recipient_wallet:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipient wallet not found")
-        
-        # Validate sender wallet
-        if not sender_wallet.is_active or sender_wallet.is_locked:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Sender wallet is not available")
-        
-        if sender_wallet.balance < command.amount:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient sender wallet balance")
-        
-        # Validate recipient wallet
-        if not recipient_wallet.is_active:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Recipient wallet is not active")
-        
-        # Process transfer
-        sender_balance_before = sender_wallet.balance
-        sender_balance_after = sender_balance_before - command.amount
-        
-        recipient_balance_before = recipient_wallet.balance
-        recipient_balance_after = recipient_balance_before + command.amount
+        # Both wallets are locked in a fixed order, so opposite transfers cannot deadlock
+        try:
+            sender_change, recipient_change = wallet_ledger.transfer(
+                self.db, command.sender_type, command.sender_id,
+                command.recipient_type, command.recipient_id, command.amount
+            )
+        except LedgerError as error:
+            self.db.rollback()
+            if error.role == "recipient":
+                raise _wallet_error(error, {
+                    LedgerError.NOT_FOUND: "Recipient wallet not found",
+                    LedgerError.INACTIVE: "Recipient wallet is not active",
+                })
+            raise _wallet_error(error, {
+                LedgerError.NOT_FOUND: "Sender wallet not found",
+                LedgerError.INACTIVE: "Sender wallet is not available",
+                LedgerError.INSUFFICIENT: "Insufficient sender wallet balance",
+            })
         
         # Create sender transaction (debit)
-        sender_transaction_data = {
-            f"{command.sender_type}_wallet_id": sender_wallet.id,
-            "transaction_type": WalletTransactionType.TRANSFER,
-            "status": WalletTransactionStatus.COMPLETED,
-            "amount": -command.amount,  # Negative for debit
-            "balance_before": sender_balance_before,
-            "balance_after": sender_balance_after,
-            "description": f"Transfer to {command.recipient_type} ID {command.recipient_id}: {command.description}",
-            "reference_type": "transfer_out",
-            "processed_at": datetime.utcnow()
-        }
+        sender_transaction = wallet_ledger.entry(
+            sender_change,
+            transaction_type=WalletTransactionType.TRANSFER,
+            status=WalletTransactionStatus.COMPLETED,
+            amount=-command.amount,  # Negative for debit
+            description=f"Transfer to {command.recipient_type} ID {command.recipient_id}: {command.description}",
+            reference_type="transfer_out"
+        )
         
         # Create recipient transaction (credit)
-        recipient_transaction_data = {
-            f"{command.recipient_type}_wallet_id": recipient_wallet.id,
-            "transaction_type": WalletTransactionType.TRANSFER,
-            "status": WalletTransactionStatus.COMPLETED,
-            "amount": command.amount,  # Positive for credit
-            "balance_before": recipient_balance_before,
-            "balance_after": recipient_balance_after,
-            "description": f"Transfer from {command.sender_type} ID {command.sender_id}: {command.description}",
-            "reference_type": "transfer_in",
-            "processed_at": datetime.utcnow()
-        }
-        
-        sender_transaction = WalletTransaction(**sender_transaction_data)
-        recipient_transaction = WalletTransaction(**recipient_transaction_data)
-        
-        # Update wallet balances
-        sender_wallet.balance = sender_balance_after
-        sender_wallet.last_transaction_at = datetime.utcnow()
-        
-        recipient_wallet.balance = recipient_balance_after
-        recipient_wallet.last_transaction_at = datetime.utcnow()
+        recipient_transaction = wallet_ledger.entry(
+            recipient_change,
+            transaction_type=WalletTransactionType.TRANSFER,
+            status=WalletTransactionStatus.COMPLETED,
+            amount=command.amount,  # Positive for credit
+            description=f"Transfer from {command.sender_type} ID {command.sender_id}: {command.description}",
+            reference_type="transfer_in"
+        )
         
         self.db.add_all([sender_transaction, recipient_transaction])
         self.db.commit()
@@ -1552,16 +1533,6 @@ class TransferBetweenWalletsHandler:
             "recipient_transaction": recipient_transaction,
             "message": "Transfer completed successfully"
         }
-    
-    def _get_wallet(self, wallet_type: str, owner_id: int):
-        """Helper method to get wallet by type and owner ID"""
-        if wallet_type == "user":
-            return self.db.query(UserWallet).filter(UserWallet.user_id == owner_id).first()
-        elif wallet_type == "vendor":
-            return self.db.query(VendorWallet).filter(VendorWallet.vendor_id == owner_id).first()
-        elif wallet_type == "rider":
-            return self.db.query(RiderWallet).filter(RiderWallet.rider_id == owner_id).first()
-        return None
 
 # ==================
 # PAYMENT PROCESSING
@@ -1571,45 +1542,36 @@ class TransferBetweenWalletsHandler:
 class ProcessOrderPaymentCommand:
     order_id: int
     user_id: int
-    amount: float
+    amount: Amount
 
 class ProcessOrderPaymentHandler:
     def __init__(self, db: Session):
         self.db = db
 
     def handle(self, command: ProcessOrderPaymentCommand):
-        # Get user wallet
-        wallet = self.db.query(UserWallet).filter(UserWallet.user_id == command.user_id).first()
-        if not wallet:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User wallet not found")
-        
-        if not wallet.is_active or wallet.is_locked:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Wallet is not available")
-        
-        if wallet.balance < command.amount:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient wallet balance")
+        if command.amount <= 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Amount must be greater than zero")
         
-        # Process payment
-        balance_before = wallet.balance
-        balance_after = balance_before - command.amount
+        try:
+            change = wallet_ledger.debit(self.db, "user", command.user_id, command.amount)
+        except LedgerError as error:
+            raise _wallet_error(error, {
+                LedgerError.NOT_FOUND: "User wallet not found",
+                LedgerError.INACTIVE: "Wallet is not available",
+                LedgerError.LOCKED: "Wallet is not available",
+                LedgerError.INSUFFICIENT: "Insufficient wallet balance",
+            })
         
-        transaction = WalletTransaction(
-            user_wallet_id=wallet.id,
+        transaction = wallet_ledger.entry(
+            change,
             transaction_type=WalletTransactionType.PAYMENT,
             status=WalletTransactionStatus.COMPLETED,
             amount=command.amount,
-            balance_before=balance_before,
-            balance_after=balance_after,
             description=f"Payment for order #{command.order_id}",
             reference_id=str(command.order_id),
-            reference_type="order",
-            processed_at=datetime.utcnow()
+            reference_type="order"
         )
         
-        # Update wallet balance
-        wallet.balance = balance_after
-        wallet.last_transaction_at = datetime.utcnow()
-        
         self.db.add(transaction)
         self.db.commit()
         self.db.refresh(transaction)
@@ -1649,8 +1611,8 @@ class SetTransactionPinHandler:
 class CreateOrderItemCommand:
     order_id: int
     item_id: int
-    unit_price: float
-    subtotal: float
+    unit_price: Amount
+    subtotal: Amount
     variation_id: Optional[int] = None
     quantity: int = 1
     notes: Optional[str] = None
@@ -1678,8 +1640,8 @@ class CreateOrderItemHandler:
 class UpdateOrderItemCommand:
     order_item_id: int
     quantity: Optional[int] = None
-    unit_price: Optional[float] = None
-    subtotal: Optional[float] = None
+    unit_price: Optional[Amount] = None
+    subtotal: Optional[Amount] = None
     notes: Optional[str] = None
 
 class UpdateOrderItemHandler:
@@ -1735,7 +1697,7 @@ class DeleteOrderItemHandler:
 class CreateOrderItemAddonCommand:
     order_item_id: int
     addon_id: int
-    price: float
+    price: Amount
 
 class CreateOrderItemAddonHandler:
     def __init__(self, db: Session):
@@ -1830,8 +1792,8 @@ class DeleteOrderTrackingHandler:
 class CreateCartItemCommand:
     cart_id: int
     item_id: int
-    unit_price: float
-    subtotal: float
+    unit_price: Amount
+    subtotal: Amount
     variation_id: Optional[int] = None
     quantity: int = 1
     notes: Optional[str] = None
@@ -1859,8 +1821,8 @@ class CreateCartItemHandler:
 class UpdateCartItemCommand:
     cart_item_id: int
     quantity: Optional[int] = None
-    unit_price: Optional[float] = None
-    subtotal: Optional[float] = None
+    unit_price: Optional[Amount] = None
+    subtotal: Optional[Amount] = None
     notes: Optional[str] = None
 
 class UpdateCartItemHandler:
@@ -1917,7 +1879,7 @@ class DeleteCartItemHandler:
 class CreateCartItemAddonCommand:
     cart_item_id: int
     addon_id: int
-    price: float
+    price: Amount
 
 class CreateCartItemAddonHandler:
     def __init__(self, db: Session):
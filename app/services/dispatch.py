@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+from sqlalchemy import Integer, column, func, select, update, values
+from sqlalchemy.orm import Session
+
+from ..models import Order, OrderStatus, Rider, RiderStatus, Vendor
+from ..shared.config import settings
+from ..shared.database import SessionLocal
+from .assignment import solve_assignment
+from .geo import CoordinateSet, haversine_matrix
+from .location_store import rider_location_store
+from .tracking_hub import rider_details, tracking_hub
+from .trajectory import trajectory_recorder
+
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key so only one worker process dispatches per tick
+DISPATCH_LOCK_KEY = 7_310_042
+
+
+# ==================
+# DISPATCH ENGINE
+# ==================
+
+@dataclass
+class DispatchResult:
+    assignments: List[Tuple[int, int, float]] = field(default_factory=list)  # (order_id, rider_id, pickup_km)
+    open_orders: int = 0
+    available_riders: int = 0
+    solve_ms: float = 0.0
+    skipped: bool = False  # Another worker held the dispatch lock
+
+
+class DispatchEngine:
+    """
+    Periodically matches every unassigned READY_FOR_PICKUP order to an AVAILABLE rider.
+
+    One tick takes a snapshot of the open orders and free riders (locking
+    them with SKIP LOCKED so concurrent manual accepts are left alone),
+    solves the assignment over a NumPy pickup-distance matrix and writes
+    all assignments back in a single transaction: one UPDATE ... FROM
+    VALUES for orders and one UPDATE for riders.
+    """
+
+    def __init__(self, max_pickup_km: float = 10.0):
+        self.max_pickup_km = max_pickup_km
+
+    def run_tick(self, db: Session) -> DispatchResult:
+        result = DispatchResult()
+        if not db.execute(select(func.pg_try_advisory_xact_lock(DISPATCH_LOCK_KEY))).scalar():
+            db.rollback()
+            result.skipped = True
+            return result
+
+        orders = CoordinateSet.from_rows(
+            db.query(Order.id, Vendor.latitude, Vendor.longitude)
+            .join(Vendor, Order.vendor_id == Vendor.id)
+            .filter(
+                Order.status == OrderStatus.READY_FOR_PICKUP,
+                Order.rider_id.is_(None)
+            )
+            .order_by(Order.created_at)  # Oldest first wins exact ties
+            .with_for_update(of=Order, skip_locked=True)
+            .all()
+        )
+        rider_rows = (
+            db.query(Rider.id, Rider.current_latitude, Rider.current_longitude)
+            .filter(
+                Rider.status == RiderStatus.AVAILABLE,
+                Rider.is_active == True
+            )
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        # Prefer pings not yet flushed to the riders table
+        fresh = rider_location_store.latest_many(row[0] for row in rider_rows)
+        riders = CoordinateSet.from_rows(
+            (rider_id, fresh[rider_id].latitude, fresh[rider_id].longitude) if rider_id in fresh
+            else (rider_id, latitude, longitude)
+            for rider_id, latitude, longitude in rider_rows
+        )
+        result.open_orders, result.available_riders = len(orders), len(riders)
+        if not len(orders) or not len(riders):
+            db.rollback()
+            return result
+
+        started = time.perf_counter()
+        distances = haversine_matrix(orders.latitudes, orders.longitudes, riders.latitudes, riders.longitudes)
+        distances[distances > self.max_pickup_km] = np.inf
+        order_idx, rider_idx = solve_assignment(distances)
+        result.solve_ms = (time.perf_counter() - started) * 1000
+        if not order_idx.size:
+            db.rollback()
+            return result
+
+        pairs = list(zip(orders.ids[order_idx].tolist(), riders.ids[rider_idx].tolist()))
+        pickup_km = dict(zip((order_id for order_id, _ in pairs), distances[order_idx, rider_idx].tolist()))
+
+        assignment = values(
+            column("order_id", Integer), column("rider_id", Integer), name="assignment"
+        ).data(pairs)
+        assigned = db.execute(
+            update(Order.__table__)
+            .where(
+                Order.__table__.c.id == assignment.c.order_id,
+                Order.__table__.c.rider_id.is_(None),
+                Order.__table__.c.status == OrderStatus.READY_FOR_PICKUP
+            )
+            .values(rider_id=assignment.c.rider_id, status=OrderStatus.IN_TRANSIT, updated_at=func.now())
+            .returning(Order.__table__.c.id, Order.__table__.c.rider_id)
+        ).all()
+
+        if assigned:
+            db.execute(
+                update(Rider.__table__)
+                .where(Rider.__table__.c.id.in_([rider_id for _, rider_id in assigned]))
+                .values(status=RiderStatus.BUSY)
+            )
+        db.commit()
+        for order_id, rider_id in assigned:
+            trajectory_recorder.start(order_id, rider_id)
+
+        # Live watchers learn their rider without the stream re-reading the order
+        watched = {order_id: rider_id for order_id, rider_id in assigned if tracking_hub.is_watched(order_id)}
+        if watched:
+            riders_by_id = {rider.id: rider for rider in db.query(Rider).filter(Rider.id.in_(set(watched.values())))}
+            for order_id, rider_id in watched.items():
+                tracking_hub.publish_status(order_id, OrderStatus.IN_TRANSIT.value, rider_details(riders_by_id.get(rider_id)))
+
+        result.assignments = [(order_id, rider_id, pickup_km[order_id]) for order_id, rider_id in assigned]
+        return result
+
+
+async def run_dispatch_loop(engine: "DispatchEngine", interval_seconds: float) -> None:
+    """Run a dispatch tick every interval_seconds off the event loop until cancelled"""
+    def tick():
+        db = SessionLocal()
+        try:
+            return engine.run_tick(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(tick)
+        except Exception:
+            logger.exception("Dispatch tick failed")
+
+
+# Process-wide engine used by the background loop and the manual trigger endpoint
+dispatch_engine = DispatchEngine(max_pickup_km=settings.dispatch_max_pickup_km)
@@ -0,0 +1,69 @@
+import math
+from typing import Optional
+
+from sqlalchemy import and_, func, literal
+from sqlalchemy.orm import Query
+
+from .geo import EARTH_RADIUS_KM, bounding_box
+
+
+def haversine_sql(latitude: float, longitude: float, lat_column, lon_column):
+    """Great circle distance in kilometers, evaluated by the database"""
+    lat_rad = math.radians(latitude)
+    dlat = func.radians(lat_column - latitude) * 0.5
+    dlon = func.radians(lon_column - longitude) * 0.5
+    a = (
+        func.power(func.sin(dlat), 2)
+        + literal(math.cos(lat_rad)) * func.cos(func.radians(lat_column)) * func.power(func.sin(dlon), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+class DistanceQueryBuilder:
+    """
+    Adds great-circle distance filtering and ordering to an ORM query.
+
+    A bounding box on the raw coordinate columns narrows the candidates
+    (and can use the lat/lng index); the exact haversine expression then
+    refines them, so OFFSET/LIMIT are applied to the filtered, ordered rows
+    and every page is full.
+
+    Usage:
+        builder = DistanceQueryBuilder(Vendor.latitude, Vendor.longitude, lat, lng)
+        rows = builder.apply(query, max_distance).offset(skip).limit(limit).all()
+        vendors = builder.attach_distances(rows)
+    """
+
+    def __init__(self, lat_column, lon_column, latitude: float, longitude: float):
+        self.lat_column = lat_column
+        self.lon_column = lon_column
+        self.latitude = latitude
+        self.longitude = longitude
+        self.distance = haversine_sql(latitude, longitude, lat_column, lon_column).label("distance")
+
+    def apply(self, query: Query, max_distance_km: Optional[float] = None, order_by_distance: bool = True) -> Query:
+        """Select the distance column, filter by radius and sort nearest first"""
+        query = query.add_columns(self.distance).filter(
+            self.lat_column.isnot(None),
+            self.lon_column.isnot(None)
+        )
+
+        if max_distance_km is not None:
+            min_lat, max_lat, min_lon, max_lon = bounding_box(self.latitude, self.longitude, max_distance_km)
+            box = [self.lat_column.between(min_lat, max_lat)]
+            if min_lon is not None:
+                box.append(self.lon_column.between(min_lon, max_lon))
+            query = query.filter(and_(*box), self.distance.element <= max_distance_km)
+
+        if order_by_distance:
+            query = query.order_by(self.distance)
+        return query
+
+    @staticmethod
+    def attach_distances(rows):
+        """Unpack (entity, distance) rows and expose distance on each entity"""
+        entities = []
+        for entity, distance in rows:
+            entity.distance = distance
+            entities.append(entity)
+        return entities
@@ -0,0 +1,312 @@
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from ..models import DeliveryAddress, Order, OrderStatus, OrderTracking, Vendor
+from .geo import haversine_km
+
+
+# Grid cell used as a travel-speed zone (~5.5 km at Lagos' latitude)
+ZONE_DEGREES = 0.05
+
+# Used until enough history exists; the values the endpoints used to hardcode
+DEFAULT_ACCEPT_MINUTES = 3.0
+DEFAULT_PREP_MINUTES = 20.0
+DEFAULT_PICKUP_WAIT_MINUTES = 5.0
+DEFAULT_SPEED_KMH = 18.0
+
+# Completed orders outside these bounds are data errors, not deliveries
+MAX_STAGE_MINUTES = 240.0
+SPEED_RANGE_KMH = (2.0, 80.0)
+
+
+def zone_of(latitude: Optional[float], longitude: Optional[float]) -> Optional[Tuple[int, int]]:
+    if latitude is None or longitude is None:
+        return None
+    return math.floor(latitude / ZONE_DEGREES), math.floor(longitude / ZONE_DEGREES)
+
+
+def _minutes(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    minutes = (end - start).total_seconds() / 60.0
+    return minutes if 0.0 <= minutes <= MAX_STAGE_MINUTES else None
+
+
+@dataclass
+class CompletedOrder:
+    """Stage timestamps of one delivered order, as reconstructed from OrderTracking"""
+    order_id: int
+    vendor_id: int
+    created_at: datetime
+    accepted_at: Optional[datetime]
+    preparing_at: Optional[datetime]
+    ready_at: Optional[datetime]
+    picked_up_at: Optional[datetime]
+    delivered_at: datetime
+    vendor_latitude: Optional[float]
+    vendor_longitude: Optional[float]
+    delivery_latitude: Optional[float]
+    delivery_longitude: Optional[float]
+
+    @property
+    def prep_minutes(self) -> Optional[float]:
+        return _minutes(self.preparing_at or self.accepted_at, self.ready_at)
+
+    @property
+    def travel_km(self) -> Optional[float]:
+        if None in (self.vendor_latitude, self.vendor_longitude, self.delivery_latitude, self.delivery_longitude):
+            return None
+        return haversine_km(self.vendor_latitude, self.vendor_longitude,
+                            self.delivery_latitude, self.delivery_longitude)
+
+    @property
+    def speed_kmh(self) -> Optional[float]:
+        minutes, km = _minutes(self.picked_up_at, self.delivered_at), self.travel_km
+        if not minutes or km is None:
+            return None
+        speed = km / (minutes / 60.0)
+        return speed if SPEED_RANGE_KMH[0] <= speed <= SPEED_RANGE_KMH[1] else None
+
+
+def load_completed_orders(db: Session, after_tracking_id: int = 0,
+                          since: Optional[datetime] = None) -> Tuple[List[CompletedOrder], int]:
+    """
+    Orders delivered after a tracking-row watermark, one aggregate query.
+
+    Returns the orders and the new watermark (highest DELIVERED tracking id seen).
+    """
+    delivered = db.query(
+        OrderTracking.order_id.label("order_id"),
+        func.max(OrderTracking.id).label("tracking_id")
+    ).filter(
+        OrderTracking.status == OrderStatus.DELIVERED,
+        OrderTracking.id > after_tracking_id
+    )
+    if since is not None:
+        delivered = delivered.filter(OrderTracking.created_at >= since)
+    delivered = delivered.group_by(OrderTracking.order_id).subquery()
+
+    def reached(order_status: OrderStatus):
+        return func.min(case((OrderTracking.status == order_status, OrderTracking.created_at)))
+
+    rows = db.query(
+        Order.id, Order.vendor_id, Order.created_at,
+        reached(OrderStatus.ACCEPTED), reached(OrderStatus.PREPARING),
+        reached(OrderStatus.READY_FOR_PICKUP), reached(OrderStatus.IN_TRANSIT),
+        reached(OrderStatus.DELIVERED),
+        Vendor.latitude, Vendor.longitude, DeliveryAddress.latitude, DeliveryAddress.longitude,
+        func.max(delivered.c.tracking_id)
+    ).join(
+        delivered, delivered.c.order_id == Order.id
+    ).join(
+        OrderTracking, OrderTracking.order_id == Order.id
+    ).join(
+        Vendor, Order.vendor_id == Vendor.id
+    ).outerjoin(
+        DeliveryAddress, Order.delivery_address_id == DeliveryAddress.id
+    ).group_by(
+        Order.id, Vendor.latitude, Vendor.longitude, DeliveryAddress.latitude, DeliveryAddress.longitude
+    ).all()
+
+    watermark = max((row[-1] for row in rows), default=after_tracking_id)
+    return [CompletedOrder(*row[:-1]) for row in rows], watermark
+
+
+# ==================
+# ETA ENGINE
+# ==================
+
+class _Distribution:
+    """Most recent samples of one quantity plus cached median/p80"""
+
+    __slots__ = ("samples", "median", "p80")
+
+    def __init__(self, size: int):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.median = self.p80 = None
+
+    def summarise(self) -> None:
+        if self.samples:
+            self.median, self.p80 = (float(v) for v in np.percentile(np.fromiter(self.samples, float), (50, 80)))
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+@dataclass
+class EtaEstimate:
+    accept_minutes: float
+    prep_minutes: float
+    pickup_minutes: float
+    travel_minutes: float
+    total_minutes: float
+    late_minutes: float  # p80-based total: "no later than" for most orders
+
+    def arrival(self, now: Optional[datetime] = None) -> datetime:
+        return (now or datetime.now(timezone.utc)) + timedelta(minutes=self.total_minutes)
+
+
+class EtaEngine:
+    """
+    Delivery ETA from learned per-vendor preparation times and per-zone speeds.
+
+    Completed orders are reconstructed from OrderTracking status timestamps
+    and folded into bounded sample windows: preparation, acceptance and
+    pickup wait per vendor, travel speed per destination grid zone. Each
+    window keeps a cached median and p80, so an estimate is a few dict
+    lookups plus one distance over speed. Vendors and zones with little
+    history are shrunk toward the global figures.
+
+    Refreshes are incremental: only orders delivered after the last seen
+    DELIVERED tracking row are loaded.
+    """
+
+    def __init__(self, refresh_interval_seconds: int = 300, history_days: int = 30,
+                 window: int = 200, prior_weight: float = 5.0):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.history_days = history_days
+        self.window = window
+        self.prior_weight = prior_weight
+        self._accept: Dict[Optional[int], _Distribution] = defaultdict(self._new)
+        self._prep: Dict[Optional[int], _Distribution] = defaultdict(self._new)
+        self._pickup_wait: Dict[Optional[int], _Distribution] = defaultdict(self._new)
+        self._speed: Dict[Optional[Tuple[int, int]], _Distribution] = defaultdict(self._new)
+        self._watermark = 0
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def _new(self) -> _Distribution:
+        return _Distribution(self.window)
+
+    # ==================
+    # LEARNING
+    # ==================
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Fold in newly delivered orders once the refresh interval has passed"""
+        with self._lock:
+            if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_interval_seconds:
+                return
+            since = datetime.now(timezone.utc) - timedelta(days=self.history_days) if self._watermark == 0 else None
+            orders, self._watermark = load_completed_orders(db, self._watermark, since)
+            self.ingest(sorted(orders, key=lambda order: order.delivered_at))
+            self._refreshed_at = time.monotonic()
+
+    def ingest(self, orders: Iterable[CompletedOrder]) -> None:
+        """Add completed orders (in delivery order) and re-summarise what changed"""
+        touched = set()
+        with self._lock:
+            for order in orders:
+                samples = (
+                    (self._accept, order.vendor_id, _minutes(order.created_at, order.accepted_at)),
+                    (self._prep, order.vendor_id, order.prep_minutes),
+                    (self._pickup_wait, order.vendor_id, _minutes(order.ready_at, order.picked_up_at)),
+                    (self._speed, zone_of(order.delivery_latitude, order.delivery_longitude), order.speed_kmh),
+                )
+                for table, key, value in samples:
+                    if value is None:
+                        continue
+                    # Every sample also feeds the global (None) entry used as the prior
+                    for k in ((key, None) if key is not None else (None,)):
+                        table[k].samples.append(value)
+                        touched.add((id(table), k))
+            for table in (self._accept, self._prep, self._pickup_wait, self._speed):
+                for key, distribution in table.items():
+                    if (id(table), key) in touched:
+                        distribution.summarise()
+
+    def _blend(self, table: Dict, key, default: float, quantile: str = "median") -> float:
+        """Key's figure shrunk toward the global one by sample count"""
+        overall = table.get(None)
+        prior = getattr(overall, quantile) if overall is not None and overall.median is not None else default
+        local = table.get(key) if key is not None else None
+        if local is None or local.median is None:
+            return prior
+        n = len(local)
+        return (n * getattr(local, quantile) + self.prior_weight * prior) / (n + self.prior_weight)
+
+    # ==================
+    # ESTIMATES
+    # ==================
+
+    def speed_kmh(self, latitude: Optional[float], longitude: Optional[float]) -> float:
+        return self._blend(self._speed, zone_of(latitude, longitude), DEFAULT_SPEED_KMH)
+
+    def estimate(self, status: OrderStatus, vendor_id: int, stage_started_at: Optional[datetime],
+                 vendor_position: Tuple[Optional[float], Optional[float]],
+                 delivery_position: Tuple[Optional[float], Optional[float]],
+                 rider_position: Optional[Tuple[float, float]] = None,
+                 now: Optional[datetime] = None) -> EtaEstimate:
+        """
+        Remaining minutes per stage for an order in the given status.
+
+        Time already spent in the current stage (since stage_started_at) is
+        subtracted from that stage's median. Travel is the remaining distance
+        (rider to customer once picked up, rider or vendor to customer before)
+        over the destination zone's learned speed.
+        """
+        if status in (OrderStatus.DELIVERED, OrderStatus.CANCELLED, OrderStatus.REJECTED):
+            return EtaEstimate(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        now = now or datetime.now(timezone.utc)
+        elapsed = 0.0
+        if stage_started_at is not None:
+            if stage_started_at.tzinfo is None:
+                stage_started_at = stage_started_at.replace(tzinfo=timezone.utc)
+            elapsed = max((now - stage_started_at).total_seconds() / 60.0, 0.0)
+
+        def stage(table: Dict, default: float, current: bool) -> Tuple[float, float]:
+            median = self._blend(table, vendor_id, default)
+            p80 = self._blend(table, vendor_id, default, "p80")
+            if current:
+                # Already overdue stages are expected to finish shortly, not instantly
+                return max(median - elapsed, 1.0), max(p80 - elapsed, 2.0)
+            return median, p80
+
+        accept = prep = pickup = (0.0, 0.0)
+        if status == OrderStatus.PENDING:
+            accept = stage(self._accept, DEFAULT_ACCEPT_MINUTES, True)
+        if status in (OrderStatus.PENDING, OrderStatus.ACCEPTED, OrderStatus.PREPARING):
+            prep = stage(self._prep, DEFAULT_PREP_MINUTES, status != OrderStatus.PENDING)
+        if status != OrderStatus.IN_TRANSIT:
+            pickup = stage(self._pickup_wait, DEFAULT_PICKUP_WAIT_MINUTES, status == OrderStatus.READY_FOR_PICKUP)
+
+        delivery_lat, delivery_lon = delivery_position
+        origin = rider_position if status == OrderStatus.IN_TRANSIT and rider_position else vendor_position
+        travel = 0.0
+        if None not in (delivery_lat, delivery_lon) and None not in origin:
+            distance = haversine_km(origin[0], origin[1], delivery_lat, delivery_lon)
+            travel = distance / self.speed_kmh(delivery_lat, delivery_lon) * 60.0
+        elif status == OrderStatus.IN_TRANSIT:
+            travel = DEFAULT_PICKUP_WAIT_MINUTES
+
+        total = accept[0] + prep[0] + pickup[0] + travel
+        late = accept[1] + prep[1] + pickup[1] + travel * 1.25
+        return EtaEstimate(accept[0], prep[0], pickup[0], travel, total, late)
+
+    def estimate_order(self, order: Order, stage_started_at: Optional[datetime] = None,
+                       rider_position: Optional[Tuple[float, float]] = None,
+                       now: Optional[datetime] = None) -> EtaEstimate:
+        vendor, address = order.vendor, order.delivery_address
+        return self.estimate(
+            order.status, order.vendor_id, stage_started_at or order.updated_at or order.created_at,
+            (vendor.latitude, vendor.longitude) if vendor else (None, None),
+            (address.latitude, address.longitude) if address else (None, None),
+            rider_position, now
+        )
+
+    def vendor_prep_minutes(self, vendor_id: int) -> float:
+        return self._blend(self._prep, vendor_id, DEFAULT_PREP_MINUTES)
+
+
+# Process-wide engine shared by the estimate, timeline and live tracking endpoints
+eta_engine = EtaEngine()
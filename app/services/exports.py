@@ -0,0 +1,202 @@
+import csv
+import enum
+import io
+import tempfile
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from sqlalchemy import select
+
+from ..models import (
+    Order, OrderStatus, User, Vendor, Rider, WalletTransaction, WalletTransactionStatus,
+    WalletTransactionType, UserWallet, VendorWallet, RiderWallet
+)
+from ..shared.database import SessionLocal
+
+
+EXPORT_BATCH_ROWS = 5_000
+EXPORT_CHUNK_BYTES = 64 * 1024
+XLSX_MAX_ROWS = 1_048_576  # Excel's per-sheet limit, header included
+# Text starting with these is evaluated as a formula by spreadsheet apps (and written as one by openpyxl)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+ORDER_EXPORT_COLUMNS = [
+    ("order_id", Order.id),
+    ("created_at", Order.created_at),
+    ("status", Order.status),
+    ("user_id", Order.user_id),
+    ("customer_name", User.full_name),
+    ("vendor_id", Order.vendor_id),
+    ("vendor_name", Vendor.name),
+    ("rider_id", Order.rider_id),
+    ("rider_name", Rider.full_name),
+    ("subtotal", Order.subtotal),
+    ("delivery_fee", Order.delivery_fee),
+    ("total", Order.total),
+    ("updated_at", Order.updated_at),
+]
+
+WALLET_TRANSACTION_EXPORT_COLUMNS = [
+    ("transaction_id", WalletTransaction.id),
+    ("created_at", WalletTransaction.created_at),
+    ("transaction_type", WalletTransaction.transaction_type),
+    ("status", WalletTransaction.status),
+    ("amount", WalletTransaction.amount),
+    ("balance_before", WalletTransaction.balance_before),
+    ("balance_after", WalletTransaction.balance_after),
+    ("user_id", UserWallet.user_id),
+    ("vendor_id", VendorWallet.vendor_id),
+    ("rider_id", RiderWallet.rider_id),
+    ("description", WalletTransaction.description),
+    ("reference_type", WalletTransaction.reference_type),
+    ("reference_id", WalletTransaction.reference_id),
+    ("processed_at", WalletTransaction.processed_at),
+]
+
+
+# ==================
+# STATEMENTS
+# ==================
+
+def order_export(vendor_id: Optional[int] = None, rider_id: Optional[int] = None,
+                 order_status: Optional[OrderStatus] = None, start_date: Optional[datetime] = None,
+                 end_date: Optional[datetime] = None) -> Tuple[List[str], object]:
+    """Headers and a plain column select of orders in [start_date, end_date), oldest first"""
+    statement = select(*(column for _, column in ORDER_EXPORT_COLUMNS)).join(
+        User, User.id == Order.user_id
+    ).join(
+        Vendor, Vendor.id == Order.vendor_id
+    ).outerjoin(
+        Rider, Rider.id == Order.rider_id
+    )
+    if vendor_id is not None:
+        statement = statement.where(Order.vendor_id == vendor_id)
+    if rider_id is not None:
+        statement = statement.where(Order.rider_id == rider_id)
+    if order_status is not None:
+        statement = statement.where(Order.status == order_status)
+    if start_date is not None:
+        statement = statement.where(Order.created_at >= start_date)
+    if end_date is not None:
+        statement = statement.where(Order.created_at < end_date)
+    return [name for name, _ in ORDER_EXPORT_COLUMNS], statement.order_by(Order.created_at, Order.id)
+
+
+def wallet_transaction_export(user_id: Optional[int] = None, vendor_id: Optional[int] = None,
+                              rider_id: Optional[int] = None,
+                              transaction_status: Optional[WalletTransactionStatus] = None,
+                              transaction_type: Optional[WalletTransactionType] = None,
+                              start_date: Optional[datetime] = None,
+                              end_date: Optional[datetime] = None) -> Tuple[List[str], object]:
+    """Headers and a plain column select of wallet transactions with their owner ids, oldest first"""
+    statement = select(*(column for _, column in WALLET_TRANSACTION_EXPORT_COLUMNS)).outerjoin(
+        UserWallet, UserWallet.id == WalletTransaction.user_wallet_id
+    ).outerjoin(
+        VendorWallet, VendorWallet.id == WalletTransaction.vendor_wallet_id
+    ).outerjoin(
+        RiderWallet, RiderWallet.id == WalletTransaction.rider_wallet_id
+    )
+    if user_id is not None:
+        statement = statement.where(UserWallet.user_id == user_id)
+    if vendor_id is not None:
+        statement = statement.where(VendorWallet.vendor_id == vendor_id)
+    if rider_id is not None:
+        statement = statement.where(RiderWallet.rider_id == rider_id)
+    if transaction_status is not None:
+        statement = statement.where(WalletTransaction.status == transaction_status)
+    if transaction_type is not None:
+        statement = statement.where(WalletTransaction.transaction_type == transaction_type)
+    if start_date is not None:
+        statement = statement.where(WalletTransaction.created_at >= start_date)
+    if end_date is not None:
+        statement = statement.where(WalletTransaction.created_at < end_date)
+    headers = [name for name, _ in WALLET_TRANSACTION_EXPORT_COLUMNS]
+    return headers, statement.order_by(WalletTransaction.created_at, WalletTransaction.id)
+
+
+# ==================
+# STREAMING
+# ==================
+
+def iter_batches(statement, batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[Sequence[tuple]]:
+    """
+    Rows of a select in batches from a server-side cursor.
+
+    Opens its own session because the generator outlives the request's
+    dependencies; only one batch of plain tuples is in memory at a time.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=batch_rows))
+        for rows in result.partitions():
+            yield rows
+    finally:
+        db.close()
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        value = value.value
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # User-entered text such as a name of "=HYPERLINK(...)" stays text
+        return "'" + value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # Excel has no time zones; both formats carry naive UTC
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def stream_csv(headers: List[str], batches: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    """UTF-8 CSV with a BOM so spreadsheet apps detect the encoding; one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    for rows in batches:
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_xlsx(headers: List[str], batches: Iterable[Sequence[tuple]], sheet_title: str) -> Iterator[bytes]:
+    """
+    XLSX from an openpyxl write-only workbook.
+
+    Write-only sheets spill appended rows to a temporary file, and the
+    finished package is spooled to disk past a few MB, so memory stays
+    bounded; bytes are sent once the workbook is complete. Rows past
+    Excel's sheet limit continue on numbered sheets.
+    """
+    workbook = Workbook(write_only=True)
+    sheet, sheet_rows, sheets = None, XLSX_MAX_ROWS, 0
+    for rows in batches:
+        for row in rows:
+            if sheet_rows >= XLSX_MAX_ROWS:
+                sheets += 1
+                sheet = workbook.create_sheet(title=sheet_title if sheets == 1 else f"{sheet_title} ({sheets})")
+                sheet.append(headers)
+                sheet_rows = 1
+            sheet.append([_plain(value) for value in row])
+            sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet(title=sheet_title).append(headers)
+
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(EXPORT_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def export_filename(name: str, export_format: str) -> str:
+    return f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.{export_format}"
@@ -0,0 +1,126 @@
+import math
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+
+# ==================
+# SCALAR HELPERS
+# ==================
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great circle distance between two points in kilometers"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, Optional[float], Optional[float]]:
+    """
+    Lat/lng box that fully contains the search circle.
+
+    Longitude bounds are None when the box would wrap the antimeridian or
+    reach a pole; callers then rely on the exact distance filter alone.
+    """
+    lat_span = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = latitude - lat_span, latitude + lat_span
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+
+    lon_span = radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(max(abs(min_lat), abs(max_lat)))))
+    min_lon, max_lon = longitude - lon_span, longitude + lon_span
+    if min_lon < -180.0 or max_lon > 180.0:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lon, max_lon
+
+
+# ==================
+# VECTORIZED ENGINE
+# ==================
+
+def haversine_many(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Distances in kilometers from one point to every point in the given arrays"""
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(latitudes)
+    dlat = lat2 - lat1
+    dlon = np.radians(longitudes) - math.radians(longitude)
+    a = np.sin(dlat * 0.5) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon * 0.5) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_matrix(latitudes_a: np.ndarray, longitudes_a: np.ndarray,
+                     latitudes_b: np.ndarray, longitudes_b: np.ndarray,
+                     dtype=np.float32) -> np.ndarray:
+    """
+    Pairwise distances in kilometers, shape (len(a), len(b)).
+
+    Computed in float32 by default: metre-level precision is plenty for
+    ranking, and it halves the memory of large rider-by-order matrices.
+    """
+    lat_a = np.radians(np.asarray(latitudes_a, dtype=dtype))[:, None]
+    lat_b = np.radians(np.asarray(latitudes_b, dtype=dtype))[None, :]
+    dlon = np.radians(np.asarray(longitudes_b, dtype=dtype))[None, :] - np.radians(np.asarray(longitudes_a, dtype=dtype))[:, None]
+    a = np.sin((lat_b - lat_a) * 0.5) ** 2 + np.cos(lat_a) * np.cos(lat_b) * np.sin(dlon * 0.5) ** 2
+    np.minimum(a, 1.0, out=a)
+    return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(a, out=a), out=a)
+
+
+class CoordinateSet:
+    """
+    Ids and coordinates of vendors, riders or users held as contiguous arrays.
+
+    Built once from (id, latitude, longitude) rows, it answers distance,
+    radius and top-k questions for every candidate in a single vectorized
+    call instead of one Python haversine per row. Rows with missing
+    coordinates are dropped on construction.
+    """
+
+    def __init__(self, ids: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray):
+        self.ids = np.ascontiguousarray(ids, dtype=np.int64)
+        self.latitudes = np.ascontiguousarray(latitudes, dtype=np.float64)
+        self.longitudes = np.ascontiguousarray(longitudes, dtype=np.float64)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, Optional[float], Optional[float]]]) -> "CoordinateSet":
+        """Build from (id, latitude, longitude) tuples such as a column-only query result"""
+        rows = [row for row in rows if row[1] is not None and row[2] is not None]
+        if not rows:
+            return cls(np.empty(0), np.empty(0), np.empty(0))
+        ids, latitudes, longitudes = zip(*rows)
+        return cls(np.fromiter(ids, np.int64, len(rows)),
+                   np.fromiter(latitudes, np.float64, len(rows)),
+                   np.fromiter(longitudes, np.float64, len(rows)))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def distances_from(self, latitude: float, longitude: float) -> np.ndarray:
+        """Distance in kilometers from the point to every member"""
+        return haversine_many(latitude, longitude, self.latitudes, self.longitudes)
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and distances of members inside the radius, nearest first"""
+        distances = self.distances_from(latitude, longitude)
+        mask = distances <= radius_km
+        ids, distances = self.ids[mask], distances[mask]
+        order = np.argsort(distances, kind="stable")
+        return ids[order], distances[order]
+
+    def nearest(self, latitude: float, longitude: float, k: int,
+                max_radius_km: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and distances of the k nearest members, optionally capped by a radius"""
+        distances = self.distances_from(latitude, longitude)
+        ids = self.ids
+        if max_radius_km is not None:
+            mask = distances <= max_radius_km
+            ids, distances = ids[mask], distances[mask]
+        if k < len(distances):
+            # Partial selection is O(n); only the k winners are fully sorted
+            top = np.argpartition(distances, k)[:k]
+            ids, distances = ids[top], distances[top]
+        order = np.argsort(distances, kind="stable")
+        return ids[order], distances[order]
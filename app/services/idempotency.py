@@ -0,0 +1,271 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette.responses import JSONResponse, Response
+
+from ..models import IdempotencyKey
+from ..shared.config import settings
+from ..shared.database import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Mutations a client may retry; matched against the path below root_path
+IDEMPOTENT_ROUTES = [
+    ("POST", re.compile(r"^/payments/process$")),
+    ("POST", re.compile(r"^/api/wallet/user/\d+/fund$")),
+    ("POST", re.compile(r"^/api/wallet/(user|vendor|rider)/\d+/withdraw$")),
+    ("POST", re.compile(r"^/api/wallet/transfer$")),
+    ("POST", re.compile(r"^/api/wallet/internal/process-payment$")),
+]
+
+# Outcomes of IdempotencyStore.begin
+CLAIMED = "claimed"          # First use: run the request and complete() or release() the key
+REPLAY = "replay"            # Same request seen before: send the stored response
+IN_PROGRESS = "in_progress"  # The first request with this key has not finished
+MISMATCH = "mismatch"        # The key was used for a different request
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    content_type: Optional[str]
+    body: bytes
+
+
+# ==================
+# STORE
+# ==================
+
+class IdempotencyStore:
+    """
+    Idempotency keys in the idempotency_keys table.
+
+    A replay costs one primary-key lookup. A new key is claimed with an
+    INSERT ... ON CONFLICT that also takes over expired rows, so two
+    requests racing on the same key cannot both run. A claim holds a
+    lease of claim_seconds, separate from the replay TTL: if its worker
+    dies before completing or releasing it, a retry of the same request
+    takes the key over once the lease lapses instead of getting 409 until
+    the row expires. complete() and release() only touch the claim they
+    were given, so a request whose claim was taken over cannot clobber the
+    new one. Callers pass a session and the store commits its own writes.
+    """
+
+    def __init__(self, ttl_seconds: int = 86400, claim_seconds: int = 120):
+        self.ttl_seconds = ttl_seconds
+        self.claim_seconds = claim_seconds
+
+    def begin(self, db: Session, key: str,
+              fingerprint: str) -> Tuple[str, Optional[StoredResponse], Optional[datetime]]:
+        """(outcome, stored response for REPLAY, claim to pass to complete/release for CLAIMED)"""
+        now = datetime.now(timezone.utc)
+        row = db.get(IdempotencyKey, key)
+        if row is not None and row.expires_at > now:
+            if row.fingerprint != fingerprint:
+                return MISMATCH, None, None
+            if row.status_code is None and row.locked_until is not None and row.locked_until > now:
+                return IN_PROGRESS, None, None
+            if row.status_code is not None:
+                return REPLAY, StoredResponse(row.status_code, row.content_type, row.response_body), None
+
+        statement = insert(IdempotencyKey).values(
+            key=key, fingerprint=fingerprint, created_at=now, expires_at=now + timedelta(seconds=self.ttl_seconds),
+            locked_until=now + timedelta(seconds=self.claim_seconds)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "fingerprint": statement.excluded.fingerprint,
+                "status_code": None,
+                "content_type": None,
+                "response_body": None,
+                "created_at": statement.excluded.created_at,
+                "expires_at": statement.excluded.expires_at,
+                "locked_until": statement.excluded.locked_until,
+            },
+            where=or_(
+                IdempotencyKey.expires_at <= now,
+                # An abandoned claim of the same request
+                IdempotencyKey.status_code.is_(None) & (IdempotencyKey.locked_until <= now)
+                & (IdempotencyKey.fingerprint == statement.excluded.fingerprint)
+            )
+        ).returning(IdempotencyKey.key)
+        claimed = db.execute(statement).first()
+        db.commit()
+        # No row back: a concurrent request claimed the key after the lookup
+        return (CLAIMED, None, now) if claimed is not None else (IN_PROGRESS, None, None)
+
+    def complete(self, db: Session, key: str, claimed_at: datetime, response: StoredResponse) -> None:
+        db.execute(update(IdempotencyKey).where(
+            IdempotencyKey.key == key, IdempotencyKey.created_at == claimed_at, IdempotencyKey.status_code.is_(None)
+        ).values(
+            status_code=response.status_code, content_type=response.content_type, response_body=response.body,
+            locked_until=None
+        ))
+        db.commit()
+
+    def release(self, db: Session, key: str, claimed_at: datetime) -> None:
+        """Forget a claimed key whose request failed, so the client can retry it"""
+        db.execute(delete(IdempotencyKey).where(
+            IdempotencyKey.key == key, IdempotencyKey.created_at == claimed_at, IdempotencyKey.status_code.is_(None)
+        ))
+        db.commit()
+
+    def purge(self, db: Session) -> int:
+        """Delete expired keys; returns how many"""
+        result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now(timezone.utc)))
+        db.commit()
+        return result.rowcount
+
+
+def _in_session(method, *args):
+    db = SessionLocal()
+    try:
+        return method(db, *args)
+    finally:
+        db.close()
+
+
+async def run_idempotency_purge_loop(store: IdempotencyStore, interval_seconds: float) -> None:
+    """Delete expired idempotency keys every interval_seconds off the event loop"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_in_session, store.purge)
+        except Exception:
+            logger.exception("Idempotency key purge failed")
+
+
+# ==================
+# MIDDLEWARE
+# ==================
+
+def _route_path(scope) -> str:
+    path, root_path = scope["path"], scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    return path
+
+
+def _fingerprint(scope, body: bytes, api_key: bytes) -> str:
+    """Hash of what makes two requests "the same": route, query, JSON body and credentials"""
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        pass
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), _route_path(scope).encode(), scope.get("query_string", b""), body, api_key):
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the stored response when a mutation is retried with the same Idempotency-Key.
+
+    Only routes in IDEMPOTENT_ROUTES are considered, and only when the
+    client sends the header. Requests without it run as before. The
+    first request claims the key. A 2xx response is stored and replayed
+    for identical retries until the TTL; any other outcome releases the
+    key, since wallet handlers refuse before they commit. A retry while the
+    first request runs gets 409 (until its claim lease lapses), and reusing a key for a different request
+    gets 422. The API key is part of the fingerprint, so replays never
+    bypass authentication.
+    """
+
+    def __init__(self, app, store: Optional[IdempotencyStore] = None):
+        self.app = app
+        self.store = store or idempotency_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(
+            scope["method"] == method and pattern.match(_route_path(scope)) for method, pattern in IDEMPOTENT_ROUTES
+        ):
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return await self.app(scope, receive, send)
+        key = key.decode("latin-1").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}, status_code=400
+            )
+            return await response(scope, receive, send)
+
+        body, more_body = b"", True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        store = self.store
+        outcome, stored, claimed_at = await asyncio.to_thread(
+            _in_session, store.begin, key, _fingerprint(scope, body, headers.get(b"x-api-key", b""))
+        )
+        if outcome == REPLAY:
+            response = Response(stored.body, status_code=stored.status_code, media_type=stored.content_type,
+                                headers={REPLAYED_HEADER: "true"})
+            return await response(scope, receive, send)
+        if outcome == MISMATCH:
+            response = JSONResponse(
+                {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+            )
+            return await response(scope, receive, send)
+        if outcome == IN_PROGRESS:
+            response = JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still being processed"}, status_code=409
+            )
+            return await response(scope, receive, send)
+
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        start, chunks = {}, []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            await asyncio.to_thread(_in_session, store.release, key, claimed_at)
+            raise
+        status_code = start.get("status", 500)
+        if 200 <= status_code < 300:
+            content_type = dict(start.get("headers", [])).get(b"content-type", b"").decode("latin-1") or None
+            stored = StoredResponse(status_code, content_type, b"".join(chunks))
+            await asyncio.to_thread(_in_session, store.complete, key, claimed_at, stored)
+        else:
+            await asyncio.to_thread(_in_session, store.release, key, claimed_at)
+
+
+# Process-wide store used by the middleware and the purge loop
+idempotency_store = IdempotencyStore(ttl_seconds=settings.idempotency_ttl_seconds,
+                                     claim_seconds=settings.idempotency_claim_seconds)
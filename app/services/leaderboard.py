@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from ..models import Item, OrderStatus, Vendor, VendorHourlyStats, VendorOrderTotals
+from .rollups import trailing_window
+
+
+LEADERBOARD_SORTS = ("revenue", "orders", "rating", "growth")
+
+
+class VendorLeaderboard:
+    """
+    Ranks active vendors over a trailing window in a single query.
+
+    Period and previous-period figures come from the hourly rollups with
+    FILTER aggregates that scan only those two periods, all-time order
+    counts from the per-vendor lifetime totals, item counts from one
+    grouped subquery, and market share against a platform-wide scalar
+    subquery, so sorting and LIMIT happen in the database and the number
+    of statements does not grow with the number of vendors.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def top(self, days: int, sort_by: str = "revenue", limit: int = 50,
+            now: Optional[datetime] = None) -> List:
+        """Rows of vendor fields plus total_orders, period_orders, period_revenue, items_count,
+        market_share and growth (period revenue vs the period before, in percent)"""
+        if sort_by not in LEADERBOARD_SORTS:
+            raise ValueError(f"Unsupported sort: {sort_by}")
+        start = trailing_window(days, now)
+        previous_start = trailing_window(days * 2, now)
+        delivered = VendorHourlyStats.status == OrderStatus.DELIVERED
+        in_period = VendorHourlyStats.bucket >= start
+        in_previous = (VendorHourlyStats.bucket >= previous_start) & (VendorHourlyStats.bucket < start)
+
+        stats = self.db.query(
+            VendorHourlyStats.vendor_id.label("vendor_id"),
+            func.sum(VendorHourlyStats.order_count).filter(in_period).label("period_orders"),
+            func.sum(VendorHourlyStats.revenue).filter(in_period).label("period_revenue"),
+            func.sum(VendorHourlyStats.revenue).filter(in_previous).label("previous_revenue"),
+        ).filter(
+            delivered, VendorHourlyStats.bucket >= previous_start
+        ).group_by(VendorHourlyStats.vendor_id).subquery()
+        items = self.db.query(
+            Item.vendor_id.label("vendor_id"),
+            func.count(Item.id).label("items_count")
+        ).group_by(Item.vendor_id).subquery()
+
+        period_orders = func.coalesce(stats.c.period_orders, 0)
+        period_revenue = func.coalesce(stats.c.period_revenue, 0.0)
+        previous_revenue = func.coalesce(stats.c.previous_revenue, 0.0)
+        growth = case(
+            (previous_revenue > 0, (period_revenue - previous_revenue) / previous_revenue * 100),
+            else_=0.0
+        )
+        platform_orders = self.db.query(func.sum(VendorHourlyStats.order_count)).filter(
+            delivered, in_period
+        ).scalar_subquery()
+        market_share = func.coalesce(period_orders * 100.0 / func.nullif(platform_orders, 0), 0.0)
+        # No review data exists yet, so a rating sort ranks by revenue
+        sort_key = {
+            "revenue": period_revenue,
+            "orders": period_orders,
+            "rating": period_revenue,
+            "growth": growth,
+        }[sort_by]
+
+        return self.db.query(
+            Vendor.id.label("vendor_id"),
+            Vendor.name.label("vendor_name"),
+            Vendor.vendor_type.label("vendor_type"),
+            Vendor.is_active.label("is_active"),
+            func.coalesce(VendorOrderTotals.order_count, 0).label("total_orders"),
+            period_orders.label("period_orders"),
+            period_revenue.label("period_revenue"),
+            func.coalesce(items.c.items_count, 0).label("items_count"),
+            market_share.label("market_share"),
+            growth.label("growth")
+        ).outerjoin(
+            VendorOrderTotals, VendorOrderTotals.vendor_id == Vendor.id
+        ).outerjoin(
+            stats, stats.c.vendor_id == Vendor.id
+        ).outerjoin(
+            items, items.c.vendor_id == Vendor.id
+        ).filter(
+            Vendor.is_active == True
+        ).order_by(sort_key.desc(), Vendor.id).limit(limit).all()
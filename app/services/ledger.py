@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from ..models import UserWallet, VendorWallet, RiderWallet, WalletTransaction
+from ..shared.money import Amount
+
+
+# wallet type -> (model, owner column, WalletTransaction foreign key)
+WALLETS = {
+    "user": (UserWallet, UserWallet.user_id, "user_wallet_id"),
+    "vendor": (VendorWallet, VendorWallet.vendor_id, "vendor_wallet_id"),
+    "rider": (RiderWallet, RiderWallet.rider_id, "rider_wallet_id"),
+}
+
+# A failed conditional update is re-diagnosed; if the row changed in between, try again
+MAX_ATTEMPTS = 3
+
+
+class LedgerError(Exception):
+    """A balance change was refused; reason says why and role which side of a transfer"""
+
+    NOT_FOUND = "not_found"
+    INACTIVE = "inactive"
+    LOCKED = "locked"
+    INSUFFICIENT = "insufficient"
+
+    def __init__(self, reason: str, wallet_type: str, owner_id: int, role: Optional[str] = None):
+        super().__init__(reason, wallet_type, owner_id)
+        self.reason = reason
+        self.wallet_type = wallet_type
+        self.owner_id = owner_id
+        self.role = role
+
+
+def _check_amount(amount: float) -> None:
+    if not amount > 0:  # Also rejects NaN
+        raise ValueError("Amount must be greater than zero")
+
+
+@dataclass(frozen=True)
+class BalanceChange:
+    wallet_type: str
+    wallet_id: int
+    balance_before: Amount
+    balance_after: Amount
+
+
+class WalletLedger:
+    """
+    Balance changes that stay correct under concurrent requests.
+
+    A debit or credit is one conditional UPDATE ... RETURNING: the row lock,
+    the availability and funds checks and the new balance all happen in the
+    database, so parallel payments queue on the row instead of overwriting
+    each other. Transfers lock both wallets with SELECT ... FOR UPDATE in
+    (wallet type, id) order so opposite transfers cannot deadlock. Nothing
+    here commits; the caller commits the change with its transaction rows.
+    """
+
+    def debit(self, db: Session, wallet_type: str, owner_id: int, amount: float) -> BalanceChange:
+        _check_amount(amount)
+        return self._apply(db, wallet_type, owner_id, -amount, allow_locked=False)
+
+    def credit(self, db: Session, wallet_type: str, owner_id: int, amount: float,
+               allow_locked: bool = False) -> BalanceChange:
+        """allow_locked lets money arrive in a locked wallet, as transfers always have"""
+        _check_amount(amount)
+        return self._apply(db, wallet_type, owner_id, amount, allow_locked=allow_locked)
+
+    def transfer(self, db: Session, sender_type: str, sender_id: int, recipient_type: str, recipient_id: int,
+                 amount: float) -> Tuple[BalanceChange, BalanceChange]:
+        """Move amount between two wallets; the recipient may be locked but must be active"""
+        _check_amount(amount)
+        parties = ((sender_type, sender_id, "sender"), (recipient_type, recipient_id, "recipient"))
+        for wallet_type, owner_id, role in parties:
+            if wallet_type not in WALLETS:
+                raise LedgerError(LedgerError.NOT_FOUND, wallet_type, owner_id, role)
+
+        # One locking select per table, tables by type and rows by id, so every transfer locks in the same order
+        wallets = {}
+        for wallet_type in sorted({sender_type, recipient_type}):
+            model, owner, _ = WALLETS[wallet_type]
+            owner_ids = [owner_id for kind, owner_id, _ in parties if kind == wallet_type]
+            locked = db.query(model).filter(owner.in_(owner_ids)).order_by(model.id).with_for_update().populate_existing()
+            wallets.update(((wallet_type, getattr(wallet, owner.key)), wallet) for wallet in locked)
+        for wallet_type, owner_id, role in parties:
+            if (wallet_type, owner_id) not in wallets:
+                raise LedgerError(LedgerError.NOT_FOUND, wallet_type, owner_id, role)
+        sender, recipient = wallets[(sender_type, sender_id)], wallets[(recipient_type, recipient_id)]
+
+        if not sender.is_active or sender.is_locked:
+            raise LedgerError(LedgerError.INACTIVE, sender_type, sender_id, "sender")
+        if sender.balance < amount:
+            raise LedgerError(LedgerError.INSUFFICIENT, sender_type, sender_id, "sender")
+        if not recipient.is_active:
+            raise LedgerError(LedgerError.INACTIVE, recipient_type, recipient_id, "recipient")
+
+        now, amount = func.now(), Amount.of(amount)
+        # Read each side's balances as they change: sender and recipient may be the same wallet
+        sender_before = sender.balance
+        sender_after = sender.balance = sender_before - amount
+        sender.last_transaction_at = now
+        recipient_before = recipient.balance
+        recipient_after = recipient.balance = recipient_before + amount
+        recipient.last_transaction_at = now
+        db.flush()
+        return (BalanceChange(sender_type, sender.id, sender_before, sender_after),
+                BalanceChange(recipient_type, recipient.id, recipient_before, recipient_after))
+
+    def entry(self, change: BalanceChange, **fields) -> WalletTransaction:
+        """A WalletTransaction recording change; fields supplies type, status, amount and description"""
+        fields.setdefault("processed_at", datetime.utcnow())
+        return WalletTransaction(
+            **{WALLETS[change.wallet_type][2]: change.wallet_id},
+            balance_before=change.balance_before,
+            balance_after=change.balance_after,
+            **fields
+        )
+
+    def _apply(self, db: Session, wallet_type: str, owner_id: int, delta: float,
+               allow_locked: bool) -> BalanceChange:
+        if wallet_type not in WALLETS:
+            raise LedgerError(LedgerError.NOT_FOUND, wallet_type, owner_id)
+        model, owner, _ = WALLETS[wallet_type]
+        criteria = [owner == owner_id, model.is_active.is_(True)]
+        if not allow_locked:
+            criteria.append(model.is_locked.isnot(True))
+        if delta < 0:
+            criteria.append(model.balance >= -delta)
+        statement = update(model).where(*criteria).values(
+            balance=model.balance + delta, last_transaction_at=func.now()
+        ).returning(model.id, model.balance).execution_options(synchronize_session=False)
+
+        for _ in range(MAX_ATTEMPTS):
+            row = db.execute(statement).first()
+            if row is not None:
+                wallet_id, balance_after = row
+                balance_before = balance_after - delta
+                return BalanceChange(wallet_type, wallet_id, balance_before, balance_after)
+            self._diagnose(db, wallet_type, owner_id, delta, allow_locked)
+        raise LedgerError(LedgerError.INSUFFICIENT, wallet_type, owner_id)
+
+    def _diagnose(self, db: Session, wallet_type: str, owner_id: int, delta: float, allow_locked: bool) -> None:
+        """Raise the reason a conditional update matched no row; return if it would match now"""
+        model, owner, _ = WALLETS[wallet_type]
+        wallet = db.execute(
+            select(model.is_active, model.is_locked, model.balance).where(owner == owner_id)
+        ).first()
+        if wallet is None:
+            raise LedgerError(LedgerError.NOT_FOUND, wallet_type, owner_id)
+        if not wallet.is_active:
+            raise LedgerError(LedgerError.INACTIVE, wallet_type, owner_id)
+        if wallet.is_locked and not allow_locked:
+            raise LedgerError(LedgerError.LOCKED, wallet_type, owner_id)
+        if wallet.balance < -delta:
+            raise LedgerError(LedgerError.INSUFFICIENT, wallet_type, owner_id)
+
+
+# Shared by every handler that moves money
+wallet_ledger = WalletLedger()
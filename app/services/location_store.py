@@ -0,0 +1,232 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, Integer, TIMESTAMP, column, update, values
+from sqlalchemy.orm import Session
+
+from ..models import Rider
+from ..shared.database import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LocationFix:
+    rider_id: int
+    latitude: float
+    longitude: float
+    recorded_at: datetime
+
+
+# ==================
+# BACKENDS
+# ==================
+
+class LocationBackend(ABC):
+    """
+    Storage for the latest fix per rider plus the set of riders not yet flushed.
+
+    The in-process backend is enough for a single worker. A shared backend
+    (e.g. Redis hashes) can implement the same methods so that every worker
+    serves the same positions; one that misses any of them cannot be
+    instantiated.
+    """
+
+    @abstractmethod
+    def put(self, fix: LocationFix) -> bool:
+        """Store the fix unless a newer one is already held; return whether it was kept"""
+
+    def put_many(self, fixes: Iterable[LocationFix]) -> int:
+        """put() for a batch under one lock/round trip; returns how many fixes were kept"""
+        return sum(self.put(fix) for fix in fixes)
+
+    @abstractmethod
+    def get(self, rider_id: int) -> Optional[LocationFix]:
+        """The latest fix held for the rider, if any"""
+
+    @abstractmethod
+    def get_many(self, rider_ids: Iterable[int]) -> Dict[int, LocationFix]:
+        """Latest fixes of the riders that have one, keyed by rider id"""
+
+    @abstractmethod
+    def drain_dirty(self) -> List[LocationFix]:
+        """Return the latest unflushed fix of every rider and mark them clean"""
+
+    @abstractmethod
+    def mark_dirty(self, rider_ids: Iterable[int]) -> None:
+        """Put riders back in the flush queue, e.g. after a failed flush"""
+
+
+class InMemoryLocationBackend(LocationBackend):
+    def __init__(self):
+        self._fixes: Dict[int, LocationFix] = {}
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def put(self, fix: LocationFix) -> bool:
+        with self._lock:
+            current = self._fixes.get(fix.rider_id)
+            if current is not None and current.recorded_at > fix.recorded_at:
+                return False
+            self._fixes[fix.rider_id] = fix
+            self._dirty.add(fix.rider_id)
+            return True
+
+    def put_many(self, fixes: Iterable[LocationFix]) -> int:
+        kept = 0
+        with self._lock:
+            for fix in fixes:
+                current = self._fixes.get(fix.rider_id)
+                if current is not None and current.recorded_at > fix.recorded_at:
+                    continue
+                self._fixes[fix.rider_id] = fix
+                self._dirty.add(fix.rider_id)
+                kept += 1
+        return kept
+
+    def get(self, rider_id: int) -> Optional[LocationFix]:
+        return self._fixes.get(rider_id)
+
+    def get_many(self, rider_ids: Iterable[int]) -> Dict[int, LocationFix]:
+        fixes = self._fixes
+        return {rider_id: fixes[rider_id] for rider_id in rider_ids if rider_id in fixes}
+
+    def drain_dirty(self) -> List[LocationFix]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return [self._fixes[rider_id] for rider_id in dirty]
+
+    def mark_dirty(self, rider_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._dirty.update(rider_id for rider_id in rider_ids if rider_id in self._fixes)
+
+
+# ==================
+# STORE
+# ==================
+
+class RiderLocationStore:
+    """
+    Hot store for rider GPS pings with write-behind to the riders table.
+
+    Pings only touch the backend. A periodic flush writes the newest fix of
+    every rider that moved since the last flush to Rider.current_latitude /
+    current_longitude in one UPDATE ... FROM (VALUES ...). Live tracking
+    reads are served from the store and fall back to the row columns.
+    """
+
+    def __init__(self, backend: Optional[LocationBackend] = None):
+        self.backend = backend or InMemoryLocationBackend()
+        self._known_riders: Set[int] = set()
+
+    def ensure_rider(self, db: Session, rider_id: int) -> None:
+        """404 for unknown riders; each rider id is looked up once per process"""
+        if rider_id in self._known_riders:
+            return
+        if db.query(Rider.id).filter(Rider.id == rider_id).first() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rider not found")
+        self._known_riders.add(rider_id)
+
+    def unknown_riders(self, db: Session, rider_ids: Iterable[int]) -> Set[int]:
+        """Ids among rider_ids that do not exist, checked with at most one query"""
+        missing = set(rider_ids) - self._known_riders
+        if missing:
+            found = {rider_id for (rider_id,) in db.query(Rider.id).filter(Rider.id.in_(missing)).all()}
+            self._known_riders.update(found)
+            missing -= found
+        return missing
+
+    def forget_rider(self, rider_id: int) -> None:
+        self._known_riders.discard(rider_id)
+
+    def record(self, rider_id: int, latitude: float, longitude: float,
+               recorded_at: Optional[datetime] = None) -> LocationFix:
+        """Absorb a ping; out-of-order fixes older than the held one are ignored"""
+        recorded_at = recorded_at or datetime.now(timezone.utc)
+        if recorded_at.tzinfo is None:
+            recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+        fix = LocationFix(rider_id, latitude, longitude, recorded_at)
+        if self.backend.put(fix):
+            return fix
+        return self.backend.get(rider_id)
+
+    def record_many(self, fixes: Iterable[LocationFix]) -> int:
+        """Absorb a batch, keeping only the newest fix per rider; returns riders moved"""
+        newest: Dict[int, LocationFix] = {}
+        for fix in fixes:
+            if fix.recorded_at.tzinfo is None:
+                fix = LocationFix(fix.rider_id, fix.latitude, fix.longitude,
+                                  fix.recorded_at.replace(tzinfo=timezone.utc))
+            held = newest.get(fix.rider_id)
+            if held is None or fix.recorded_at >= held.recorded_at:
+                newest[fix.rider_id] = fix
+        return self.backend.put_many(newest.values())
+
+    def latest(self, rider_id: int) -> Optional[LocationFix]:
+        return self.backend.get(rider_id)
+
+    def latest_many(self, rider_ids: Iterable[int]) -> Dict[int, LocationFix]:
+        return self.backend.get_many(rider_ids)
+
+    def flush(self, db: Session) -> int:
+        """Write pending fixes in one bulk UPDATE; returns the number of riders written"""
+        fixes = self.backend.drain_dirty()
+        if not fixes:
+            return 0
+
+        positions = values(
+            column("rider_id", Integer), column("latitude", Float),
+            column("longitude", Float), column("recorded_at", TIMESTAMP(timezone=True)),
+            name="positions"
+        ).data([(fix.rider_id, fix.latitude, fix.longitude, fix.recorded_at) for fix in fixes])
+        riders = Rider.__table__
+        try:
+            db.execute(
+                update(riders)
+                .where(riders.c.id == positions.c.rider_id)
+                .values(
+                    current_latitude=positions.c.latitude,
+                    current_longitude=positions.c.longitude,
+                    updated_at=positions.c.recorded_at
+                )
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.backend.mark_dirty(fix.rider_id for fix in fixes)
+            raise
+        return len(fixes)
+
+
+async def run_location_flush_loop(store: RiderLocationStore, interval_seconds: float) -> None:
+    """Flush the store every interval_seconds off the event loop; flush once more on shutdown"""
+    def flush():
+        db = SessionLocal()
+        try:
+            return store.flush(db)
+        finally:
+            db.close()
+
+    try:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(flush)
+            except Exception:
+                logger.exception("Rider location flush failed")
+    finally:
+        try:
+            flush()
+        except Exception:
+            logger.exception("Final rider location flush failed")
+
+
+# Process-wide store shared by the tracking routes, dispatch and the flush loop
+rider_location_store = RiderLocationStore()
@@ -1,5 +1,7 @@
 from fastapi import HTTPException, status
 from dataclasses import dataclass
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session, joinedload
 from typing import Optional
 from ..models import (
@@ -7,9 +9,11 @@ from ..models import (
     Rider, Order, ItemAddonGroup, ItemAddon, 
     ItemVariation, OrderItem, OrderItemAddon, OrderTracking, 
     Cart, CartItem, CartItemAddon, UserWallet, VendorWallet, 
-    RiderWallet, WalletTransaction
+    RiderWallet, WalletTransaction, CustomerVendorStats
 )
+from ..shared.pagination import decode_cursor, encode_cursor
 from ..utils.errors import ErrorHandler, ErrorMessages
+from .ledger import WALLETS
 from uuid import UUID
 
 
@@ -97,6 +101,60 @@ class GetUserByFirebaseUidQueryHandler:
         return firebase_user
 
 
+# GET TOP CUSTOMERS
+TOP_CUSTOMER_SORTS = ("total_spent", "order_count", "avg_order_value")
+PREFERRED_VENDOR_COUNT = 3
+
+
+@dataclass(frozen=True)
+class GetTopCustomersQuery:
+    limit: int = 50
+    sort_by: str = "total_spent"
+    min_orders: int = 1
+
+
+class GetTopCustomersQueryHandler:
+    """Ranks customers by delivered orders in one grouped query over CustomerVendorStats"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def handle(self, query: GetTopCustomersQuery):
+        if query.sort_by not in TOP_CUSTOMER_SORTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid sort_by '{query.sort_by}'. Use one of: {', '.join(TOP_CUSTOMER_SORTS)}."
+            )
+
+        order_count = func.sum(CustomerVendorStats.order_count)
+        total_spent = func.sum(CustomerVendorStats.total_spent)
+        avg_order_value = total_spent / func.nullif(order_count, 0)
+        preferred_vendors = func.array_agg(aggregate_order_by(
+            Vendor.name, CustomerVendorStats.order_count.desc(), CustomerVendorStats.total_spent.desc()
+        ))[1:PREFERRED_VENDOR_COUNT]
+        sort_key = {
+            "total_spent": total_spent,
+            "order_count": order_count,
+            "avg_order_value": avg_order_value,
+        }[query.sort_by]
+
+        return self.db.query(
+            User.id.label("user_id"),
+            User.full_name.label("user_name"),
+            order_count.label("order_count"),
+            total_spent.label("total_spent"),
+            avg_order_value.label("avg_order_value"),
+            func.max(CustomerVendorStats.last_order_at).label("last_order"),
+            preferred_vendors.label("preferred_vendors")
+        ).join(
+            User, User.id == CustomerVendorStats.user_id
+        ).join(
+            Vendor, Vendor.id == CustomerVendorStats.vendor_id
+        ).group_by(User.id, User.full_name).having(
+            order_count >= query.min_orders
+        ).order_by(sort_key.desc(), User.id).limit(query.limit).all()
+
+
 # ==============================================================================================================
 #                                           VENDOR HANDLERS AND QUERIES
 # ==============================================================================================================
@@ -166,7 +224,10 @@ class GetVendorByNameQueryHandler:
         self.db = db
 
     def handle(self, query: GetVendorByNameQuery):
-        vendor_list = self.db.query(Vendor).filter(Vendor.name.ilike(f"%{query.name}%")).all()
+        # Substring match is served by the trigram index on name; closest names first
+        vendor_list = self.db.query(Vendor).filter(
+            Vendor.name.ilike(f"%{query.name}%")
+        ).order_by(func.similarity(Vendor.name, query.name).desc()).all()
         if not vendor_list:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vendor by name: {0} not found".format(query.name))
         return vendor_list
@@ -1069,43 +1130,48 @@ class GetWalletTransactionsQuery:
     wallet_type: str  # "user", "vendor", or "rider"
     owner_id: int
     limit: int = 50
-    offset: int = 0
+    cursor: Optional[str] = None  # next_cursor of the previous page; None for the newest transactions
 
 class GetWalletTransactionsQueryHandler:
     def __init__(self, db: Session):
         self.db = db
 
     def handle(self, query: GetWalletTransactionsQuery):
-        # First get the wallet
-        wallet = None
-        wallet_id_field = None
-        
-        if query.wallet_type == "user":
-            wallet = self.db.query(UserWallet).filter(UserWallet.user_id == query.owner_id).first()
-            wallet_id_field = WalletTransaction.user_wallet_id
-        elif query.wallet_type == "vendor":
-            wallet = self.db.query(VendorWallet).filter(VendorWallet.vendor_id == query.owner_id).first()
-            wallet_id_field = WalletTransaction.vendor_wallet_id
-        elif query.wallet_type == "rider":
-            wallet = self.db.query(RiderWallet).filter(RiderWallet.rider_id == query.owner_id).first()
-            wallet_id_field = WalletTransaction.rider_wallet_id
-        else:
+        if query.wallet_type not in WALLETS:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid wallet type")
-        
-        if not wallet:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{query.wallet_type.title()} wallet not found")
-        
-        # Get transactions for this wallet
+        model, owner, foreign_key = WALLETS[query.wallet_type]
+        wallet_id_field = getattr(WalletTransaction, foreign_key)
+
+        # The owner's wallet id is resolved inside the page query (owner columns are unique)
+        wallet_id = select(model.id).where(owner == query.owner_id).scalar_subquery()
+
+        # Keyset pagination: each page seeks past the last row of the previous one on the
+        # (wallet, created_at, id) index, so deep pages cost the same as the first
+        transactions = self.db.query(WalletTransaction).filter(wallet_id_field == wallet_id)
+        if query.cursor:
+            try:
+                created_at, transaction_id = decode_cursor(query.cursor)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+            transactions = transactions.filter(
+                tuple_(WalletTransaction.created_at, WalletTransaction.id) < tuple_(created_at, transaction_id)
+            )
         transactions = (
-            self.db.query(WalletTransaction)
-            .filter(wallet_id_field == wallet.id)
-            .order_by(WalletTransaction.created_at.desc())
-            .offset(query.offset)
-            .limit(query.limit)
+            transactions
+            .order_by(WalletTransaction.created_at.desc(), WalletTransaction.id.desc())
+            .limit(query.limit + 1)
             .all()
         )
-        
-        return transactions
+        # Only an empty page needs to tell a missing wallet from one with no (more) transactions
+        if not transactions and self.db.query(model.id).filter(owner == query.owner_id).first() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{query.wallet_type.title()} wallet not found")
+
+        # The extra row only tells whether another page follows
+        next_cursor = None
+        if len(transactions) > query.limit:
+            transactions = transactions[:query.limit]
+            next_cursor = encode_cursor(transactions[-1].created_at, transactions[-1].id)
+        return {"transactions": transactions, "next_cursor": next_cursor}
 
 # GET SINGLE TRANSACTION
 @dataclass(frozen=True)
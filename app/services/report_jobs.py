@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Type
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Order, OrderTracking, ReportJob, Rider, User, Vendor, WalletTransaction
+from ..shared.config import settings
+from ..shared.database import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, COMPLETED, FAILED = "queued", "running", "completed", "failed"
+DONE_STATUSES = (COMPLETED, FAILED)
+
+# How often a worker waiting on a job it does not run re-reads it
+POLL_SECONDS = 0.5
+
+
+# ==================
+# WORKER
+# ==================
+
+def _record(db: Session, job_id: str, **values) -> None:
+    db.execute(update(ReportJob).where(ReportJob.id == job_id, ReportJob.status.notin_(DONE_STATUSES)).values(**values))
+    db.commit()
+
+
+def _run_report(job_id: str, target: str, params: Dict[str, Any]) -> None:
+    """Runs in a pool process: own session, report called like its endpoint, outcome written to the job row"""
+    module_name, function_name = target.split(":")
+    report = getattr(importlib.import_module(module_name), function_name)
+    db = SessionLocal()
+    try:
+        _record(db, job_id, status=RUNNING, started_at=func.now())
+        try:
+            result = report(db=db, current_user=None, **params)
+            if inspect.iscoroutine(result):
+                result = asyncio.run(result)
+            outcome = {"status": COMPLETED, "result": jsonable_encoder(result)}
+        except HTTPException as error:
+            outcome = {"status": FAILED, "error": str(error.detail), "error_status": error.status_code}
+        except Exception as error:
+            outcome = {"status": FAILED, "error": f"{type(error).__name__}: {error}"}
+        db.rollback()  # Reports only read; end their transaction before recording
+        _record(db, job_id, finished_at=func.now(), **outcome)
+    finally:
+        db.close()
+
+
+# ==================
+# JOBS
+# ==================
+
+@dataclass
+class ReportDefinition:
+    target: str                   # "module:function" importable in a fresh process
+    params_model: Type[BaseModel]
+
+
+def job_to_dict(job: ReportJob, include_result: bool = True, cached: bool = False) -> Dict[str, Any]:
+    data = {
+        "job_id": job.id,
+        "report_type": job.report_type,
+        "params": job.params,
+        "status": job.status,
+        "cached": cached,
+        "submitted_at": job.submitted_at,
+        "finished_at": job.finished_at,
+    }
+    if job.status == FAILED:
+        data["error"] = job.error
+        data["error_status"] = job.error_status
+    if include_result and job.status == COMPLETED:
+        data["result"] = job.result
+    return data
+
+
+class ReportJobs:
+    """
+    Runs registered reports in a process pool; jobs and results live in report_jobs.
+
+    A job is keyed by (report type, normalised parameters, data version).
+    The data version is the newest order, tracking, wallet transaction,
+    user, vendor and rider ids plus the latest order, vendor and rider
+    edits, read with nine index lookups, so new activity, sign-ups and
+    in-place changes make the next request recompute. A completed job is served as the cached result for
+    cache_seconds. Identical requests while a job runs share that job.
+    Because jobs are rows, any API worker can poll or stream any job; the
+    submitting worker runs it, and a job it never finishes (the worker
+    died) is failed after timeout_seconds.
+    """
+
+    def __init__(self, max_workers: int = 2, cache_seconds: float = 600.0, retention_seconds: float = 3600.0,
+                 timeout_seconds: float = 900.0):
+        self.max_workers = max_workers
+        self.cache_seconds = cache_seconds
+        self.retention_seconds = retention_seconds
+        self.timeout_seconds = timeout_seconds
+        self._reports: Dict[str, ReportDefinition] = {}
+        self._futures: Dict[str, Future] = {}  # Jobs running in this process's pool
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def register(self, report_type: str, report: Callable, params_model: Type[BaseModel]) -> None:
+        """Make a report endpoint function available as a job; params_model validates its parameters"""
+        self._reports[report_type] = ReportDefinition(f"{report.__module__}:{report.__name__}", params_model)
+
+    @property
+    def report_types(self):
+        return sorted(self._reports)
+
+    def data_version(self, db: Session) -> tuple:
+        # One scalar subquery per table: a single SELECT over all of them would cross-join the tables
+        columns = (Order.id, OrderTracking.id, WalletTransaction.id, User.id, Vendor.id, Rider.id,
+                   Order.updated_at, Vendor.updated_at, Rider.updated_at)
+        return tuple(db.execute(select(*(select(func.max(column)).scalar_subquery() for column in columns))).one())
+
+    def submit(self, db: Session, report_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a report, or return a cached or identical running job, as a dict; ValueError for bad input"""
+        definition = self._reports.get(report_type)
+        if definition is None:
+            raise ValueError(f"Unknown report type '{report_type}'. Use one of: {', '.join(self.report_types)}")
+        validated = definition.params_model(**params)   # pydantic's ValidationError is a ValueError
+        normalized = validated.model_dump(mode="json")
+        key = json.dumps([report_type, normalized, self.data_version(db)], sort_keys=True, default=str)
+        cache_key = hashlib.sha256(key.encode()).hexdigest()
+        now = datetime.now(timezone.utc)
+
+        self._expire(db, now)
+        # Serialises submissions of the same key across workers until commit, so they share one job
+        db.execute(select(func.pg_advisory_xact_lock(int(cache_key[:15], 16))))
+        existing = db.execute(select(ReportJob).where(
+            ReportJob.cache_key == cache_key,
+            or_(
+                ReportJob.status.in_((QUEUED, RUNNING)),
+                (ReportJob.status == COMPLETED) & (ReportJob.finished_at > now - timedelta(seconds=self.cache_seconds))
+            )
+        ).order_by(ReportJob.submitted_at.desc()).limit(1)).scalar()
+        if existing is not None:
+            db.commit()
+            return job_to_dict(existing, include_result=False, cached=existing.status == COMPLETED)
+        job = ReportJob(id=uuid.uuid4().hex, report_type=report_type, params=normalized, cache_key=cache_key,
+                        status=QUEUED, submitted_at=now)
+        db.add(job)
+        db.commit()
+
+        arguments = (_run_report, job.id, definition.target, validated.model_dump())
+        try:
+            try:
+                future = self._executor().submit(*arguments)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool once
+                self._discard_pool()
+                future = self._executor().submit(*arguments)
+        except Exception as error:
+            _record(db, job.id, status=FAILED, error=f"{type(error).__name__}: {error}", finished_at=func.now())
+        else:
+            with self._lock:
+                self._futures[job.id] = future
+            future.add_done_callback(lambda future: self._finish(job.id, future))
+        db.refresh(job)
+        return job_to_dict(job, include_result=False)
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        db = SessionLocal()
+        try:
+            job = db.get(ReportJob, job_id)
+            if job is not None and job.status not in DONE_STATUSES and \
+                    job.submitted_at < datetime.now(timezone.utc) - timedelta(seconds=self.timeout_seconds):
+                _record(db, job_id, status=FAILED, error="Report job was lost", finished_at=func.now())
+                db.refresh(job)
+            return job
+        finally:
+            db.close()
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[ReportJob]:
+        """The job after waiting up to timeout seconds for it to finish; None if there is no such job"""
+        deadline = time.monotonic() + timeout
+        future = self._futures.get(job_id)
+        if future is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                pass
+            except Exception:
+                pass  # Recorded on the job by _finish
+        while True:
+            job = await asyncio.to_thread(self.get, job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.status in DONE_STATUSES or remaining <= 0:
+                return job
+            # Running in another worker: re-read until it finishes
+            await asyncio.sleep(min(POLL_SECONDS, remaining))
+
+    def shutdown(self) -> None:
+        self._discard_pool()
+
+    def _discard_pool(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers open their own connections instead of inheriting the parent's pool
+                self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _finish(self, job_id: str, future: Future) -> None:
+        """The pool process records the outcome; only a job it could not finish is recorded here"""
+        with self._lock:
+            self._futures.pop(job_id, None)
+        if future.cancelled():
+            error = "Report job was cancelled"
+        elif future.exception() is not None:
+            error = f"{type(future.exception()).__name__}: {future.exception()}"
+        else:
+            return
+        db = SessionLocal()
+        try:
+            _record(db, job_id, status=FAILED, error=error, finished_at=func.now())
+        except Exception:
+            logger.exception("Could not record failure of report job %s", job_id)
+        finally:
+            db.close()
+
+    def _expire(self, db: Session, now: datetime) -> None:
+        """Fail jobs whose worker never finished them and drop old finished jobs"""
+        db.execute(update(ReportJob).where(
+            ReportJob.status.in_((QUEUED, RUNNING)),
+            ReportJob.submitted_at < now - timedelta(seconds=self.timeout_seconds)
+        ).values(status=FAILED, error="Report job was lost", finished_at=now))
+        db.execute(delete(ReportJob).where(ReportJob.finished_at < now - timedelta(seconds=self.retention_seconds)))
+
+
+# Process-wide job runner for the admin report endpoints
+report_jobs = ReportJobs(max_workers=settings.report_workers, cache_seconds=settings.report_cache_seconds,
+                         timeout_seconds=settings.report_job_timeout_seconds)
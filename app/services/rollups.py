@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from ..models import OrderStatus, Vendor, VendorHourlyStats, VendorWallet
+from .settlement import commission
+
+
+ACTIVE_STATUSES = [
+    OrderStatus.PENDING,
+    OrderStatus.ACCEPTED,
+    OrderStatus.PREPARING,
+    OrderStatus.READY_FOR_PICKUP,
+    OrderStatus.IN_TRANSIT,
+]
+
+REBUILD_SQL = """
+    INSERT INTO vendor_hourly_stats
+        (vendor_id, bucket, status, order_count, revenue, subtotal, delivery_fees, items_sold)
+    SELECT o.vendor_id, date_trunc('hour', o.created_at AT TIME ZONE 'UTC'), coalesce(o.status, 'PENDING'),
+           count(*), sum(o.total), sum(o.subtotal), sum(coalesce(o.delivery_fee, 0)), coalesce(sum(i.quantity), 0)
+    FROM orders o
+    LEFT JOIN (
+        SELECT order_id, sum(quantity) AS quantity FROM order_items GROUP BY order_id
+    ) i ON i.order_id = o.id
+    GROUP BY 1, 2, 3
+"""
+
+
+def hour_floor(moment: datetime) -> datetime:
+    """Naive UTC start of the hour containing moment, matching VendorHourlyStats.bucket"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def trailing_window(days: int, now: Optional[datetime] = None) -> datetime:
+    """First bucket of a trailing window of the given length, aligned to the hour"""
+    return hour_floor((now or datetime.utcnow()) - timedelta(days=days))
+
+
+class OrderRollups:
+    """
+    Reads over the trigger-maintained VendorHourlyStats table.
+
+    Every method aggregates buckets in SQL, so its cost grows with the
+    number of vendor-hours in the window, not the number of orders.
+    Windows are [start, end) over bucket starts; end=None means "up to now".
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _query(self, columns, start: datetime, end: Optional[datetime],
+               vendor_id: Optional[int], statuses: Optional[Iterable[OrderStatus]]):
+        query = self.db.query(*columns).filter(VendorHourlyStats.bucket >= start)
+        if end is not None:
+            query = query.filter(VendorHourlyStats.bucket < end)
+        if vendor_id is not None:
+            query = query.filter(VendorHourlyStats.vendor_id == vendor_id)
+        if statuses is not None:
+            query = query.filter(VendorHourlyStats.status.in_(list(statuses)))
+        return query
+
+    def totals(self, start: datetime, end: Optional[datetime] = None, vendor_id: Optional[int] = None,
+               statuses: Optional[Iterable[OrderStatus]] = None):
+        """Row of order_count, revenue, subtotal, delivery_fees, items_sold (zeros when empty)"""
+        return self._query((
+            func.coalesce(func.sum(VendorHourlyStats.order_count), 0).label("order_count"),
+            func.coalesce(func.sum(VendorHourlyStats.revenue), 0.0).label("revenue"),
+            func.coalesce(func.sum(VendorHourlyStats.subtotal), 0.0).label("subtotal"),
+            func.coalesce(func.sum(VendorHourlyStats.delivery_fees), 0.0).label("delivery_fees"),
+            func.coalesce(func.sum(VendorHourlyStats.items_sold), 0).label("items_sold"),
+        ), start, end, vendor_id, statuses).one()
+
+    def commission(self, start: datetime, end: Optional[datetime] = None, vendor_id: Optional[int] = None,
+                   statuses: Optional[Iterable[OrderStatus]] = None) -> float:
+        """Platform commission on the window's subtotals at each vendor's VendorWallet.commission_rate"""
+        subtotals = self._query((
+            VendorHourlyStats.vendor_id.label("vendor_id"),
+            func.sum(VendorHourlyStats.subtotal).label("subtotal"),
+        ), start, end, vendor_id, statuses).group_by(VendorHourlyStats.vendor_id).subquery()
+        return self.db.query(
+            func.coalesce(func.sum(commission(subtotals.c.subtotal, VendorWallet.commission_rate)), 0)
+        ).select_from(subtotals).outerjoin(
+            VendorWallet, VendorWallet.vendor_id == subtotals.c.vendor_id
+        ).scalar()
+
+    def by_status(self, start: datetime, end: Optional[datetime] = None,
+                  vendor_id: Optional[int] = None) -> Dict[OrderStatus, int]:
+        rows = self._query(
+            (VendorHourlyStats.status, func.sum(VendorHourlyStats.order_count)), start, end, vendor_id, None
+        ).group_by(VendorHourlyStats.status).all()
+        return {order_status: int(count) for order_status, count in rows if count}
+
+    def by_vendor(self, start: datetime, end: Optional[datetime] = None,
+                  statuses: Optional[Iterable[OrderStatus]] = None, limit: Optional[int] = None) -> List:
+        """Vendors ranked by revenue: vendor_id, vendor_name, order_count, revenue"""
+        revenue = func.sum(VendorHourlyStats.revenue)
+        query = self._query((
+            Vendor.id.label("vendor_id"),
+            Vendor.name.label("vendor_name"),
+            func.sum(VendorHourlyStats.order_count).label("order_count"),
+            revenue.label("revenue"),
+        ), start, end, None, statuses).join(
+            Vendor, Vendor.id == VendorHourlyStats.vendor_id
+        ).group_by(Vendor.id, Vendor.name).having(
+            func.sum(VendorHourlyStats.order_count) > 0
+        ).order_by(revenue.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def by_day(self, start: datetime, end: Optional[datetime] = None, vendor_id: Optional[int] = None,
+               statuses: Optional[Iterable[OrderStatus]] = None) -> Dict[str, tuple]:
+        """ISO date -> (order_count, revenue) for days that have orders"""
+        day = func.date_trunc("day", VendorHourlyStats.bucket)
+        rows = self._query((
+            day.label("day"),
+            func.sum(VendorHourlyStats.order_count),
+            func.sum(VendorHourlyStats.revenue),
+        ), start, end, vendor_id, statuses).group_by(day).order_by(day).all()
+        return {moment.date().isoformat(): (int(count), float(revenue)) for moment, count, revenue in rows if count}
+
+    def by_hour_of_day(self, start: datetime, end: Optional[datetime] = None, vendor_id: Optional[int] = None,
+                       statuses: Optional[Iterable[OrderStatus]] = None) -> Dict[int, int]:
+        hour = func.extract("hour", VendorHourlyStats.bucket)
+        rows = self._query(
+            (hour, func.sum(VendorHourlyStats.order_count)), start, end, vendor_id, statuses
+        ).group_by(hour).all()
+        return {int(hour_of_day): int(count) for hour_of_day, count in rows}
+
+    def rebuild(self) -> None:
+        """Recompute every bucket from orders; for repair after manual data fixes (caller commits)"""
+        self.db.execute(text("LOCK TABLE orders, order_items IN SHARE MODE"))
+        self.db.query(VendorHourlyStats).delete(synchronize_session=False)
+        self.db.execute(text(REBUILD_SQL))
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import BigInteger, cast, func, insert, or_, select, type_coerce, update
+from sqlalchemy.orm import Session
+
+from ..models import (
+    Order, OrderStatus, RiderWallet, VendorWallet, WalletTransaction,
+    WalletTransactionStatus, WalletTransactionType
+)
+from ..shared.config import settings
+from ..shared.database import SessionLocal
+from ..shared.money import Amount, MinorUnits
+from .ledger import WALLETS
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMMISSION_RATE = 0.15  # VendorWallet.commission_rate default, for rows where it is NULL
+
+SETTLEMENT_REFERENCE = "settlement"
+
+
+def commission(subtotal, commission_rate):
+    """Platform commission on a money expression, rounded to a whole minor unit in SQL"""
+    rate = func.coalesce(commission_rate, DEFAULT_COMMISSION_RATE)
+    return type_coerce(cast(func.round(subtotal * rate), BigInteger), MinorUnits)
+
+
+@dataclass
+class SettlementReport:
+    reference_id: str
+    orders_accrued: int = 0
+    wallets_settled: Dict[str, int] = field(default_factory=dict)  # wallet type -> wallets paid out
+    amount_settled: Dict[str, float] = field(default_factory=dict)  # wallet type -> total moved
+    seconds: float = 0.0
+
+
+class SettlementEngine:
+    """
+    Vendor and rider earnings, accrued per order and paid out in bulk.
+
+    accrue() claims delivered orders not yet accrued and adds their
+    earnings to pending_balance with one grouped UPDATE per wallet table:
+    the vendor gets the subtotal less VendorWallet.commission_rate, the
+    rider the delivery fee. settle() moves pending_balance to balance for
+    whole batches of wallets with one UPDATE each and records the payout
+    as one summary transaction per wallet in a multi-row INSERT. Wallet
+    rows are locked in id order like the ledger, so settlement queues
+    behind payments and transfers instead of deadlocking with them.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+    def run(self, db: Session) -> SettlementReport:
+        """Accrue every delivered order, then settle every wallet; commits per batch"""
+        started = time.perf_counter()
+        orders_accrued = self.accrue(db)
+        report = self.settle(db)
+        report.orders_accrued = orders_accrued
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def accrue(self, db: Session) -> int:
+        """Move the earnings of delivered orders into pending balances; returns orders accrued"""
+        accrued = 0
+        while True:
+            # SKIP LOCKED lets concurrent runs share the work; orders whose vendor or rider has
+            # no wallet yet stay unaccrued until it exists
+            claimable = select(Order.id).join(
+                VendorWallet, VendorWallet.vendor_id == Order.vendor_id
+            ).outerjoin(
+                RiderWallet, RiderWallet.rider_id == Order.rider_id
+            ).where(
+                Order.status == OrderStatus.DELIVERED,
+                Order.earnings_accrued_at.is_(None),
+                or_(Order.rider_id.is_(None), RiderWallet.id.isnot(None))
+            ).order_by(Order.id).limit(self.batch_size).with_for_update(of=Order, skip_locked=True)
+            order_ids = db.execute(
+                update(Order).where(Order.id.in_(claimable.scalar_subquery()))
+                # Bookkeeping, not an order change: updated_at keeps its value
+                .values(earnings_accrued_at=func.now(), updated_at=Order.updated_at)
+                .returning(Order.id).execution_options(synchronize_session=False)
+            ).scalars().all()
+            if not order_ids:
+                db.commit()
+                return accrued
+
+            vendor_earnings = select(
+                Order.vendor_id.label("owner_id"),
+                func.sum(Order.subtotal - commission(Order.subtotal, VendorWallet.commission_rate)).label("amount")
+            ).join(
+                VendorWallet, VendorWallet.vendor_id == Order.vendor_id
+            ).where(Order.id.in_(order_ids)).group_by(Order.vendor_id).subquery()
+            rider_earnings = select(
+                Order.rider_id.label("owner_id"),
+                func.sum(func.coalesce(Order.delivery_fee, 0)).label("amount")
+            ).where(
+                Order.id.in_(order_ids), Order.rider_id.isnot(None)
+            ).group_by(Order.rider_id).subquery()
+            # Wallet tables in the ledger's lock order (by type name), so accrual cannot deadlock with transfers
+            self._add_pending(db, "rider", rider_earnings)
+            self._add_pending(db, "vendor", vendor_earnings)
+            db.commit()
+            accrued += len(order_ids)
+
+    def settle(self, db: Session) -> SettlementReport:
+        """Pay out the pending balance of every active wallet; commits per batch"""
+        report = SettlementReport(reference_id=uuid.uuid4().hex)
+        for wallet_type in ("vendor", "rider"):
+            model, _, foreign_key = WALLETS[wallet_type]
+            report.wallets_settled[wallet_type] = 0
+            settled, after = Amount(0), 0
+            while True:
+                due = dict(db.execute(
+                    select(model.id, model.pending_balance).where(
+                        model.id > after, model.pending_balance > 0, model.is_active.is_(True)
+                    ).order_by(model.id).limit(self.batch_size).with_for_update()
+                ).all())
+                if not due:
+                    break
+                now = datetime.utcnow()
+                # SET expressions read the row as locked above, so balance gains exactly the pending amount
+                paid = db.execute(
+                    update(model).where(model.id.in_(list(due))).values(
+                        balance=model.balance + model.pending_balance, pending_balance=0,
+                        last_settlement_at=func.now(), last_transaction_at=func.now()
+                    ).returning(model.id, model.balance).execution_options(synchronize_session=False)
+                ).all()
+                db.execute(insert(WalletTransaction), [{
+                    foreign_key: wallet_id,
+                    "transaction_type": WalletTransactionType.DEPOSIT,
+                    "status": WalletTransactionStatus.COMPLETED,
+                    "amount": due[wallet_id],
+                    "balance_before": balance_after - due[wallet_id],
+                    "balance_after": balance_after,
+                    "description": "Settlement of pending earnings",
+                    "reference_id": report.reference_id,
+                    "reference_type": SETTLEMENT_REFERENCE,
+                    "processed_at": now,
+                } for wallet_id, balance_after in paid])
+                db.commit()
+                report.wallets_settled[wallet_type] += len(paid)
+                settled += sum(due[wallet_id] for wallet_id, _ in paid)
+                after = max(due)
+            report.amount_settled[wallet_type] = settled
+        return report
+
+    def _add_pending(self, db: Session, wallet_type: str, earnings) -> None:
+        model, owner, _ = WALLETS[wallet_type]
+        db.execute(
+            select(model.id).where(owner.in_(select(earnings.c.owner_id))).order_by(model.id).with_for_update()
+        ).all()
+        db.execute(
+            update(model).where(owner == earnings.c.owner_id, earnings.c.amount != 0)
+            .values(pending_balance=model.pending_balance + earnings.c.amount)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _in_session(method):
+    db = SessionLocal()
+    try:
+        return method(db)
+    finally:
+        db.close()
+
+
+async def run_settlement_loop(engine: SettlementEngine, accrual_interval_seconds: float,
+                              settlement_interval_seconds: float) -> None:
+    """Accrue earnings every accrual_interval_seconds and settle every settlement_interval_seconds"""
+    next_settlement = time.monotonic() + settlement_interval_seconds
+    while True:
+        await asyncio.sleep(accrual_interval_seconds)
+        settle = time.monotonic() >= next_settlement
+        try:
+            if settle:
+                report = await asyncio.to_thread(_in_session, engine.run)
+                logger.info("Settlement %s paid out %s to %s wallets", report.reference_id,
+                            report.amount_settled, report.wallets_settled)
+            else:
+                await asyncio.to_thread(_in_session, engine.accrue)
+        except Exception:
+            logger.exception("Settlement failed")
+        if settle:
+            next_settlement = time.monotonic() + settlement_interval_seconds
+
+
+# Process-wide engine used by the background loop and the settlement endpoint
+settlement_engine = SettlementEngine(batch_size=settings.settlement_batch_size)
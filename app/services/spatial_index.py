@@ -0,0 +1,177 @@
+import math
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import Vendor
+from .geo import KM_PER_DEGREE_LAT, CoordinateSet
+
+
+@dataclass
+class IndexedVendor:
+    vendor_id: int
+    latitude: float
+    longitude: float
+    vendor_type: Optional[str]
+    is_active: bool
+
+
+class GridSpatialIndex:
+    """
+    Buckets vendor coordinates into fixed-size lat/lng grid cells.
+
+    Radius and k-nearest lookups only visit the cells overlapping the search
+    circle, so their cost depends on local vendor density rather than on the
+    total number of vendors. The index is warmed from the database on first use
+    and kept current by the vendor command handlers; a periodic rebuild bounds
+    staleness when several worker processes each hold their own copy.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.05, refresh_interval_seconds: int = 300):
+        self.cell_size_deg = cell_size_deg
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._lon_cells = int(round(360.0 / cell_size_deg))
+        self._cells: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self._entries: Dict[int, IndexedVendor] = {}
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+
+    # ==================
+    # MAINTENANCE
+    # ==================
+
+    def _cell_for(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        row = int(math.floor(latitude / self.cell_size_deg))
+        col = int(math.floor((longitude + 180.0) / self.cell_size_deg)) % self._lon_cells
+        return row, col
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Build the index on first use and rebuild it once it is older than the refresh interval"""
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval_seconds:
+                return
+            self.rebuild(db)
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every vendor's coordinates (columns only, no ORM objects)"""
+        rows = db.query(
+            Vendor.id, Vendor.latitude, Vendor.longitude, Vendor.vendor_type, Vendor.is_active
+        ).all()
+        with self._lock:
+            self._cells.clear()
+            self._entries.clear()
+            for vendor_id, latitude, longitude, vendor_type, is_active in rows:
+                self._insert(vendor_id, latitude, longitude, vendor_type, is_active)
+            self._loaded_at = time.monotonic()
+
+    def _insert(self, vendor_id, latitude, longitude, vendor_type, is_active) -> None:
+        if latitude is None or longitude is None:
+            return
+        entry = IndexedVendor(
+            vendor_id=vendor_id,
+            latitude=float(latitude),
+            longitude=float(longitude),
+            vendor_type=getattr(vendor_type, "value", vendor_type),
+            is_active=bool(is_active) if is_active is not None else True,
+        )
+        self._entries[vendor_id] = entry
+        self._cells[self._cell_for(entry.latitude, entry.longitude)].add(vendor_id)
+
+    def remove(self, vendor_id: int) -> None:
+        """Drop a vendor from the index"""
+        with self._lock:
+            entry = self._entries.pop(vendor_id, None)
+            if entry is None:
+                return
+            cell = self._cell_for(entry.latitude, entry.longitude)
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(vendor_id)
+                if not bucket:
+                    del self._cells[cell]
+
+    def sync_vendor(self, vendor: Vendor) -> None:
+        """Insert or move a vendor after it has been created, updated or deactivated"""
+        if vendor is None:
+            return
+        with self._lock:
+            if self._loaded_at is None:
+                # Nothing to keep in sync yet; the first query loads the full table
+                return
+            self.remove(vendor.id)
+            self._insert(vendor.id, vendor.latitude, vendor.longitude, vendor.vendor_type, vendor.is_active)
+
+    # ==================
+    # LOOKUPS
+    # ==================
+
+    def query_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        vendor_type: Optional[str] = None,
+        active_only: bool = True,
+    ) -> List[Tuple[int, float]]:
+        """Return (vendor_id, distance_km) pairs within radius_km, nearest first"""
+        vendor_type = getattr(vendor_type, "value", vendor_type)
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        min_row, _ = self._cell_for(max(-90.0, latitude - lat_span), longitude)
+        max_row, _ = self._cell_for(min(90.0, latitude + lat_span), longitude)
+
+        # Longitude degrees shrink towards the poles; widen the column span accordingly
+        cos_lat = math.cos(math.radians(min(89.9, abs(latitude) + lat_span)))
+        lon_span = radius_km / (KM_PER_DEGREE_LAT * max(cos_lat, 1e-6))
+        if lon_span >= 180.0:
+            columns = range(self._lon_cells)
+        else:
+            _, min_col = self._cell_for(latitude, longitude - lon_span)
+            _, max_col = self._cell_for(latitude, longitude + lon_span)
+            span = (max_col - min_col) % self._lon_cells
+            columns = [(min_col + offset) % self._lon_cells for offset in range(span + 1)]
+
+        candidate_ids, latitudes, longitudes = [], [], []
+        with self._lock:
+            for row in range(min_row, max_row + 1):
+                for col in columns:
+                    for vendor_id in self._cells.get((row, col), ()):
+                        entry = self._entries[vendor_id]
+                        if active_only and not entry.is_active:
+                            continue
+                        if vendor_type and entry.vendor_type != vendor_type:
+                            continue
+                        candidate_ids.append(vendor_id)
+                        latitudes.append(entry.latitude)
+                        longitudes.append(entry.longitude)
+
+        candidates = CoordinateSet(candidate_ids, latitudes, longitudes)
+        ids, distances = candidates.within(latitude, longitude, radius_km)
+        return list(zip(ids.tolist(), distances.tolist()))
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        max_radius_km: float = 50.0,
+        vendor_type: Optional[str] = None,
+        active_only: bool = True,
+    ) -> List[Tuple[int, float]]:
+        """Return the k nearest vendors within max_radius_km by growing the search ring"""
+        radius = min(max_radius_km, self.cell_size_deg * KM_PER_DEGREE_LAT)
+        while True:
+            hits = self.query_radius(latitude, longitude, radius, vendor_type, active_only)
+            if len(hits) >= k or radius >= max_radius_km:
+                return hits[:k]
+            radius = min(max_radius_km, radius * 2)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide index shared by the search routes and vendor command handlers
+vendor_spatial_index = GridSpatialIndex()
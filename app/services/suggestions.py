@@ -0,0 +1,213 @@
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models import Vendor, Item, ItemCategory
+
+
+VENDOR = "vendor"
+ITEM = "item"
+CATEGORY = "category"
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase and collapse punctuation/whitespace so "Mama's  Kitchen" matches "mama s k" """
+    return " ".join(_WORD_PATTERN.findall((text or "").casefold()))
+
+
+@dataclass
+class Suggestion:
+    kind: str
+    entity_id: int
+    name: str
+    vendor_id: Optional[int] = None
+
+
+class PrefixSuggester:
+    """
+    Sorted-array prefix index over vendor, item and category names.
+
+    Every word start of a name is stored as a key ("jollof rice" and "rice"),
+    so typing any word of a name finds it. Each kind has its own sorted list
+    of (key, name) tuples holding every distinct normalised name once; the
+    entities sharing a name (the same dish sold by many vendors) hang off
+    that name. A lookup bisects to the first key >= prefix in each wanted
+    kind and merges forward scans, so it touches about `limit` keys however
+    large the catalogue is, with no database access. The command handlers
+    keep it current after each commit and a periodic rebuild bounds
+    staleness across worker processes.
+    """
+
+    KINDS = (VENDOR, ITEM, CATEGORY)
+
+    def __init__(self, refresh_interval_seconds: int = 300):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._keys: Dict[str, List[Tuple[str, str]]] = {kind: [] for kind in self.KINDS}
+        # kind -> normalised name -> {entity id: entry}, in insertion order
+        self._names: Dict[str, Dict[str, Dict[int, Suggestion]]] = {kind: {} for kind in self.KINDS}
+        self._entries: Dict[Tuple[str, int], Suggestion] = {}
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+
+    # ==================
+    # MAINTENANCE
+    # ==================
+
+    @staticmethod
+    def _keys_for(label: str) -> List[Tuple[str, str]]:
+        words = label.split(" ")
+        return [(" ".join(words[i:]), label) for i in range(len(words)) if words[i]]
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Build the index on first use and rebuild it once it is older than the refresh interval"""
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval_seconds:
+                return
+            self.rebuild(db)
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every visible name (columns only, no ORM objects) and sort once"""
+        vendors = db.query(Vendor.id, Vendor.name).filter(Vendor.is_active == True).order_by(Vendor.id).all()
+        items = db.query(Item.id, Item.name, Item.vendor_id).filter(Item.is_available == True).order_by(Item.id).all()
+        categories = db.query(ItemCategory.id, ItemCategory.name, ItemCategory.vendor_id).order_by(ItemCategory.id).all()
+
+        entries: Dict[Tuple[str, int], Suggestion] = {}
+        for vendor_id, name in vendors:
+            entries[(VENDOR, vendor_id)] = Suggestion(VENDOR, vendor_id, name, vendor_id)
+        for item_id, name, vendor_id in items:
+            entries[(ITEM, item_id)] = Suggestion(ITEM, item_id, name, vendor_id)
+        for category_id, name, vendor_id in categories:
+            entries[(CATEGORY, category_id)] = Suggestion(CATEGORY, category_id, name, vendor_id)
+
+        names: Dict[str, Dict[str, Dict[int, Suggestion]]] = {kind: {} for kind in self.KINDS}
+        for entry in entries.values():
+            names[entry.kind].setdefault(normalize(entry.name), {})[entry.entity_id] = entry
+        keys = {kind: sorted(key for label in names[kind] for key in self._keys_for(label)) for kind in self.KINDS}
+
+        with self._lock:
+            self._entries = entries
+            self._names = names
+            self._keys = keys
+            self._loaded_at = time.monotonic()
+
+    def _add(self, entry: Suggestion) -> None:
+        self._entries[(entry.kind, entry.entity_id)] = entry
+        label = normalize(entry.name)
+        holders = self._names[entry.kind].setdefault(label, {})
+        if not holders:
+            for key in self._keys_for(label):
+                insort(self._keys[entry.kind], key)
+        holders[entry.entity_id] = entry
+
+    def _discard(self, kind: str, entity_id: int) -> None:
+        entry = self._entries.pop((kind, entity_id), None)
+        if entry is None:
+            return
+        label = normalize(entry.name)
+        holders = self._names[kind][label]
+        del holders[entity_id]
+        if holders:
+            return  # Another entity still carries this name
+        del self._names[kind][label]
+        keys = self._keys[kind]
+        for key in self._keys_for(label):
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+
+    def sync(self, kind: str, entity_id: int, name: Optional[str],
+             vendor_id: Optional[int] = None, visible: bool = True) -> None:
+        """Insert, rename or hide one entry after its row has been committed"""
+        with self._lock:
+            if self._loaded_at is None:
+                # Nothing to keep in sync yet; the first lookup loads everything
+                return
+            self._discard(kind, entity_id)
+            if not visible or not name:
+                return
+            self._add(Suggestion(kind, entity_id, name, vendor_id))
+
+    def remove(self, kind: str, entity_id: int) -> None:
+        """Drop one entry"""
+        with self._lock:
+            self._discard(kind, entity_id)
+
+    def remove_many(self, kind: str, entity_ids: Iterable[int]) -> None:
+        """Drop several entries of the same kind, e.g. items cascaded with their category"""
+        with self._lock:
+            for entity_id in entity_ids:
+                self._discard(kind, entity_id)
+
+    def remove_vendor(self, vendor_id: int) -> None:
+        """Drop a vendor together with the items and categories the database cascades away"""
+        with self._lock:
+            owned = [key for key, entry in self._entries.items() if entry.vendor_id == vendor_id]
+            for kind, entity_id in owned:
+                self._discard(kind, entity_id)
+
+    def sync_vendor(self, vendor: Vendor) -> None:
+        if vendor is not None:
+            self.sync(VENDOR, vendor.id, vendor.name, vendor.id, visible=vendor.is_active is not False)
+
+    def sync_item(self, item: Item) -> None:
+        if item is not None:
+            self.sync(ITEM, item.id, item.name, item.vendor_id, visible=item.is_available is not False)
+
+    def sync_category(self, category: ItemCategory) -> None:
+        if category is not None:
+            self.sync(CATEGORY, category.id, category.name, category.vendor_id)
+
+    # ==================
+    # LOOKUPS
+    # ==================
+
+    def _matches(self, kind: str, prefix: str) -> Iterator[Tuple[str, str, str]]:
+        keys = self._keys[kind]
+        position = bisect_left(keys, (prefix,))
+        while position < len(keys):
+            key, label = keys[position]
+            if not key.startswith(prefix):
+                return
+            yield key, kind, label
+            position += 1
+
+    def suggest(self, text: str, limit: int = 10, kinds: Optional[Iterable[str]] = None) -> List[Suggestion]:
+        """
+        Names with a word starting with the typed text, in key order.
+
+        Identical names of the same kind (the same dish sold by many vendors)
+        are collapsed to a single suggestion.
+        """
+        prefix = normalize(text)
+        if not prefix or limit <= 0:
+            return []
+        kinds = set(kinds) if kinds else None
+
+        results: List[Suggestion] = []
+        seen = set()
+        with self._lock:
+            scans = [self._matches(kind, prefix) for kind in self.KINDS if kinds is None or kind in kinds]
+            for key, kind, label in heapq.merge(*scans):
+                # Only a name repeating a word ("rice and rice") yields the same name twice
+                if (kind, label) in seen:
+                    continue
+                seen.add((kind, label))
+                results.append(next(iter(self._names[kind][label].values())))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide index shared by the suggest endpoint and the menu/vendor command handlers
+name_suggester = PrefixSuggester()
@@ -0,0 +1,44 @@
+import re
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+
+# 'simple' keeps dish and brand names intact (no English stemming of "Egusi", "Amala", ...)
+SEARCH_CONFIG = "simple"
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_prefix_tsquery(term: str) -> Optional[str]:
+    """
+    Turn free text into a prefix-matching tsquery string.
+
+    Every word must match and the last one may be incomplete, so
+    "jollof ri" becomes "jollof:* & ri:*". Returns None when the term
+    contains no searchable words.
+    """
+    tokens = _TOKEN_PATTERN.findall(term.lower())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def apply_text_search(query: Query, search_vector, term: str, rank: bool = True) -> Query:
+    """
+    Filter a query to rows whose search_vector matches the term.
+
+    The @@ match is served by the GIN index on search_vector. With rank=True
+    results are ordered by ts_rank_cd, so name matches (weight A) come before
+    description matches (weight B).
+    """
+    tsquery_text = build_prefix_tsquery(term)
+    if tsquery_text is None:
+        return query.filter(False)
+
+    tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+    query = query.filter(search_vector.op("@@")(tsquery))
+    if rank:
+        query = query.order_by(func.ts_rank_cd(search_vector, tsquery).desc())
+    return query
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import OrderStatus, VendorHourlyStats
+
+
+GRANULARITIES = ("day", "week", "month")
+
+
+# ==================
+# CALENDAR BUCKETS
+# ==================
+
+def _naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def floor_to(moment: datetime, granularity: str) -> datetime:
+    """Start of the bucket containing moment; weeks start on Monday like Postgres date_trunc"""
+    day = _naive_utc(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def shift(bucket: datetime, granularity: str, steps: int) -> datetime:
+    """Move a bucket start by whole buckets; months use calendar arithmetic, not 30 days"""
+    if granularity == "day":
+        return bucket + timedelta(days=steps)
+    if granularity == "week":
+        return bucket + timedelta(weeks=steps)
+    month_index = bucket.year * 12 + bucket.month - 1 + steps
+    return bucket.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+
+def bucket_starts(start: datetime, end: datetime, granularity: str, limit: Optional[int] = None) -> List[datetime]:
+    """Every bucket start from the one containing start up to (excluding) end; stops past limit"""
+    buckets, bucket = [], floor_to(start, granularity)
+    end = _naive_utc(end)
+    while bucket < end and (limit is None or len(buckets) <= limit):
+        buckets.append(bucket)
+        bucket = shift(bucket, granularity, 1)
+    return buckets
+
+
+# ==================
+# SERIES QUERIES
+# ==================
+
+class TimeSeriesQuery:
+    """
+    Calendar-bucketed series over [start, end) with one grouped query per series.
+
+    Buckets are computed in UTC by date_trunc in the database and by
+    floor_to/shift in Python, so both sides agree on month and week
+    boundaries. rows() merges any number of series into one row per bucket,
+    filling gaps with zeros.
+    """
+
+    def __init__(self, db: Session, granularity: str, start: datetime, end: datetime,
+                 max_buckets: Optional[int] = None):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        self.db = db
+        self.granularity = granularity
+        # With max_buckets, an over-long range yields max_buckets + 1 buckets for the caller to reject
+        self.buckets = bucket_starts(start, end, granularity, max_buckets)
+        self.start = self.buckets[0] if self.buckets else floor_to(start, granularity)
+        self.end = shift(self.buckets[-1], granularity, 1) if self.buckets else self.start
+
+    def _utc_bucket(self, column):
+        return func.date_trunc(self.granularity, func.timezone("UTC", column))
+
+    def counts(self, column, *criteria) -> Dict[datetime, int]:
+        """Rows per bucket of a timestamptz column, e.g. User.created_at"""
+        bucket = self._utc_bucket(column)
+        rows = self.db.query(bucket, func.count()).filter(
+            column >= self.start.replace(tzinfo=timezone.utc),
+            column < self.end.replace(tzinfo=timezone.utc),
+            *criteria
+        ).group_by(bucket).all()
+        return {moment: count for moment, count in rows}
+
+    def order_rollups(self, statuses: Iterable[OrderStatus]) -> Dict[datetime, Tuple[int, float]]:
+        """(order count, revenue) per bucket, summed from the hourly vendor rollups"""
+        bucket = func.date_trunc(self.granularity, VendorHourlyStats.bucket)
+        rows = self.db.query(
+            bucket, func.sum(VendorHourlyStats.order_count), func.sum(VendorHourlyStats.revenue)
+        ).filter(
+            VendorHourlyStats.bucket >= self.start,
+            VendorHourlyStats.bucket < self.end,
+            VendorHourlyStats.status.in_(list(statuses))
+        ).group_by(bucket).all()
+        return {moment: (int(count or 0), float(revenue or 0.0)) for moment, count, revenue in rows}
+
+    def label(self, bucket: datetime) -> str:
+        return bucket.strftime("%Y-%m") if self.granularity == "month" else bucket.date().isoformat()
+
+    def rows(self, **series: Dict[datetime, object]) -> List[Dict[str, object]]:
+        """One dict per bucket with a key per series; missing buckets get the series' zero"""
+        rows = []
+        for bucket in self.buckets:
+            row = {
+                "period": self.label(bucket),
+                "period_start": bucket,
+                "period_end": shift(bucket, self.granularity, 1),
+            }
+            for name, values in series.items():
+                row[name] = values.get(bucket, 0)
+            rows.append(row)
+        return rows
+
+
+def trailing_buckets(granularity: str, periods: int, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """The last `periods` complete buckets before the current one"""
+    end = floor_to(now or datetime.utcnow(), granularity)
+    return shift(end, granularity, -periods), end
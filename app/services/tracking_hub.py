@@ -0,0 +1,185 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import inspect
+
+from ..models import Order, Rider
+from .location_store import LocationFix, rider_location_store
+
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class TrackingHub:
+    """
+    Per-order fan-out of live tracking events to streaming clients.
+
+    The first watcher of an order loads one snapshot from the database; every
+    later watcher is served from that cached snapshot. Rider pings and status
+    changes arrive with their data already in hand, update the snapshot and
+    are pushed to each watcher's queue, so a change costs no reads however
+    many clients are watching. Slow clients have bounded queues and drop
+    their oldest event, since newer positions supersede older ones.
+
+    Publishers may run on the event loop or in worker threads; all state is
+    only touched on the loop. The hub is per process: a watcher only sees
+    events published by the worker serving its stream, so live tracking
+    needs a single API worker, like the in-memory location backend. More
+    workers would need publish_location/publish_status fanned out through
+    a shared channel (Postgres LISTEN/NOTIFY or Redis pub/sub).
+    """
+
+    def __init__(self, queue_size: int = 32):
+        self.queue_size = queue_size
+        self._watchers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._snapshots: Dict[int, Dict[str, Any]] = {}
+        self._orders_by_rider: Dict[int, Set[int]] = defaultdict(set)
+        self._load_locks: Dict[int, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ==================
+    # SUBSCRIPTIONS
+    # ==================
+
+    async def subscribe(self, order_id: int, load_snapshot: Callable[[], Dict[str, Any]]) -> asyncio.Queue:
+        """Register a watcher; load_snapshot runs (in a thread) only if no one is watching yet"""
+        self._loop = asyncio.get_running_loop()
+        lock = self._load_locks.setdefault(order_id, asyncio.Lock())
+        async with lock:
+            if order_id not in self._snapshots:
+                try:
+                    snapshot = await asyncio.to_thread(load_snapshot)
+                except Exception:
+                    if order_id not in self._watchers:
+                        self._load_locks.pop(order_id, None)
+                    raise
+                self._snapshots[order_id] = snapshot
+                if snapshot.get("rider_id"):
+                    self._orders_by_rider[snapshot["rider_id"]].add(order_id)
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        queue.put_nowait(("snapshot", dict(self._snapshots[order_id])))
+        self._watchers[order_id].add(queue)
+        return queue
+
+    def unsubscribe(self, order_id: int, queue: asyncio.Queue) -> None:
+        watchers = self._watchers.get(order_id)
+        if watchers is None:
+            return
+        watchers.discard(queue)
+        if watchers:
+            return
+        # Last watcher gone: forget the order entirely
+        del self._watchers[order_id]
+        self._load_locks.pop(order_id, None)
+        snapshot = self._snapshots.pop(order_id, None)
+        if snapshot and snapshot.get("rider_id"):
+            self._unmap_rider(snapshot["rider_id"], order_id)
+
+    def watcher_count(self, order_id: int) -> int:
+        return len(self._watchers.get(order_id, ()))
+
+    # ==================
+    # PUBLISHING
+    # ==================
+
+    def publish_location(self, fix: LocationFix) -> None:
+        """Push a rider position to every order that rider is delivering and someone watches"""
+        if fix is None or fix.rider_id not in self._orders_by_rider:
+            return
+        self._on_loop(self._apply_location, fix)
+
+    def publish_status(self, order_id: int, status: str, rider: Optional[Dict[str, Any]] = None,
+                       at: Optional[datetime] = None) -> None:
+        """Push a status change; rider carries id/name/phone when the assignment changed"""
+        if order_id not in self._snapshots:
+            return
+        self._on_loop(self._apply_status, order_id, status, rider, at or datetime.utcnow())
+
+    def is_watched(self, order_id: int) -> bool:
+        return order_id in self._snapshots
+
+    def _on_loop(self, callback, *args) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _apply_location(self, fix: LocationFix) -> None:
+        payload = {
+            "rider_id": fix.rider_id,
+            "latitude": fix.latitude,
+            "longitude": fix.longitude,
+            "timestamp": fix.recorded_at.isoformat(),
+        }
+        for order_id in list(self._orders_by_rider.get(fix.rider_id, ())):
+            snapshot = self._snapshots.get(order_id)
+            if snapshot is None:
+                continue
+            snapshot["rider_latitude"], snapshot["rider_longitude"] = fix.latitude, fix.longitude
+            self._fan_out(order_id, ("location", dict(payload, order_id=order_id)))
+
+    def _apply_status(self, order_id: int, status: str, rider: Optional[Dict[str, Any]], at: datetime) -> None:
+        snapshot = self._snapshots.get(order_id)
+        if snapshot is None:
+            return
+        snapshot["status"] = status
+        snapshot["updated_at"] = at.isoformat()
+        if rider and rider.get("rider_id") != snapshot.get("rider_id"):
+            if snapshot.get("rider_id"):
+                self._unmap_rider(snapshot["rider_id"], order_id)
+            snapshot.update(rider)
+            self._orders_by_rider[rider["rider_id"]].add(order_id)
+        self._fan_out(order_id, ("status", {
+            "order_id": order_id,
+            "status": status,
+            "rider_id": snapshot.get("rider_id"),
+            "timestamp": snapshot["updated_at"],
+        }))
+
+    def _fan_out(self, order_id: int, event: Event) -> None:
+        for queue in self._watchers.get(order_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _unmap_rider(self, rider_id: int, order_id: int) -> None:
+        orders = self._orders_by_rider.get(rider_id)
+        if orders is not None:
+            orders.discard(order_id)
+            if not orders:
+                del self._orders_by_rider[rider_id]
+
+
+def publish_order_status(order: Order, at: Optional[datetime] = None) -> None:
+    """Push an order's status to its watchers; call after committing every status change"""
+    order_id = inspect(order).identity[0]  # No reload of the instance expired by the commit
+    if tracking_hub.is_watched(order_id):
+        tracking_hub.publish_status(order_id, order.status.value, rider_details(order.rider), at)
+
+
+def rider_details(rider: Optional[Rider]) -> Optional[Dict[str, Any]]:
+    """Snapshot fields for a newly assigned rider, preferring the in-memory position"""
+    if rider is None:
+        return None
+    fix = rider_location_store.latest(rider.id)
+    return {
+        "rider_id": rider.id,
+        "rider_name": rider.full_name,
+        "rider_phone": rider.phone_number,
+        "rider_latitude": fix.latitude if fix else rider.current_latitude,
+        "rider_longitude": fix.longitude if fix else rider.current_longitude,
+    }
+
+
+# Process-wide hub fed by the location/status endpoints and dispatch, read by the stream endpoint
+tracking_hub = TrackingHub()
@@ -0,0 +1,284 @@
+import math
+import threading
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models import OrderTrajectory
+from .location_store import LocationFix
+
+
+POLYLINE_PRECISION = 1e5  # ~1.1 m at the equator
+
+
+# ==================
+# ENCODING
+# ==================
+
+def _encode_value(value: int, out: List[str]) -> None:
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+
+def encode_path(latitudes: Iterable[float], longitudes: Iterable[float], seconds: Iterable[int]) -> str:
+    """
+    Polyline-encode (lat, lon, seconds) triples as deltas from the previous point.
+
+    Latitude and longitude use the standard 1e-5 polyline precision; the
+    third value is whole seconds since the first fix, so a typical point
+    costs 6-10 characters.
+    """
+    out: List[str] = []
+    previous = (0, 0, 0)
+    for lat, lon, second in zip(latitudes, longitudes, seconds):
+        current = (round(lat * POLYLINE_PRECISION), round(lon * POLYLINE_PRECISION), int(second))
+        for value, last in zip(current, previous):
+            _encode_value(value - last, out)
+        previous = current
+    return "".join(out)
+
+
+def decode_path(encoded: str) -> List[Tuple[float, float, int]]:
+    """Inverse of encode_path: (latitude, longitude, seconds since start) per point"""
+    points: List[Tuple[float, float, int]] = []
+    totals = [0, 0, 0]
+    index, length = 0, len(encoded)
+    while index < length:
+        for dimension in range(3):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            totals[dimension] += ~(result >> 1) if result & 1 else result >> 1
+        points.append((totals[0] / POLYLINE_PRECISION, totals[1] / POLYLINE_PRECISION, totals[2]))
+    return points
+
+
+# ==================
+# GEOMETRY
+# ==================
+
+def _project_metres(latitudes: np.ndarray, longitudes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Local equirectangular projection; accurate to well under 1% over a city"""
+    scale = 6_371_000.0 * math.pi / 180.0
+    x = longitudes * scale * math.cos(math.radians(float(latitudes.mean())))
+    y = latitudes * scale
+    return x, y
+
+
+def simplify(latitudes: np.ndarray, longitudes: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification; returns the sorted indices of the points kept.
+
+    Iterative with an explicit stack, and the distance of every interior
+    point of a segment is computed in one vectorised pass.
+    """
+    count = len(latitudes)
+    if count <= 2:
+        return np.arange(count)
+
+    x, y = _project_metres(latitudes, longitudes)
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+        length = math.hypot(dx, dy)
+        if length == 0.0:
+            distances = np.hypot(px, py)
+        else:
+            distances = np.abs(px * dy - py * dx) / length
+        farthest = int(distances.argmax())
+        if distances[farthest] > tolerance_m:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+
+def path_length_km(latitudes: np.ndarray, longitudes: np.ndarray) -> float:
+    if len(latitudes) < 2:
+        return 0.0
+    x, y = _project_metres(latitudes, longitudes)
+    return float(np.hypot(np.diff(x), np.diff(y)).sum() / 1000.0)
+
+
+# ==================
+# RECORDER
+# ==================
+
+class TrajectoryBuffer:
+    """Append-only fixes of one delivery in packed arrays (24 bytes per fix)"""
+
+    __slots__ = ("rider_id", "latitudes", "longitudes", "timestamps")
+
+    def __init__(self, rider_id: int):
+        self.rider_id = rider_id
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.timestamps = array("d")  # Unix seconds
+
+    def append(self, fix: LocationFix) -> bool:
+        """Add a fix unless it is not newer than the last one"""
+        timestamp = fix.recorded_at.timestamp()
+        if self.timestamps and timestamp <= self.timestamps[-1]:
+            return False
+        self.latitudes.append(fix.latitude)
+        self.longitudes.append(fix.longitude)
+        self.timestamps.append(timestamp)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+@dataclass
+class TrajectoryPoint:
+    latitude: float
+    longitude: float
+    timestamp: datetime
+
+
+class TrajectoryRecorder:
+    """
+    Collects the GPS route of every delivery in transit and stores it compressed.
+
+    A buffer is opened when a rider is assigned, fed by the same pings that
+    update the live location store, and closed when the order reaches a final
+    status. Closing simplifies the route with Douglas-Peucker, polyline-encodes
+    it and adds one OrderTrajectory row to the caller's transaction. Buffers
+    live in this process, like the location store's in-memory backend.
+    """
+
+    def __init__(self, tolerance_m: float = 8.0, max_points: int = 20_000):
+        self.tolerance_m = tolerance_m
+        self.max_points = max_points
+        self._buffers: Dict[int, TrajectoryBuffer] = {}
+        self._orders_by_rider: Dict[int, Set[int]] = {}
+        self._received: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def start(self, order_id: int, rider_id: Optional[int]) -> None:
+        """Begin recording an order's route; re-assigning to another rider keeps the points so far"""
+        if rider_id is None:
+            return
+        with self._lock:
+            buffer = self._buffers.get(order_id)
+            if buffer is not None:
+                if buffer.rider_id == rider_id:
+                    return
+                self._unmap(buffer.rider_id, order_id)
+                buffer.rider_id = rider_id
+            else:
+                self._buffers[order_id] = TrajectoryBuffer(rider_id)
+                self._received[order_id] = 0
+            self._orders_by_rider.setdefault(rider_id, set()).add(order_id)
+
+    def record(self, fix: Optional[LocationFix]) -> None:
+        if fix is None or fix.rider_id not in self._orders_by_rider:
+            return
+        with self._lock:
+            for order_id in self._orders_by_rider.get(fix.rider_id, ()):
+                buffer = self._buffers[order_id]
+                if buffer.append(fix):
+                    self._received[order_id] += 1
+                    if len(buffer) >= self.max_points:
+                        self._compact(buffer)
+
+    def record_many(self, fixes: Iterable[LocationFix]) -> None:
+        """Record a batch in time order so older buffered fixes are not dropped"""
+        for fix in sorted(fixes, key=lambda fix: fix.recorded_at):
+            self.record(fix)
+
+    def current(self, order_id: int) -> Optional[List[TrajectoryPoint]]:
+        """Route recorded so far for an order still in transit"""
+        with self._lock:
+            buffer = self._buffers.get(order_id)
+            if buffer is None:
+                return None
+            return [
+                TrajectoryPoint(lat, lon, datetime.fromtimestamp(ts, tz=timezone.utc))
+                for lat, lon, ts in zip(buffer.latitudes, buffer.longitudes, buffer.timestamps)
+            ]
+
+    def finish(self, db: Session, order_id: int) -> Optional[OrderTrajectory]:
+        """Compress the route into the session (the caller commits); None if nothing was recorded"""
+        with self._lock:
+            buffer = self._buffers.pop(order_id, None)
+            received = self._received.pop(order_id, 0)
+            if buffer is None:
+                return None
+            self._unmap(buffer.rider_id, order_id)
+        if not len(buffer):
+            return None
+
+        trajectory = self.compress(buffer, received)
+        trajectory.order_id = order_id
+        db.merge(trajectory)
+        return trajectory
+
+    def compress(self, buffer: TrajectoryBuffer, received: Optional[int] = None) -> OrderTrajectory:
+        latitudes = np.frombuffer(buffer.latitudes, dtype=np.float64)
+        longitudes = np.frombuffer(buffer.longitudes, dtype=np.float64)
+        timestamps = np.frombuffer(buffer.timestamps, dtype=np.float64)
+        kept = simplify(latitudes, longitudes, self.tolerance_m)
+        seconds = np.rint(timestamps[kept] - timestamps[0]).astype(np.int64)
+        return OrderTrajectory(
+            rider_id=buffer.rider_id,
+            encoded_path=encode_path(latitudes[kept].tolist(), longitudes[kept].tolist(), seconds.tolist()),
+            point_count=len(kept),
+            raw_point_count=received if received is not None else len(buffer),
+            distance_km=path_length_km(latitudes, longitudes),
+            started_at=datetime.fromtimestamp(timestamps[0], tz=timezone.utc),
+            ended_at=datetime.fromtimestamp(timestamps[-1], tz=timezone.utc)
+        )
+
+    def _compact(self, buffer: TrajectoryBuffer) -> None:
+        """Simplify a very long route in place so a stuck delivery cannot grow without bound"""
+        latitudes = np.frombuffer(buffer.latitudes, dtype=np.float64)
+        longitudes = np.frombuffer(buffer.longitudes, dtype=np.float64)
+        tolerance_m = self.tolerance_m
+        kept = simplify(latitudes, longitudes, tolerance_m)
+        # Noisy routes barely simplify; coarsen until at least half the room is freed
+        while len(kept) > self.max_points // 2:
+            tolerance_m *= 2
+            kept = simplify(latitudes, longitudes, tolerance_m)
+        del latitudes, longitudes
+        for name in ("latitudes", "longitudes", "timestamps"):
+            values = getattr(buffer, name)
+            setattr(buffer, name, array("d", (values[i] for i in kept.tolist())))
+
+    def _unmap(self, rider_id: int, order_id: int) -> None:
+        orders = self._orders_by_rider.get(rider_id)
+        if orders is not None:
+            orders.discard(order_id)
+            if not orders:
+                del self._orders_by_rider[rider_id]
+
+
+def decode_trajectory(trajectory: OrderTrajectory) -> List[TrajectoryPoint]:
+    started = trajectory.started_at.timestamp()
+    return [
+        TrajectoryPoint(lat, lon, datetime.fromtimestamp(started + seconds, tz=timezone.utc))
+        for lat, lon, seconds in decode_path(trajectory.encoded_path)
+    ]
+
+
+# Process-wide recorder fed by the location endpoints and closed by the delivery endpoints
+trajectory_recorder = TrajectoryRecorder()
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import and_, delete, exists, func, literal, select, String
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models import WalletSnapshot, WalletTransaction
+from ..shared.config import settings
+from ..shared.database import SessionLocal
+from ..shared.money import Amount
+from .ledger import WALLETS
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WalletDrift:
+    """A wallet whose balance disagrees with its transaction log"""
+    wallet_type: str
+    wallet_id: int
+    owner_id: int
+    balance: float
+    ledger_balance: float
+
+    @property
+    def difference(self) -> float:
+        return Amount.of(self.balance) - self.ledger_balance
+
+
+@dataclass
+class AuditReport:
+    wallets: int = 0                  # Wallets compared
+    transactions_replayed: int = 0    # Transactions after the checkpoints
+    checkpoint_transaction_id: int = 0
+    seconds: float = 0.0
+    drift: List[WalletDrift] = field(default_factory=list)
+
+
+class WalletAudit:
+    """
+    Wallet balances checked against the WalletTransaction log from checkpoints.
+
+    The ledger balance of a wallet is the sum of balance_after - balance_before
+    over its transactions. snapshot() folds the transactions since each
+    wallet's checkpoint into a new one; verify() replays only the
+    transactions after the checkpoints and compares with the balance
+    columns. Both are a handful of set-based statements per wallet type, so
+    their cost follows the transactions since the last snapshot, not the
+    size of the log. Wallets without a checkpoint count from the oldest
+    one, or from the first transaction before any snapshot was taken.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+
+    def snapshot(self, db: Session) -> int:
+        """Checkpoint every wallet up to the latest transaction; commits per batch, returns wallets checkpointed"""
+        floor = self._floor(db)
+        checkpointed = 0
+        for wallet_type, (model, _, _) in WALLETS.items():
+            after = 0
+            while True:
+                # FOR SHARE waits for balance changes in flight and holds off new ones, so every
+                # transaction of these wallets up to the high-water mark below is committed
+                wallet_ids = db.execute(
+                    select(model.id).where(model.id > after).order_by(model.id).limit(self.batch_size)
+                    .with_for_update(read=True)
+                ).scalars().all()
+                if not wallet_ids:
+                    break
+                high_water = db.execute(select(func.coalesce(func.max(WalletTransaction.id), 0))).scalar()
+                replayed = self._replayed(wallet_type, floor, high_water, wallet_ids)
+                rows = self._join_checkpoints(select(
+                    literal(wallet_type, String), model.id, self._ledger_balance(replayed), literal(high_water),
+                    func.now()
+                ), wallet_type, model, replayed).where(model.id.in_(wallet_ids))
+                statement = insert(WalletSnapshot).from_select(
+                    ["wallet_type", "wallet_id", "balance", "last_transaction_id", "taken_at"], rows
+                )
+                db.execute(statement.on_conflict_do_update(
+                    index_elements=[WalletSnapshot.wallet_type, WalletSnapshot.wallet_id],
+                    set_={
+                        "balance": statement.excluded.balance,
+                        "last_transaction_id": statement.excluded.last_transaction_id,
+                        "taken_at": statement.excluded.taken_at,
+                    }
+                ))
+                db.commit()
+                checkpointed += len(wallet_ids)
+                after = wallet_ids[-1]
+
+            # Checkpoints of deleted wallets would hold the oldest checkpoint back forever
+            db.execute(delete(WalletSnapshot).where(
+                WalletSnapshot.wallet_type == wallet_type,
+                ~exists().where(model.id == WalletSnapshot.wallet_id)
+            ))
+            db.commit()
+        return checkpointed
+
+    def verify(self, db: Session) -> AuditReport:
+        """Compare every wallet with its ledger balance; reads one consistent snapshot, call on a fresh session"""
+        started = time.perf_counter()
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        report = AuditReport(checkpoint_transaction_id=self._floor(db))
+        for wallet_type, (model, owner, _) in WALLETS.items():
+            replayed = self._replayed(wallet_type, report.checkpoint_transaction_id)
+            report.wallets += db.execute(select(func.count()).select_from(model)).scalar()
+            report.transactions_replayed += db.execute(
+                select(func.coalesce(func.sum(replayed.c.transactions), 0))
+            ).scalar()
+
+            ledger_balance = self._ledger_balance(replayed)
+            statement = self._join_checkpoints(
+                select(model.id, owner, model.balance, ledger_balance), wallet_type, model, replayed
+            )
+            for wallet_id, owner_id, balance, ledger in db.execute(
+                statement.where(model.balance != ledger_balance).order_by(model.id)
+            ):
+                report.drift.append(WalletDrift(wallet_type, wallet_id, owner_id, balance, ledger))
+        db.rollback()
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def _floor(self, db: Session) -> int:
+        """Oldest checkpoint; transactions up to it are covered by every checkpoint"""
+        return db.execute(select(func.coalesce(func.min(WalletSnapshot.last_transaction_id), 0))).scalar()
+
+    def _replayed(self, wallet_type: str, floor: int, high_water: Optional[int] = None,
+                  wallet_ids: Optional[List[int]] = None):
+        """Per wallet of wallet_type: summed balance change and count of transactions after its checkpoint"""
+        wallet_id = getattr(WalletTransaction, WALLETS[wallet_type][2])
+        statement = select(
+            wallet_id.label("wallet_id"),
+            func.sum(WalletTransaction.balance_after - WalletTransaction.balance_before).label("delta"),
+            func.count().label("transactions"),
+        ).outerjoin(
+            WalletSnapshot, and_(WalletSnapshot.wallet_type == wallet_type, WalletSnapshot.wallet_id == wallet_id)
+        ).where(
+            WalletTransaction.id > floor,  # Primary-key range scan; the per-wallet bound below is never lower
+            WalletTransaction.id > func.coalesce(WalletSnapshot.last_transaction_id, floor),
+            wallet_id.isnot(None)
+        )
+        if high_water is not None:
+            statement = statement.where(WalletTransaction.id <= high_water)
+        if wallet_ids is not None:
+            statement = statement.where(wallet_id.in_(wallet_ids))
+        return statement.group_by(wallet_id).subquery()
+
+    def _ledger_balance(self, replayed):
+        """Checkpoint balance plus the changes replayed since"""
+        return func.coalesce(WalletSnapshot.balance, 0) + func.coalesce(replayed.c.delta, 0)
+
+    def _join_checkpoints(self, statement, wallet_type: str, model, replayed):
+        """statement over the wallets of model, with their checkpoint and replayed changes joined"""
+        return statement.select_from(model).outerjoin(
+            WalletSnapshot, and_(WalletSnapshot.wallet_type == wallet_type, WalletSnapshot.wallet_id == model.id)
+        ).outerjoin(replayed, replayed.c.wallet_id == model.id)
+
+
+async def run_wallet_audit_loop(audit: WalletAudit, interval_seconds: float) -> None:
+    """Checkpoint and verify every wallet every interval_seconds off the event loop; drift is logged"""
+    def snapshot_and_verify():
+        db = SessionLocal()
+        try:
+            audit.snapshot(db)
+        finally:
+            db.close()
+        db = SessionLocal()
+        try:
+            return audit.verify(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            report = await asyncio.to_thread(snapshot_and_verify)
+        except Exception:
+            logger.exception("Wallet audit failed")
+            continue
+        for drift in report.drift:
+            logger.warning("%s wallet %s (owner %s) balance %s differs from ledger balance %s",
+                           drift.wallet_type, drift.wallet_id, drift.owner_id, drift.balance, drift.ledger_balance)
+
+
+# Process-wide audit used by the background loop and the audit endpoints
+wallet_audit = WalletAudit(batch_size=settings.wallet_snapshot_batch_size)
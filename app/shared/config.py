@@ -20,6 +20,21 @@ class Settings(BaseSettings):
     backend_port: str = "8000"
     environment: str = "development"  # "production" or "development"
 
+    dispatch_interval_seconds: int = 15  # Batch rider dispatch tick; 0 disables the background loop
+    dispatch_max_pickup_km: float = 10.0
+    location_flush_interval_seconds: float = 5.0  # Write-behind of rider GPS pings to the riders table
+    report_workers: int = 2  # Processes running background report jobs
+    report_cache_seconds: float = 600.0  # Upper bound on how long a cached report result is served
+    report_job_timeout_seconds: float = 900.0  # Unfinished report jobs older than this are failed as lost
+    idempotency_ttl_seconds: int = 86400  # How long a stored Idempotency-Key response can be replayed
+    idempotency_claim_seconds: int = 120  # Lease on an in-progress key; a retry after it lapses takes the key over
+    idempotency_purge_interval_seconds: float = 3600.0  # Background deletion of expired idempotency keys
+    wallet_audit_interval_seconds: float = 3600.0  # Wallet snapshot and ledger verification; 0 disables the loop
+    wallet_snapshot_batch_size: int = 1000  # Wallets locked and checkpointed per snapshot transaction
+    settlement_accrual_interval_seconds: float = 300.0  # Delivered-order earnings to pending balances; 0 disables the loop
+    settlement_interval_seconds: float = 86400.0  # Payout of pending balances to available balances
+    settlement_batch_size: int = 1000  # Orders accrued or wallets settled per transaction
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
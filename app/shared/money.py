@@ -0,0 +1,142 @@
+import math
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Annotated, Union
+
+from pydantic import AfterValidator
+from sqlalchemy import BigInteger, Float
+from sqlalchemy.sql import operators
+from sqlalchemy.types import TypeDecorator
+
+
+MINOR_UNITS = 100  # Kobo per naira
+
+# Scaling a stored amount by a plain number keeps it an amount; the number itself is not money
+_SCALING_OPERATORS = (operators.mul, operators.truediv, operators.floordiv)
+
+
+def to_minor(amount: Union[float, int, Decimal, str]) -> int:
+    """Whole minor units of a major-unit amount, half away from zero (19.99 -> 1999)"""
+    if isinstance(amount, Amount):
+        return amount.minor
+    if isinstance(amount, float) and not math.isfinite(amount):
+        raise ValueError(f"Not a money amount: {amount}")
+    # str() of a float is its shortest round-trip form, so 19.99 becomes Decimal("19.99") exactly
+    return int((Decimal(str(amount)) * MINOR_UNITS).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_major(minor: Union[int, float, Decimal]) -> float:
+    """Major-unit float of a minor-unit amount, e.g. a stored value or an exact SQL sum"""
+    if isinstance(minor, Decimal):
+        return float(minor / MINOR_UNITS)
+    return minor / MINOR_UNITS
+
+
+def round_money(amount: float) -> "Amount":
+    """amount rounded to a whole minor unit, as it will be stored"""
+    return Amount.of(amount)
+
+
+class Amount(float):
+    """
+    A money amount: the major-unit float callers have always seen, carrying its exact minor units.
+
+    MinorUnits columns and Money fields produce Amounts. Adding or
+    subtracting amounts (or plain numbers, read as major units and rounded
+    to a minor unit) is integer arithmetic on the minor units and gives an
+    Amount, so balances and totals never pick up float error; sum() of
+    Amounts is exact too. Multiplying by a count is exact and by a rate
+    rounds to a whole minor unit. Dividing and comparing behave as for any
+    float.
+    """
+
+    __slots__ = ("minor",)
+
+    def __new__(cls, minor: int) -> "Amount":
+        self = super().__new__(cls, minor / MINOR_UNITS)
+        self.minor = minor
+        return self
+
+    @classmethod
+    def of(cls, amount: Union[float, int, Decimal, str]) -> "Amount":
+        """The Amount of a major-unit value, rounded to a whole minor unit"""
+        return amount if isinstance(amount, Amount) else cls(to_minor(amount))
+
+    @staticmethod
+    def _is_number(value) -> bool:
+        return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+    def __add__(self, other):
+        if self._is_number(other):
+            return Amount(self.minor + to_minor(other))
+        return super().__add__(other)
+
+    def __radd__(self, other):
+        if self._is_number(other):
+            return Amount(to_minor(other) + self.minor)
+        return super().__radd__(other)
+
+    def __sub__(self, other):
+        if self._is_number(other):
+            return Amount(self.minor - to_minor(other))
+        return super().__sub__(other)
+
+    def __rsub__(self, other):
+        if self._is_number(other):
+            return Amount(to_minor(other) - self.minor)
+        return super().__rsub__(other)
+
+    def __mul__(self, other):
+        if self._is_number(other):
+            # Scaling by a count is exact; by a rate, rounded to a whole minor unit like any stored amount
+            scaled = Decimal(self.minor) * (other if isinstance(other, (int, Decimal)) else Decimal(str(other)))
+            return Amount(int(scaled.quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+        return super().__mul__(other)
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "Amount":
+        return Amount(-self.minor)
+
+    def __abs__(self) -> "Amount":
+        return Amount(abs(self.minor))
+
+    def __reduce__(self):
+        return Amount, (self.minor,)
+
+
+class MinorUnits(TypeDecorator):
+    """
+    Money column stored as BIGINT minor units, read as Amounts and written from any major-unit number.
+
+    Sums, comparisons and arithmetic with other amounts run on exact
+    integers in the database; Python sees naira the way it always did.
+    Multiplying or dividing by a plain number (a rate, a count) binds the
+    number as is and keeps the result an amount; an amount divided by an
+    amount is a plain ratio.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    class comparator_factory(TypeDecorator.Comparator):
+        def _adapt_expression(self, op, other_comparator):
+            if op is operators.truediv and isinstance(other_comparator.type, MinorUnits):
+                return op, Float()
+            if op in (operators.add, operators.sub) + _SCALING_OPERATORS:
+                return op, self.type
+            return super()._adapt_expression(op, other_comparator)
+
+    def coerce_compared_value(self, op, value):
+        if op in _SCALING_OPERATORS:
+            return Float()
+        return self
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_minor(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else Amount(int(value))
+
+
+# Request and response field for amounts: any number in, rounded to what is stored
+Money = Annotated[float, AfterValidator(round_money)]
@@ -0,0 +1,22 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque keyset cursor for the row (created_at, id)"""
+    payload = json.dumps([created_at.isoformat(), id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(created_at, id) of a cursor from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at = datetime.fromisoformat(created_at)
+    except (TypeError, ValueError) as exc:  # binascii.Error and JSONDecodeError are ValueErrors
+        raise ValueError("Invalid cursor") from exc
+    if type(id) is not int:
+        raise ValueError("Invalid cursor")
+    return created_at, id
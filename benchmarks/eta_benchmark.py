@@ -0,0 +1,151 @@
+"""
+Offline evaluation of the ETA engine against historical orders.
+
+Replays delivered orders in delivery order. At each stage an order went
+through (placed, accepted, ready for pickup, picked up) the engine, trained
+only on orders delivered earlier, predicts the delivery time; the order is
+then folded in. Errors are compared with the fixed per-status minutes the
+endpoints returned before the engine existed.
+
+History comes from the database (--database, uses DATABASE_* settings) or
+from a synthetic city with vendor-specific prep times and zone-specific
+speeds (default).
+
+Usage:
+    python -m benchmarks.eta_benchmark
+    python -m benchmarks.eta_benchmark --orders 50000 --vendors 400
+    python -m benchmarks.eta_benchmark --database --days 60
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.models import OrderStatus
+from app.services.eta import CompletedOrder, EtaEngine
+from app.services.geo import haversine_km
+
+
+# What get_delivery_estimate used to return regardless of vendor or distance
+FIXED_MINUTES = {
+    OrderStatus.PENDING: 35,
+    OrderStatus.ACCEPTED: 33,
+    OrderStatus.READY_FOR_PICKUP: 12,
+    OrderStatus.IN_TRANSIT: 8,
+}
+
+LAT_RANGE = (6.40, 6.70)
+LON_RANGE = (3.20, 3.60)
+
+
+def synthetic_history(n_orders: int, n_vendors: int, seed: int):
+    rng = np.random.default_rng(seed)
+    vendor_lat = rng.uniform(*LAT_RANGE, n_vendors)
+    vendor_lon = rng.uniform(*LON_RANGE, n_vendors)
+    vendor_prep = rng.lognormal(np.log(18), 0.4, n_vendors)       # Median prep per vendor
+    vendor_popularity = rng.dirichlet(np.full(n_vendors, 0.8))
+    zone_speed = {}
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    placed = np.sort(rng.uniform(0, 60 * 24 * 60, n_orders))     # Minutes over 60 days
+    vendors = rng.choice(n_vendors, n_orders, p=vendor_popularity)
+    orders = []
+    for order_id, (minute, vendor) in enumerate(zip(placed, vendors), start=1):
+        dest_lat = vendor_lat[vendor] + rng.normal(0, 0.03)
+        dest_lon = vendor_lon[vendor] + rng.normal(0, 0.03)
+        zone = (int(dest_lat / 0.05), int(dest_lon / 0.05))
+        speed = zone_speed.setdefault(zone, rng.uniform(10, 30))
+        distance = haversine_km(vendor_lat[vendor], vendor_lon[vendor], dest_lat, dest_lon)
+
+        created = start + timedelta(minutes=float(minute))
+        accepted = created + timedelta(minutes=float(rng.exponential(3)))
+        ready = accepted + timedelta(minutes=float(vendor_prep[vendor] * rng.lognormal(0, 0.25)))
+        picked_up = ready + timedelta(minutes=float(rng.exponential(5)))
+        travel = distance / (speed * rng.lognormal(0, 0.15)) * 60
+        delivered = picked_up + timedelta(minutes=float(travel))
+        orders.append(CompletedOrder(
+            order_id, int(vendor), created, accepted, None, ready, picked_up, delivered,
+            float(vendor_lat[vendor]), float(vendor_lon[vendor]), float(dest_lat), float(dest_lon)
+        ))
+    return orders
+
+
+def database_history(days: int):
+    from app.services.eta import load_completed_orders
+    from app.shared.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        orders, _ = load_completed_orders(db, 0, datetime.now(timezone.utc) - timedelta(days=days))
+    finally:
+        db.close()
+    return orders
+
+
+def evaluate(orders, warmup: int):
+    engine = EtaEngine()
+    errors = {order_status: ([], []) for order_status in FIXED_MINUTES}
+    orders = sorted(orders, key=lambda order: order.delivered_at)
+
+    started = time.perf_counter()
+    predictions = 0
+    for index, order in enumerate(orders):
+        if index >= warmup:
+            stages = (
+                (OrderStatus.PENDING, order.created_at, order.created_at),
+                (OrderStatus.ACCEPTED, order.accepted_at, order.accepted_at),
+                (OrderStatus.READY_FOR_PICKUP, order.ready_at, order.ready_at),
+                (OrderStatus.IN_TRANSIT, order.picked_up_at, order.picked_up_at),
+            )
+            for order_status, stage_started_at, now in stages:
+                if now is None:
+                    continue
+                estimate = engine.estimate(
+                    order_status, order.vendor_id, stage_started_at,
+                    (order.vendor_latitude, order.vendor_longitude),
+                    (order.delivery_latitude, order.delivery_longitude),
+                    now=now
+                )
+                actual = (order.delivered_at - now).total_seconds() / 60
+                learned, fixed = errors[order_status]
+                learned.append(abs(estimate.total_minutes - actual))
+                fixed.append(abs(FIXED_MINUTES[order_status] - actual))
+                predictions += 1
+        engine.ingest([order])
+    elapsed = time.perf_counter() - started
+    return errors, predictions, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database", action="store_true", help="Evaluate on delivered orders in the database")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--vendors", type=int, default=200)
+    parser.add_argument("--warmup", type=float, default=0.1, help="Fraction of history used only for training")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    orders = database_history(args.days) if args.database else synthetic_history(args.orders, args.vendors, args.seed)
+    if not orders:
+        print("No delivered orders to evaluate")
+        return
+    warmup = int(len(orders) * args.warmup)
+    errors, predictions, elapsed = evaluate(orders, warmup)
+
+    print(f"{len(orders)} delivered orders, {warmup} warm-up, {predictions} predictions "
+          f"({elapsed / max(predictions, 1) * 1e6:.1f} us per predict+ingest)")
+    print(f"  {'status':<18}{'MAE engine':>12}{'MAE fixed':>12}{'p90 engine':>12}{'p90 fixed':>12}"
+          f"{'<=5min engine':>15}{'<=5min fixed':>14}")
+    for order_status, (learned, fixed) in errors.items():
+        if not learned:
+            continue
+        learned, fixed = np.array(learned), np.array(fixed)
+        print(f"  {order_status.value:<18}{learned.mean():12.1f}{fixed.mean():12.1f}"
+              f"{np.percentile(learned, 90):12.1f}{np.percentile(fixed, 90):12.1f}"
+              f"{(learned <= 5).mean():15.0%}{(fixed <= 5).mean():14.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Concurrency benchmark for wallet balance changes.
+
+Runs the same random mix of order payments, wallet fundings and
+user-to-user transfers over a handful of hot wallets from many threads,
+once with the read-modify-write handlers the wallet endpoints used before
+the ledger (legacy) and once with the current command handlers (ledger).
+Every operation uses its own session, like a request.
+
+Afterwards each wallet's transaction rows are replayed: a transaction
+whose balance_before is not the previous row's balance_after means a
+concurrent update was overwritten. Also reported: money created or
+destroyed overall, negative balances, refused operations, other errors
+and throughput.
+
+Needs a PostgreSQL database with the schema (DATABASE_* settings). The
+benchmark creates its own users and wallets and deletes them afterwards.
+
+Usage:
+    python -m benchmarks.wallet_ledger_benchmark
+    python -m benchmarks.wallet_ledger_benchmark --threads 32 --wallets 5 --operations 10000
+"""
+import argparse
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import create_engine, delete, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User, UserWallet, WalletTransaction, WalletTransactionStatus, WalletTransactionType
+from app.services.commands import (
+    FundUserWalletCommand, FundUserWalletHandler,
+    ProcessOrderPaymentCommand, ProcessOrderPaymentHandler,
+    TransferBetweenWalletsCommand, TransferBetweenWalletsHandler,
+)
+from app.shared.config import settings
+
+
+MODES = ("legacy", "ledger")
+
+
+# ==================
+# LEGACY HANDLERS (read balance, compute in Python, write back)
+# ==================
+
+def _legacy_wallet(db, user_id):
+    return db.query(UserWallet).filter(UserWallet.user_id == user_id).first()
+
+
+def legacy_payment(db, user_id, amount):
+    wallet = _legacy_wallet(db, user_id)
+    if wallet.balance < amount:
+        return False
+    balance_before = wallet.balance
+    wallet.balance = balance_before - amount
+    wallet.last_transaction_at = datetime.utcnow()
+    db.add(WalletTransaction(
+        user_wallet_id=wallet.id, transaction_type=WalletTransactionType.PAYMENT,
+        status=WalletTransactionStatus.COMPLETED, amount=amount, balance_before=balance_before,
+        balance_after=wallet.balance, description="Payment for order #0", reference_type="order",
+        processed_at=datetime.utcnow()
+    ))
+    db.commit()
+    return True
+
+
+def legacy_fund(db, user_id, amount):
+    wallet = _legacy_wallet(db, user_id)
+    balance_before = wallet.balance
+    wallet.balance = balance_before + amount
+    wallet.last_transaction_at = datetime.utcnow()
+    db.add(WalletTransaction(
+        user_wallet_id=wallet.id, transaction_type=WalletTransactionType.DEPOSIT,
+        status=WalletTransactionStatus.COMPLETED, amount=amount, balance_before=balance_before,
+        balance_after=wallet.balance, description="Benchmark funding", reference_type="funding",
+        processed_at=datetime.utcnow()
+    ))
+    db.commit()
+    return True
+
+
+def legacy_transfer(db, sender_id, recipient_id, amount):
+    sender, recipient = _legacy_wallet(db, sender_id), _legacy_wallet(db, recipient_id)
+    if sender.balance < amount:
+        return False
+    entries = []
+    for wallet, signed, reference_type in ((sender, -amount, "transfer_out"), (recipient, amount, "transfer_in")):
+        balance_before = wallet.balance
+        wallet.balance = balance_before + signed
+        wallet.last_transaction_at = datetime.utcnow()
+        entries.append(WalletTransaction(
+            user_wallet_id=wallet.id, transaction_type=WalletTransactionType.TRANSFER,
+            status=WalletTransactionStatus.COMPLETED, amount=signed, balance_before=balance_before,
+            balance_after=wallet.balance, description="Benchmark transfer", reference_type=reference_type,
+            processed_at=datetime.utcnow()
+        ))
+    db.add_all(entries)
+    db.commit()
+    return True
+
+
+# ==================
+# LEDGER HANDLERS (the command handlers behind the wallet endpoints)
+# ==================
+
+def _refused(call):
+    try:
+        call()
+    except HTTPException as error:
+        if error.status_code == 400:
+            return False
+        raise
+    return True
+
+
+def ledger_payment(db, user_id, amount):
+    return _refused(lambda: ProcessOrderPaymentHandler(db).handle(
+        ProcessOrderPaymentCommand(order_id=0, user_id=user_id, amount=amount)))
+
+
+def ledger_fund(db, user_id, amount):
+    return _refused(lambda: FundUserWalletHandler(db).handle(
+        FundUserWalletCommand(user_id=user_id, amount=amount, description="Benchmark funding", payment_method="card")))
+
+
+def ledger_transfer(db, sender_id, recipient_id, amount):
+    return _refused(lambda: TransferBetweenWalletsHandler(db).handle(TransferBetweenWalletsCommand(
+        sender_type="user", sender_id=sender_id, recipient_type="user", recipient_id=recipient_id,
+        amount=amount, description="Benchmark transfer")))
+
+
+OPERATIONS = {
+    "legacy": {"payment": legacy_payment, "fund": legacy_fund, "transfer": legacy_transfer},
+    "ledger": {"payment": ledger_payment, "fund": ledger_fund, "transfer": ledger_transfer},
+}
+
+
+# ==================
+# WORKLOAD
+# ==================
+
+def workload(user_ids, operations: int, seed: int):
+    """(kind, arguments) tuples: 30% payments, 30% fundings, 40% transfers, whole-unit amounts"""
+    rng = random.Random(seed)
+    ops = []
+    for _ in range(operations):
+        roll, amount = rng.random(), float(rng.randint(1, 500))
+        if roll < 0.30:
+            ops.append(("payment", (rng.choice(user_ids), amount)))
+        elif roll < 0.60:
+            ops.append(("fund", (rng.choice(user_ids), amount)))
+        else:
+            sender, recipient = rng.sample(user_ids, 2)
+            ops.append(("transfer", (sender, recipient, amount)))
+    return ops
+
+
+def create_wallets(engine, count: int, initial_balance: float):
+    run = uuid.uuid4().hex[:12]
+    with engine.begin() as connection:
+        user_ids = connection.execute(insert(User).returning(User.id), [{
+            "firebase_uid": f"ledger-benchmark-{run}-{index}",
+            "email": f"ledger-benchmark-{run}-{index}@example.invalid",
+            "phone_number": "0",
+            "full_name": f"Ledger Benchmark {index}",
+        } for index in range(count)]).scalars().all()
+        connection.execute(insert(UserWallet), [
+            {"user_id": user_id, "balance": initial_balance, "is_active": True, "is_locked": False}
+            for user_id in user_ids
+        ])
+    return list(user_ids)
+
+
+def reset_wallets(engine, user_ids, initial_balance: float):
+    with engine.begin() as connection:
+        wallet_ids = select(UserWallet.id).where(UserWallet.user_id.in_(user_ids)).scalar_subquery()
+        connection.execute(delete(WalletTransaction).where(WalletTransaction.user_wallet_id.in_(wallet_ids)))
+        connection.execute(update(UserWallet).where(UserWallet.user_id.in_(user_ids)).values(balance=initial_balance))
+
+
+def drop_wallets(engine, user_ids):
+    with engine.begin() as connection:
+        wallet_ids = select(UserWallet.id).where(UserWallet.user_id.in_(user_ids)).scalar_subquery()
+        connection.execute(delete(WalletTransaction).where(WalletTransaction.user_wallet_id.in_(wallet_ids)))
+        connection.execute(delete(UserWallet).where(UserWallet.user_id.in_(user_ids)))
+        connection.execute(delete(User).where(User.id.in_(user_ids)))
+
+
+def run(session_factory, mode: str, ops, threads: int):
+    handlers = OPERATIONS[mode]
+
+    def execute(op):
+        kind, arguments = op
+        db = session_factory()
+        started = time.perf_counter()
+        try:
+            outcome = "done" if handlers[kind](db, *arguments) else "refused"
+        except Exception:
+            db.rollback()
+            outcome = "error"
+        finally:
+            db.close()
+        return kind, arguments, outcome, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(execute, ops))
+    return results, time.perf_counter() - started
+
+
+def check(engine, user_ids, initial_balance: float, results):
+    """Lost updates from the per-wallet transaction chain, plus conservation of money"""
+    with engine.connect() as connection:
+        balances = dict(connection.execute(
+            select(UserWallet.id, UserWallet.balance).where(UserWallet.user_id.in_(user_ids))
+        ).all())
+        rows = connection.execute(
+            select(WalletTransaction.user_wallet_id, WalletTransaction.balance_before, WalletTransaction.balance_after)
+            .where(WalletTransaction.user_wallet_id.in_(list(balances)))
+            .order_by(WalletTransaction.user_wallet_id, WalletTransaction.id)
+        ).all()
+
+    lost, previous = 0, {}
+    for wallet_id, balance_before, balance_after in rows:
+        if balance_before != previous.get(wallet_id, initial_balance):
+            lost += 1
+        previous[wallet_id] = balance_after
+    stale = sum(1 for wallet_id, balance in balances.items() if balance != previous.get(wallet_id, initial_balance))
+
+    net_in = sum(arguments[-1] for kind, arguments, outcome, _ in results if outcome == "done" and kind == "fund")
+    net_out = sum(arguments[-1] for kind, arguments, outcome, _ in results if outcome == "done" and kind == "payment")
+    expected_total = initial_balance * len(user_ids) + net_in - net_out
+    return {
+        "lost": lost,
+        "stale": stale,
+        "drift": sum(balances.values()) - expected_total,
+        "negative": sum(1 for balance in balances.values() if balance < 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--wallets", type=int, default=10, help="Fewer wallets means more contention")
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--initial-balance", type=float, default=20000.0)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine(settings.db_url, pool_size=args.threads, max_overflow=0)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    user_ids = create_wallets(engine, args.wallets, args.initial_balance)
+    try:
+        ops = workload(user_ids, args.operations, args.seed)
+        print(f"{args.operations} operations over {args.wallets} wallets from {args.threads} threads")
+        print(f"  {'mode':<8}{'ops/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'refused':>9}{'errors':>8}"
+              f"{'lost updates':>14}{'stale wallets':>15}{'money drift':>13}{'negative':>10}")
+        for mode in args.modes:
+            reset_wallets(engine, user_ids, args.initial_balance)
+            results, elapsed = run(session_factory, mode, ops, args.threads)
+            latencies = np.array([seconds for *_, seconds in results]) * 1000
+            outcomes = [outcome for _, _, outcome, _ in results]
+            report = check(engine, user_ids, args.initial_balance, results)
+            print(f"  {mode:<8}{len(ops) / elapsed:9.0f}{np.percentile(latencies, 50):9.1f}"
+                  f"{np.percentile(latencies, 99):9.1f}{outcomes.count('refused'):9d}{outcomes.count('error'):8d}"
+                  f"{report['lost']:14d}{report['stale']:15d}{report['drift']:13.0f}{report['negative']:10d}")
+    finally:
+        drop_wallets(engine, user_ids)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()